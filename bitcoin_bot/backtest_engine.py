@@ -9,21 +9,37 @@ import logging
 from datetime import datetime, timedelta
 from binance.client import Client
 import matplotlib.pyplot as plt
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from sys import path as sys_path
 from pathlib import Path
 sys_path.insert(0, str(Path(__file__).parent.parent))
 from shared.indicators import RSI, MACD, SMA, EMA, BBANDS, ATR
+from shared.risk_engine import RiskEngine
+from shared.backtest_core import (
+    SIGNAL_HOLD, SIGNAL_SHORT, SIGNAL_CLOSE, SIGNAL_LABELS,
+    signal_codes, simulate_short, simulate_short_intrabar, simulate_grid, trade_statistics
+)
+from shared.fills import sub_bar_bounds
+from shared.scoring import bot_params, confidence_series, risk_limits
+from shared.sweep import grid_params, random_params, run_grid_variants, run_sweep
+from shared.walk_forward import walk_forward
+from shared.optimizer import hyperband, successive_halving
+from shared.monte_carlo import BOOTSTRAP, monte_carlo
+from shared.portfolio import build_panel, load_panel, portfolio_backtest, save_panel
 
 logger = logging.getLogger('BinanceBacktest')
 
+KLINES_LIMIT = 1000  # futures_klines 요청당 최대 캔들 수
+
 class BacktestEngine:
     """백테스팅 엔진"""
     
-    def __init__(self, symbol: str, initial_capital: float = 100, leverage: int = 2):
+    def __init__(self, symbol: str, initial_capital: float = 100, leverage: Optional[int] = None):
+        # 레버리지/포지션 비율/임계값 기본값은 심볼별 라이브 봇 BotConfig와 같은 shared.scoring 표
         self.symbol = symbol
+        self.params = bot_params(symbol)
         self.initial_capital = initial_capital
-        self.leverage = leverage
+        self.leverage = self.params['leverage'] if leverage is None else leverage
         self.trades = []
         self.balance_history = []
         self.current_balance = initial_capital
@@ -32,19 +48,30 @@ class BacktestEngine:
     def load_historical_data(self, client: Client, interval: str = '1h', days: int = 90) -> pd.DataFrame:
         """
         과거 데이터 로드
+        요청당 최대 1000개이므로 마지막 캔들 다음 시각부터 endTime까지 이어서 요청
         """
         end_time = datetime.now()
         start_time = end_time - timedelta(days=days)
         
         logger.info(f"{self.symbol} {days}일 {interval} 데이터 로드 중...")
         
-        klines = client.futures_klines(
-            symbol=self.symbol,
-            interval=interval,
-            startTime=int(start_time.timestamp() * 1000),
-            endTime=int(end_time.timestamp() * 1000),
-            limit=1000
-        )
+        start_ms = int(start_time.timestamp() * 1000)
+        end_ms = int(end_time.timestamp() * 1000)
+        klines = []
+        while start_ms < end_ms:
+            batch = client.futures_klines(
+                symbol=self.symbol,
+                interval=interval,
+                startTime=start_ms,
+                endTime=end_ms,
+                limit=KLINES_LIMIT
+            )
+            if not batch:
+                break
+            klines.extend(batch)
+            if len(batch) < KLINES_LIMIT:
+                break
+            start_ms = int(batch[-1][0]) + 1
         
         df = pd.DataFrame(klines, columns=[
             'time', 'open', 'high', 'low', 'close', 'volume',
@@ -56,7 +83,7 @@ class BacktestEngine:
             df[col] = pd.to_numeric(df[col])
         
         df['time'] = pd.to_datetime(df['time'], unit='ms')
-        df = df.sort_values('time').reset_index(drop=True)
+        df = df.drop_duplicates('time').sort_values('time').reset_index(drop=True)
         
         logger.info(f"로드 완료: {len(df)}개 캔들 ({df['time'].min()} ~ {df['time'].max()})")
         return df
@@ -87,116 +114,178 @@ class BacktestEngine:
         return df
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        """거래 신호 생성"""
-        df['signal'] = 'HOLD'
-        
-        for i in range(1, len(df)):
-            rsi = df.loc[i, 'rsi']
-            macd = df.loc[i, 'macd']
-            macd_signal = df.loc[i, 'macd_signal']
-            price = df.loc[i, 'close']
-            sma_20 = df.loc[i, 'sma_20']
-            
+        """
+        거래 신호 생성 (전체 배열 비교, NaN 비교는 False)
+        signal 열: SIGNAL_LABELS 범주의 Categorical (코드는 int8)
+        """
+        rsi = df['rsi'].to_numpy(dtype=float)
+        macd = df['macd'].to_numpy(dtype=float)
+        macd_signal = df['macd_signal'].to_numpy(dtype=float)
+        price = df['close'].to_numpy(dtype=float)
+        sma_20 = df['sma_20'].to_numpy(dtype=float)
+
+        with np.errstate(invalid='ignore'):
             # 숏 신호: RSI > 70 AND MACD < Signal AND price > SMA20
-            if rsi > 70 and macd < macd_signal and price > sma_20:
-                df.loc[i, 'signal'] = 'SHORT'
-            
+            short = (rsi > 70) & (macd < macd_signal) & (price > sma_20)
             # 종료 신호: RSI < 50 OR MACD > Signal
-            elif rsi < 50 or macd > macd_signal:
-                df.loc[i, 'signal'] = 'CLOSE'
-        
+            close = (rsi < 50) | (macd > macd_signal)
+
+        codes = np.full(len(df), SIGNAL_HOLD, dtype=np.int8)
+        codes[close] = SIGNAL_CLOSE
+        codes[short] = SIGNAL_SHORT
+        codes[:1] = SIGNAL_HOLD  # 첫 봉은 항상 HOLD
+
+        df['signal'] = pd.Categorical.from_codes(codes, categories=SIGNAL_LABELS)
         return df
     
+    def generate_live_signals(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        라이브 봇과 같은 8점 점수 신뢰도 (shared.scoring 커널)
+        short_confidence / long_confidence / mode_hint (RSI 모드 전환 권고) 열 추가
+        """
+        scores = confidence_series(
+            df['close'].to_numpy(dtype=float), df['rsi'].to_numpy(dtype=float),
+            df['macd'].to_numpy(dtype=float), df['macd_signal'].to_numpy(dtype=float),
+            df['macd_hist'].to_numpy(dtype=float), df['sma_20'].to_numpy(dtype=float),
+            df['bb_mid'].to_numpy(dtype=float)
+        )
+        df['short_confidence'] = scores['short_confidence']
+        df['long_confidence'] = scores['long_confidence']
+        df['mode_hint'] = scores['mode']
+        return df
+
+    def backtest_live(self, df: pd.DataFrame, grid_num: int = 3, grid_spacing: float = 0.5,
+                      stop_loss_pct: float = 2.0, trailing_stop_pct: float = 2.0,
+                      position_size_pct: Optional[float] = None, signal_threshold: Optional[float] = None,
+                      entry_threshold: Optional[float] = None, initial_mode: str = 'SHORT',
+                      auto_mode_switch: bool = True, risk: Optional[RiskEngine] = None) -> Dict:
+        """
+        라이브 봇 전략 백테스팅 (점수 신뢰도, RSI 자동 모드 전환, 그리드 진입, 트레일링 스탑)
+        generate_live_signals 결과 필요, 포지션 비율/임계값을 주지 않으면 심볼별 라이브 값 사용
+        """
+        if position_size_pct is None:
+            position_size_pct = self.params['position_size_pct']
+        if signal_threshold is None:
+            signal_threshold = self.params['signal_threshold']
+        if entry_threshold is None:
+            entry_threshold = self.params['entry_threshold']
+        logger.info(f"라이브 전략 백테스팅 시작 (레버리지: {self.leverage}x, 그리드: {grid_num}개, "
+                    f"임계값: {signal_threshold}/{entry_threshold})")
+
+        volume_24h = None
+        if risk is not None:
+            volume_24h = (df['volume'] * df['close']).rolling(24, min_periods=1).sum().to_numpy()
+
+        trades, equity, self.current_balance, switches = simulate_grid(
+            df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float),
+            df['close'].to_numpy(dtype=float),
+            df['short_confidence'].to_numpy(dtype=float), df['long_confidence'].to_numpy(dtype=float),
+            df['mode_hint'].to_numpy(), self.initial_capital, self.leverage,
+            signal_threshold, entry_threshold,
+            grid_num=grid_num, grid_spacing=grid_spacing, stop_loss_pct=stop_loss_pct,
+            trailing_stop_pct=trailing_stop_pct, position_size_pct=position_size_pct,
+            initial_mode=initial_mode, auto_mode_switch=auto_mode_switch,
+            risk=risk, symbol=self.symbol, volume_24h=volume_24h
+        )
+        self.balance_history = equity
+        self.position = None
+
+        times = df['time']
+        self.trades = []
+        for (entry_index, exit_index, side, entry_price, exit_price, quantity,
+             pnl, pnl_pct, reason, filled_levels) in trades:
+            entry_time = times.iat[entry_index]
+            exit_time = times.iat[exit_index]
+            self.trades.append({
+                'side': side,
+                'entry_time': entry_time,
+                'entry_price': entry_price,
+                'exit_time': exit_time,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'pnl_pct': pnl_pct,
+                'reason': reason,
+                'grid_filled': filled_levels,
+                'duration': (exit_time - entry_time).total_seconds() / 3600
+            })
+
+        stats = self._calculate_statistics()
+        stats['mode_switches'] = switches
+        return stats
+
+    def to_arrays(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """백테스트 코어/스윕용 배열 (신호 열이 있는 것만)"""
+        arrays = {name: df[name].to_numpy(dtype=float) for name in ('high', 'low', 'close')}
+        if 'signal' in df:
+            arrays['signal'] = signal_codes(df['signal'])
+        for name in ('short_confidence', 'long_confidence'):
+            if name in df:
+                arrays[name] = df[name].to_numpy(dtype=float)
+        if 'mode_hint' in df:
+            arrays['mode_hint'] = df['mode_hint'].to_numpy()
+        return arrays
+
     def backtest(self, df: pd.DataFrame, stop_loss_pct: float = 2.0, 
-                 take_profit_pct: float = 5.0, position_size_pct: float = 0.15) -> Dict:
+                 take_profit_pct: float = 5.0, position_size_pct: float = 0.15,
+                 risk: Optional[RiskEngine] = None, intrabar: bool = False,
+                 trailing_stop_pct: Optional[float] = None,
+                 sub_df: Optional[pd.DataFrame] = None) -> Dict:
         """
         백테스팅 실행
+        risk: 라이브 봇과 같은 사전 위험 검사 (낙폭/거래량/레버리지/노출), 없으면 생략
+        intrabar: 손절/익절을 종가 대신 고가/저가 터치로 체결 (trailing_stop_pct 사용 시 자동)
+        sub_df: 1분봉 등 하위 봉 (time/open/high/low), 주어지면 봉 안의 체결 순서/가격을 하위 봉으로 정밀화
         """
         logger.info(f"백테스팅 시작 (레버리지: {self.leverage}x, 손절매: {stop_loss_pct}%, 익절: {take_profit_pct}%)")
-        
-        self.trades = []
-        self.balance_history = [self.initial_capital]
-        self.current_balance = self.initial_capital
+
+        close = df['close'].to_numpy(dtype=float)
+        volume_24h = None
+        if risk is not None:
+            # 24시간 거래대금 (1시간 봉 24개 합)
+            volume_24h = (df['volume'] * df['close']).rolling(24, min_periods=1).sum().to_numpy()
+
+        if intrabar or trailing_stop_pct is not None or sub_df is not None:
+            sub_bars = None
+            if sub_df is not None:
+                sub_bars = {name: sub_df[name].to_numpy(dtype=float) for name in ('open', 'high', 'low')}
+                sub_bars['bounds'] = sub_bar_bounds(df['time'].to_numpy(), sub_df['time'].to_numpy())
+            trades, equity, self.current_balance = simulate_short_intrabar(
+                df['high'].to_numpy(dtype=float), df['low'].to_numpy(dtype=float), close,
+                signal_codes(df['signal']), self.initial_capital, self.leverage,
+                stop_loss_pct, take_profit_pct, position_size_pct, trailing_stop_pct=trailing_stop_pct,
+                open_=df['open'].to_numpy(dtype=float), sub_bars=sub_bars,
+                risk=risk, symbol=self.symbol, volume_24h=volume_24h
+            )
+        else:
+            trades, equity, self.current_balance = simulate_short(
+                close, signal_codes(df['signal']), self.initial_capital, self.leverage,
+                stop_loss_pct, take_profit_pct, position_size_pct,
+                risk=risk, symbol=self.symbol, volume_24h=volume_24h
+            )
+        self.balance_history = equity
         self.position = None
-        
-        for i in range(len(df)):
-            row = df.iloc[i]
-            current_price = row['close']
-            signal = row['signal']
-            
-            # 기존 포지션 확인
-            if self.position:
-                entry_price = self.position['entry_price']
-                loss_pct = (current_price - entry_price) / entry_price * 100
-                
-                # 손절매 체크
-                if loss_pct > stop_loss_pct:
-                    self._close_position(row, 'STOP_LOSS')
-                
-                # 익절 체크
-                elif loss_pct < -take_profit_pct:
-                    self._close_position(row, 'TAKE_PROFIT')
-                
-                # 신호 체크
-                elif signal == 'CLOSE' or signal == 'SHORT':
-                    self._close_position(row, 'SIGNAL')
-            
-            # 새로운 숏 포지션 진입
-            if not self.position and signal == 'SHORT':
-                position_value = self.current_balance * position_size_pct / self.leverage
-                quantity = position_value / current_price
-                
-                self.position = {
-                    'entry_price': current_price,
-                    'entry_time': row['time'],
-                    'quantity': quantity,
-                    'entry_index': i,
-                    'position_value': position_value
-                }
-                logger.debug(f"[{row['time']}] SHORT @ {current_price:.2f}")
-            
-            # 잔액 기록
-            if self.position:
-                unrealized_pnl = (self.position['entry_price'] - current_price) * \
-                                self.position['quantity'] * self.leverage
-                self.balance_history.append(self.current_balance + unrealized_pnl)
-            else:
-                self.balance_history.append(self.current_balance)
-        
+
+        # 거래 기록 (시간은 종료된 거래에 대해서만 조회)
+        times = df['time']
+        self.trades = []
+        for entry_index, exit_index, entry_price, exit_price, quantity, pnl, pnl_pct, reason in trades:
+            entry_time = times.iat[entry_index]
+            exit_time = times.iat[exit_index]
+            self.trades.append({
+                'entry_time': entry_time,
+                'entry_price': entry_price,
+                'exit_time': exit_time,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'pnl_pct': pnl_pct,
+                'reason': reason,
+                'duration': (exit_time - entry_time).total_seconds() / 3600
+            })
+
         return self._calculate_statistics()
     
-    def _close_position(self, row, reason: str):
-        """포지션 종료"""
-        if not self.position:
-            return
-        
-        exit_price = row['close']
-        entry_price = self.position['entry_price']
-        quantity = self.position['quantity']
-        
-        # 숏 손익 계산
-        pnl = (entry_price - exit_price) * quantity * self.leverage
-        pnl_pct = (entry_price - exit_price) / entry_price * 100
-        
-        self.current_balance += pnl
-        
-        trade = {
-            'entry_time': self.position['entry_time'],
-            'entry_price': entry_price,
-            'exit_time': row['time'],
-            'exit_price': exit_price,
-            'quantity': quantity,
-            'pnl': pnl,
-            'pnl_pct': pnl_pct,
-            'reason': reason,
-            'duration': (row['time'] - self.position['entry_time']).total_seconds() / 3600
-        }
-        
-        self.trades.append(trade)
-        logger.debug(f"[{row['time']}] CLOSE @ {exit_price:.2f} | PnL: {pnl:.2f} ({pnl_pct:.2f}%)")
-        
-        self.position = None
-    
     def _calculate_statistics(self) -> Dict:
         """통계 계산"""
         if not self.trades:
@@ -214,52 +303,26 @@ class BacktestEngine:
                 'sharpe_ratio': 0
             }
         
-        trades = self.trades
-        
-        # 기본 통계
-        total_trades = len(trades)
-        winning_trades = len([t for t in trades if t['pnl'] > 0])
-        losing_trades = len([t for t in trades if t['pnl'] <= 0])
-        win_rate = winning_trades / total_trades * 100 if total_trades > 0 else 0
-        
-        # 손익
-        total_pnl = sum(t['pnl'] for t in trades)
-        total_pnl_pct = (total_pnl / self.initial_capital) * 100
-        
-        # 평균 손익
-        wins = [t['pnl'] for t in trades if t['pnl'] > 0]
-        losses = [t['pnl'] for t in trades if t['pnl'] < 0]
-        
-        avg_win = np.mean(wins) if wins else 0
-        avg_loss = np.mean(losses) if losses else 0
-        
-        profit_factor = abs(sum(wins) / sum(losses)) if losses else 0
-        
-        # 최대 낙폭
-        balance_array = np.array(self.balance_history)
-        peak = np.maximum.accumulate(balance_array)
-        drawdown = (balance_array - peak) / peak * 100
-        max_drawdown = np.min(drawdown)
-        
-        # Sharpe Ratio (간단 계산)
-        returns = np.diff(balance_array) / balance_array[:-1]
-        sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252 * 24) if len(returns) > 1 else 0
-        
-        return {
-            'total_trades': total_trades,
-            'winning_trades': winning_trades,
-            'losing_trades': losing_trades,
-            'win_rate': win_rate,
-            'profit_factor': profit_factor,
-            'avg_win': avg_win,
-            'avg_loss': avg_loss,
-            'total_pnl': total_pnl,
-            'total_pnl_pct': total_pnl_pct,
-            'max_drawdown': max_drawdown,
-            'sharpe_ratio': sharpe_ratio,
-            'final_balance': self.current_balance
-        }
+        stats = trade_statistics(
+            np.array([t['pnl'] for t in self.trades], dtype=float),
+            np.asarray(self.balance_history, dtype=float),
+            self.initial_capital
+        )
+        stats['final_balance'] = self.current_balance
+        return stats
     
+    def monte_carlo(self, paths: int = 10000, method: str = BOOTSTRAP, block_size: int = 24,
+                    ruin_pct: float = 50.0, drawdown_limit: Optional[float] = 10.0,
+                    seed: Optional[int] = None) -> Dict:
+        """
+        마지막 백테스트 결과의 몬테카를로 분석
+        method: 'bootstrap'/'shuffle' (거래 손익 재추출) 또는 'block' (봉 수익률 블록 부트스트랩)
+        drawdown_limit: 라이브 봇 MAX_DRAWDOWN_PERCENT (이 낙폭에 닿는 경로 비율)
+        """
+        return monte_carlo(self.initial_capital, pnls=np.array([t['pnl'] for t in self.trades], dtype=float),
+                           equity=np.asarray(self.balance_history, dtype=float), method=method, paths=paths,
+                           block_size=block_size, ruin_pct=ruin_pct, drawdown_limit=drawdown_limit, seed=seed)
+
     def plot_results(self, save_path: str = None):
         """결과 시각화"""
         fig, axes = plt.subplots(2, 1, figsize=(14, 8))
@@ -299,30 +362,51 @@ class BacktestEngine:
         else:
             plt.show()
 
-def run_backtest(symbol: str, days: int = 90):
-    """백테스팅 실행"""
-    
-    # API 클라이언트
-    client = Client('', '')  # API 키 필요
-    
-    # 백테스팅 엔진
-    bt = BacktestEngine(symbol, initial_capital=100, leverage=2)
-    
-    # 데이터 로드
+def load_arrays(symbol: str, days: int, strategy: str = 'live', initial_capital: float = 100,
+                client: Optional[Client] = None
+                ) -> Optional[Tuple[BacktestEngine, pd.DataFrame, Dict[str, np.ndarray]]]:
+    """
+    1시간 봉 로드 → 지표 → 전략 신호 → 백테스트 코어 배열 (스윕/워크 포워드/최적화/포트폴리오 공용)
+    strategy: 'live' (라이브 봇 점수) 또는 'simple' (RSI/MACD/SMA20 단순 규칙)
+
+    Returns:
+        (BacktestEngine, 신호 DataFrame, to_arrays 결과), 데이터가 없으면 None
+    """
+    client = client or Client('', '')  # API 키 필요
+    bt = BacktestEngine(symbol, initial_capital=initial_capital)
     df = bt.load_historical_data(client, interval='1h', days=days)
-    
     if df.empty:
-        logger.error("데이터 로드 실패")
-        return
-    
-    # 지표 계산
+        logger.error(f"{symbol} 데이터 로드 실패")
+        return None
+
     df = bt.calculate_indicators(df)
-    
-    # 신호 생성
-    df = bt.generate_signals(df)
-    
+    if strategy == 'live':
+        df = bt.generate_live_signals(df)
+    else:
+        df = bt.generate_signals(df)
+    return bt, df, bt.to_arrays(df)
+
+def run_backtest(symbol: str, days: int = 90, strategy: str = 'live', risk_checks: bool = False):
+    """
+    백테스팅 실행
+    strategy: 'live' (라이브 봇 점수/모드 전환/그리드) 또는 'simple' (RSI/MACD/SMA20 단순 규칙)
+    risk_checks: 라이브 봇과 같은 사전 위험 검사(shared.scoring.RISK_LIMITS) 적용, 기본은 검사 없음
+    """
+    # 데이터 로드 → 지표 → 신호 (스윕/워크 포워드와 같은 경로)
+    loaded = load_arrays(symbol, days, strategy)
+    if loaded is None:
+        return
+    bt, df, _ = loaded
+
+    # 라이브 봇과 같은 사전 위험 검사 (선택)
+    limits = risk_limits(symbol)
+    risk = RiskEngine(**limits) if risk_checks else None
+
     # 백테스팅 실행
-    stats = bt.backtest(df, stop_loss_pct=2.0, take_profit_pct=5.0, position_size_pct=0.15)
+    if strategy == 'live':
+        stats = bt.backtest_live(df, stop_loss_pct=2.0, trailing_stop_pct=2.0, risk=risk)
+    else:
+        stats = bt.backtest(df, stop_loss_pct=2.0, take_profit_pct=5.0, position_size_pct=0.15, risk=risk)
     
     # 결과 출력
     print("\n" + "=" * 60)
@@ -341,6 +425,18 @@ def run_backtest(symbol: str, days: int = 90):
     print("\n위험 지표:")
     print(f"  최대 낙폭: {stats['max_drawdown']:.2f}%")
     print(f"  샤프 비율: {stats['sharpe_ratio']:.4f}")
+    if 'mode_switches' in stats:
+        print(f"  모드 전환: {stats['mode_switches']}회")
+
+    if stats['total_trades'] > 0:
+        mc = bt.monte_carlo(paths=10000, drawdown_limit=limits['max_drawdown_percent'])
+        drawdown = mc['max_drawdown']
+        final = mc['final_equity']
+        print(f"\n몬테카를로 ({mc['paths']}개 경로, 거래 부트스트랩):")
+        print(f"  최대 낙폭 중앙값: {drawdown['p50']:.2f}% (하위 5%: {drawdown['p5']:.2f}%)")
+        print(f"  최종 자본 5%/50%/95%: {final['p5']:.2f} / {final['p50']:.2f} / {final['p95']:.2f} USDT")
+        print(f"  손실 확률: {mc['prob_loss'] * 100:.1f}%, 낙폭 {limits['max_drawdown_percent']}% 도달: "
+              f"{mc['prob_drawdown_limit'] * 100:.1f}%, 파산(50% 손실): {mc['risk_of_ruin'] * 100:.2f}%")
     print("=" * 60)
     
     # 차트 저장
@@ -348,6 +444,207 @@ def run_backtest(symbol: str, days: int = 90):
     
     return stats, bt.trades
 
+def default_space(symbol: str, strategy: str) -> Dict:
+    """스윕/워크 포워드 기본 탐색 공간"""
+    if strategy == 'live':
+        live = bot_params(symbol)
+        return {
+            'grid_num': [3, 5, 10],
+            'grid_spacing': [0.3, 0.5, 1.0],
+            'trailing_stop_pct': [1.0, 2.0, 3.0],
+            'signal_threshold': [live['signal_threshold']],
+            'entry_threshold': [live['entry_threshold']],
+            'leverage': [live['leverage']],
+            'position_size_pct': [live['position_size_pct']],
+        }
+    return {
+        'stop_loss_pct': [1.0, 2.0, 3.0],
+        'take_profit_pct': [3.0, 5.0, 8.0],
+        'position_size_pct': [0.05, 0.10, 0.15],
+        'leverage': [2, 3, 5],
+    }
+
+
+def run_parameter_sweep(symbol: str, days: int = 90, strategy: str = 'simple',
+                        space: Optional[Dict] = None, samples: Optional[int] = None,
+                        max_workers: Optional[int] = None, csv_path: Optional[str] = None) -> pd.DataFrame:
+    """
+    파라미터 스윕 (데이터는 한 번만 받아 공유 메모리로 워커에 전달)
+    space: 키별 후보 목록, samples를 주면 무작위 조합 (튜플은 실수 범위)
+    """
+    loaded = load_arrays(symbol, days, strategy)
+    if loaded is None:
+        return pd.DataFrame()
+    bt, _, arrays = loaded
+    space = space or default_space(symbol, strategy)
+
+    params = random_params(space, samples) if samples else grid_params(space)
+    table = run_sweep(arrays, params, strategy=strategy, initial_capital=bt.initial_capital,
+                      max_workers=max_workers, csv_path=csv_path)
+
+    print("\n" + "=" * 60)
+    print(f"🔎 {symbol} 파라미터 스윕 ({len(params)}개 조합, {days}일)")
+    print("=" * 60)
+    print(table.head(10).to_string(index=False))
+    return table
+
+
+def run_walk_forward(symbol: str, days: int = 365, strategy: str = 'live',
+                     in_sample_days: int = 60, out_sample_days: int = 15, anchored: bool = False,
+                     space: Optional[Dict] = None, max_workers: Optional[int] = None) -> Dict:
+    """
+    워크 포워드 분석 (1시간 봉, 지표/신호는 전체 이력에서 한 번만 계산해 모든 구간이 공유)
+    in-sample 구간마다 space를 병렬 평가해 최적 조합을 고르고 다음 out-of-sample 구간에 적용
+    """
+    loaded = load_arrays(symbol, days, strategy)
+    if loaded is None:
+        return {}
+    bt, df, arrays = loaded
+    params = grid_params(space or default_space(symbol, strategy))
+
+    # 최소 한 구간(in-sample + 검증 1봉 이상)이 들어가는지 확인
+    in_sample, out_sample = in_sample_days * 24, out_sample_days * 24
+    if len(df) <= in_sample:
+        logger.error(f"데이터 부족: {len(df)}개 봉 ({len(df) / 24:.0f}일) < in-sample {in_sample_days}일 + 1봉")
+        return {}
+    if len(df) < in_sample + out_sample:
+        logger.warning(f"데이터 {len(df) / 24:.0f}일로 검증 구간이 {out_sample_days}일보다 짧음")
+
+    result = walk_forward(arrays, params, in_sample=in_sample,
+                          out_sample=out_sample, strategy=strategy,
+                          initial_capital=bt.initial_capital, anchored=anchored, max_workers=max_workers)
+    folds = result['folds']
+    times = df['time']
+    column = folds.columns.get_loc('oos_end') + 1
+    folds.insert(column, 'oos_from', times.iloc[folds['oos_start']].to_numpy())
+    folds.insert(column + 1, 'oos_to', times.iloc[folds['oos_end'] - 1].to_numpy())
+    stats = result['statistics']
+
+    print("\n" + "=" * 60)
+    print(f"🚶 {symbol} 워크 포워드 ({len(folds)}개 구간, in-sample {in_sample_days}일 / "
+          f"out-of-sample {out_sample_days}일)")
+    print("=" * 60)
+    print(folds.to_string(index=False))
+    print(f"\nout-of-sample 총 손익: ${stats['total_pnl']:.2f} ({stats['total_pnl_pct']:.2f}%), "
+          f"거래 {stats['total_trades']}회, 최대 낙폭 {stats['max_drawdown']:.2f}%")
+    return result
+
+
+def run_optimizer(symbol: str, days: int = 180, strategy: str = 'live', method: str = 'halving',
+                  samples: int = 243, eta: int = 3, space: Optional[Dict] = None,
+                  max_workers: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+    """
+    조기 종료 최적화 (짧은 구간에서 많은 후보를 걸러내고 상위만 전체 이력으로 평가)
+    method: 'halving' (후보 samples개) 또는 'hyperband' (브래킷별로 후보 추출)
+    space: 기본은 신호/진입 임계값, 그리드 간격, 트레일링 스탑 범위 (튜플은 실수 범위)
+    """
+    loaded = load_arrays(symbol, days, strategy)
+    if loaded is None:
+        return {}
+    bt, _, arrays = loaded
+    if strategy == 'live':
+        space = space or {
+            'signal_threshold': (0.125, 0.625),
+            'entry_threshold': (0.25, 0.75),
+            'grid_num': [3, 5, 10],
+            'grid_spacing': (0.2, 1.5),
+            'trailing_stop_pct': (0.5, 4.0),
+            'leverage': [bt.leverage],
+            'position_size_pct': [bt.params['position_size_pct']],
+        }
+    else:
+        space = space or {
+            'stop_loss_pct': (0.5, 4.0),
+            'take_profit_pct': (1.0, 10.0),
+            'position_size_pct': (0.05, 0.20),
+            'leverage': [2, 3, 5],
+        }
+
+    if method == 'hyperband':
+        result = hyperband(arrays, space, strategy=strategy, initial_capital=bt.initial_capital,
+                           eta=eta, max_workers=max_workers, seed=seed)
+    else:
+        result = successive_halving(arrays, random_params(space, samples, seed=seed), strategy=strategy,
+                                    initial_capital=bt.initial_capital, eta=eta, max_workers=max_workers)
+
+    print("\n" + "=" * 60)
+    print(f"🏁 {symbol} {method} 최적화 ({result['evaluations']}회 평가, "
+          f"격자 탐색 대비 {result['cost_ratio'] * 100:.1f}% 봉 수)")
+    print("=" * 60)
+    print(result['ranking'].head(10).to_string(index=False))
+    return result
+
+
+def run_grid_variant_sweep(symbol: str, days: int = 90, space: Optional[Dict] = None,
+                           max_workers: Optional[int] = None) -> pd.DataFrame:
+    """
+    그리드 변형 비교 (라이브 신호의 배치 봉마다 LIMIT 사다리를 독립 시뮬레이션)
+    레벨별 체결 봉, VWAP 진입가, 청산 시 미체결 레벨 취소를 배열 연산으로 계산
+    """
+    loaded = load_arrays(symbol, days, 'live')
+    if loaded is None:
+        return pd.DataFrame()
+    bt, _, arrays = loaded
+    params = grid_params(space or {
+        'side': ['SHORT', 'LONG'],
+        'grid_num': [2, 3, 5, 8, 10],
+        'grid_spacing': [0.2, 0.3, 0.5, 0.8, 1.0, 1.5],
+        'stop_loss_pct': [1.0, 2.0, 3.0],
+        'trailing_stop_pct': [1.0, 2.0, 3.0],
+        'signal_threshold': [bt.params['signal_threshold']],
+        'entry_threshold': [bt.params['entry_threshold']],
+        'leverage': [bt.leverage],
+        'position_size_pct': [bt.params['position_size_pct']],
+    })
+    table = run_grid_variants(arrays, params, initial_capital=bt.initial_capital,
+                              max_workers=max_workers)
+
+    print("\n" + "=" * 60)
+    print(f"🪜 {symbol} 그리드 변형 비교 ({len(params)}개 변형, {days}일)")
+    print("=" * 60)
+    print(table.head(10).to_string(index=False))
+    return table
+
+def run_portfolio_backtest(symbols: Tuple[str, ...] = ('BTCUSDT', 'ETHUSDT'), days: int = 90,
+                           initial_capital: float = 100, data_dir: str = 'portfolio_data') -> Optional[Dict]:
+    """
+    멀티 심볼 포트폴리오 백테스트 (하나의 지갑/마진 공유, 심볼별 라이브 봇 레버리지/포지션 비율/임계값)
+    지표/신호를 계산한 패널을 data_dir에 .npy로 저장한 뒤 메모리 맵으로 읽어 실행
+    """
+    client = Client('', '')  # API 키 필요
+    frames = {}
+    for symbol in symbols:
+        loaded = load_arrays(symbol, days, 'live', initial_capital=initial_capital, client=client)
+        if loaded is None:
+            return None
+        frames[symbol] = loaded[1]
+
+    save_panel(build_panel(frames), data_dir)
+    panel = load_panel(data_dir, mmap=True)
+    # 지갑을 공유하므로 위험 검사도 하나 (첫 심볼 봇의 한도)
+    risk = RiskEngine(**risk_limits(symbols[0]))
+    result = portfolio_backtest(panel, initial_capital=initial_capital, stop_loss_pct=2.0,
+                                trailing_stop_pct=2.0, risk=risk)
+
+    stats = result['statistics']
+    drawdown = result['drawdown']
+    print("\n" + "=" * 60)
+    print(f"🧺 포트폴리오 백테스트 ({', '.join(symbols)}, {days}일, 공유 자본 ${initial_capital:.2f})")
+    print("=" * 60)
+    print(f"최종 자본: ${result['equity'][-1]:.2f} (총 거래 {stats['total_trades']}회)")
+    print(f"최대 마진 사용: ${result['margin_used'].max():.2f}")
+    print(f"최대 낙폭: {drawdown['max_drawdown']:.2f}% (${drawdown['max_drawdown_usdt']:.2f})")
+    print(f"심볼별 낙폭 합 (완전 상관 가정): ${drawdown['sum_standalone_usdt']:.2f} "
+          f"→ 분산 비율 {drawdown['diversification_ratio']:.2f}")
+    if 'bootstrap_p5' in drawdown:
+        print(f"블록 부트스트랩 최대 낙폭: 중앙 {drawdown['bootstrap_p50']:.2f}% / "
+              f"하위 5% {drawdown['bootstrap_p5']:.2f}%")
+    print("\n심볼별 기여도")
+    print(result['attribution'].to_string())
+    print("\n봉 손익 상관관계")
+    print(result['correlation'].round(2).to_string())
+    return result
+
 if __name__ == '__main__':
     # 백테스팅 실행 (API 키 필요)
     # stats, trades = run_backtest('BTCUSDT', days=90)
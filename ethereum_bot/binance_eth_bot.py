@@ -9,18 +9,35 @@ import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import time
+import threading
+import signal
+import argparse
 from dotenv import load_dotenv
 
 import requests
 import pandas as pd
 import numpy as np
-from binance.client import Client
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 from sys import path as sys_path
 from pathlib import Path
 sys_path.insert(0, str(Path(__file__).parent.parent))
 from shared.indicators import RSI, MACD, SMA, EMA, BBANDS, ATR, find_pivots, detect_bearish_divergence, detect_bullish_divergence
 from shared.telegram_notifier import TelegramNotifier
+from shared.exchange_info import ExchangeInfoCache
+from shared.futures_client import FuturesClient
+from shared.rate_limiter import RateLimiter
+from shared.latency import LatencyRecorder
+from shared.time_sync import TimeSync
+from shared.order_submitter import OrderSubmitter, client_order_id, is_order_ok, order_id
+from shared.user_stream import UserDataStream
+from shared.order_manager import OrderManager, FILLED
+from shared.trailing_stop import TrailingStopManager
+from shared.grid_engine import GridEngine
+from shared.risk_engine import RiskEngine
+from shared.margin_engine import MarginEngine
+from shared.market_stream import MarkPriceStream
+from shared.kill_switch import KillSwitch
+from shared.scoring import MAX_SCORE, RISK_LIMITS, SIZING, THRESHOLDS, short_score, long_score
 
 # .env 파일 로드
 load_dotenv()
@@ -41,20 +58,26 @@ class BotConfig:
 
     # 거래 설정
     INITIAL_BALANCE = 50  # USDT (ETH는 BTC보다 비싸므로 낮게 설정)
-    LEVERAGE = 2  # 초기 레버리지 (2~3배 권장)
-    MAX_LEVERAGE = 5  # 최대 레버리지
+    # 레버리지/포지션 비율/신호 임계값/위험 한도는 백테스터와 같은 shared.scoring 표
+    # (SIZING, THRESHOLDS, RISK_LIMITS)에서 읽음
+    LEVERAGE = SIZING['ETHUSDT'][0]  # 초기 레버리지 (2~3배 권장)
+    MAX_LEVERAGE = RISK_LIMITS['ETHUSDT']['max_leverage']  # 최대 레버리지
     
     # 포지션 사이징
-    POSITION_SIZE_PERCENT = 0.15  # 계좌의 15% 사용
+    POSITION_SIZE_PERCENT = SIZING['ETHUSDT'][1]  # 계좌의 15% 사용
     
     # 손절매/이익실현
     STOP_LOSS_PERCENT = 2.0  # 진입가 대비 손절매 %
     TAKE_PROFIT_PERCENT = 5.0  # 진입가 대비 이익실현 %
     TRAILING_STOP_PERCENT = 2.0  # 최저가 대비 트레일링 스탑 %
+    TRAILING_STOP_MODE = os.getenv('TRAILING_STOP_MODE', 'AMEND')  # 'AMEND' 또는 'NATIVE'(TRAILING_STOP_MARKET)
+    TRAILING_STOP_MIN_TICKS = 10  # AMEND 모드에서 스탑을 옮길 최소 틱 수
 
     # 그리드 매매 설정
-    GRID_NUM = 3      # 그리드 개수
-    GRID_SPACING = 0.5  # 그리드 간격 (%)
+    GRID_NUM = 3      # 그리드 개수 (수백 개까지 가능, 주문 수 한도는 RateLimiter가 조절)
+    GRID_SPACING = 0.5  # 그리드 간격 (PERCENT/GEOMETRIC: %, ATR: ATR 배수)
+    GRID_SPACING_MODE = 'PERCENT'  # 'PERCENT', 'ATR', 'GEOMETRIC'
+    GRID_REARM = False  # 체결된 레벨을 한 칸 안쪽에서 익절 후 다시 배치
 
     # 거래 방향 설정
     TRADING_MODE = os.getenv('TRADING_MODE', 'SHORT')  # 'SHORT' 또는 'LONG'
@@ -64,6 +87,10 @@ class BotConfig:
     RSI_LONG_THRESHOLD = 60   # RSI > 60이면 LONG
     RSI_SHORT_THRESHOLD = 40  # RSI < 40이면 SHORT
 
+    # 신호 임계값 (8점 만점 점수 / 8)
+    SIGNAL_THRESHOLD = THRESHOLDS['ETHUSDT'][0]  # 이 이상이면 SHORT/LONG 신호 (0.50)
+    ENTRY_THRESHOLD = THRESHOLDS['ETHUSDT'][1]   # 이 이상이면 실제 진입 (0.50)
+
     # 추세 감지
     RSI_PERIOD = 14
     RSI_OVERBOUGHT = 70
@@ -81,12 +108,56 @@ class BotConfig:
     CANDLES = 200  # 200개 봉 분석
     
     # 안전 설정
-    MIN_VOLUME_USDT = 10000  # 최소 거래량
-    MAX_DRAWDOWN_PERCENT = 10  # 최대 낙폭
+    MIN_VOLUME_USDT = RISK_LIMITS['ETHUSDT']['min_volume_usdt']  # 최소 거래량
+    MAX_DRAWDOWN_PERCENT = RISK_LIMITS['ETHUSDT']['max_drawdown_percent']  # 최대 낙폭
+    # 주문 1건 최대 명목가치 (USDT, 0이면 제한 없음)
+    MAX_ORDER_NOTIONAL = RISK_LIMITS['ETHUSDT']['max_order_notional']
+    # 심볼별 노출 한도 (자본 대비 %)
+    MAX_SYMBOL_EXPOSURE_PERCENT = RISK_LIMITS['ETHUSDT']['max_symbol_exposure_percent']
+    RISK_CACHE_MAX_AGE = 300  # 사전 위험 검사용 계좌 캐시 유효 시간 (초)
+
+    # 청산 위험 (로컬 계산 마진 비율 = 유지증거금 / 마진 잔고, 100%에서 청산)
+    MARGIN_RATIO_MEDIUM = 30  # %
+    MARGIN_RATIO_HIGH = 50    # % 이상이면 자동 종료
+    MARK_PRICE_STREAM_ENABLED = True  # 마크 가격 스트림으로 1초 단위 위험 평가
     
     # 로깅
     LOG_LEVEL = logging.INFO
 
+    # 거래소 정보 캐시
+    EXCHANGE_INFO_TTL = 3600  # 초 (tickSize/stepSize 등은 자주 바뀌지 않음)
+
+    # 요청 한도 (바이낸스 선물 기본값)
+    RATE_LIMIT_WEIGHT_1M = 2400  # 1분 IP 가중치
+    RATE_LIMIT_ORDERS_10S = 300  # 10초 주문 수
+    RATE_LIMIT_ORDERS_1M = 1200  # 1분 주문 수
+    RATE_LIMIT_SAFETY = 0.8      # 한도의 80%까지만 사용
+
+    # 커넥션 설정
+    HTTP_POOL_SIZE = 10          # keep-alive 커넥션 풀 크기
+    PREWARM_CONNECTIONS = True   # 다음 분석 직전에 커넥션 예열 (False로 두면 예열 전 지연 측정 가능)
+    PREWARM_LEAD_SECONDS = 5     # 분석 몇 초 전에 예열할지
+    CYCLE_SECONDS = 3600         # 분석 주기 (1시간 봉)
+
+    # 서버 시간 동기화
+    TIME_SYNC_INTERVAL = 60      # 초
+    TIME_DRIFT_WARN_MS = 1000    # 오프셋 경고 기준 (recvWindow 10초 대비 여유)
+
+    # REST 복원력
+    REST_MAX_RETRIES = 3         # 조회 요청 재시도 횟수 (주문은 재시도 안 함)
+    REST_BREAKER_THRESHOLD = 5   # 연속 실패 시 서킷 열림
+    REST_BREAKER_RESET = 30      # 서킷 열림 유지 시간 (초)
+
+    # 사용자 데이터 스트림 (체결 즉시 감지, 끊기면 REST 폴링으로 대체)
+    USER_STREAM_ENABLED = True
+
+    # 주문 제출 (모든 주문에 결정적 newClientOrderId 부여)
+    CLIENT_ORDER_PREFIX = 'bot'
+    ORDER_MAX_RETRIES = 2        # 응답 없는 주문을 clientOrderId 확인 후 재전송할 횟수
+
+    # 킬 스위치 (CLI --flatten, SIGUSR1, 위험 한도 초과 시 전체 동시 청산)
+    KILL_SWITCH_WORKERS = 8      # 취소/청산 요청 동시 전송 수
+
 # ============================================================================
 # 로깅 설정
 # ============================================================================
@@ -123,12 +194,86 @@ logger = setup_logger()
 class BinanceETHBot:
     def __init__(self):
         """봇 초기화"""
-        self.client = Client(BotConfig.API_KEY, BotConfig.API_SECRET)
+        self.rate_limiter = RateLimiter(
+            weight_limit=BotConfig.RATE_LIMIT_WEIGHT_1M,
+            order_limit_10s=BotConfig.RATE_LIMIT_ORDERS_10S,
+            order_limit_1m=BotConfig.RATE_LIMIT_ORDERS_1M,
+            safety=BotConfig.RATE_LIMIT_SAFETY
+        )
+        self.latency = LatencyRecorder()  # 엔드포인트별 지연, 신호→주문 지연 등
+        self.client = FuturesClient(
+            BotConfig.API_KEY, BotConfig.API_SECRET,
+            rate_limiter=self.rate_limiter,
+            pool_maxsize=BotConfig.HTTP_POOL_SIZE,
+            latency=self.latency,
+            max_retries=BotConfig.REST_MAX_RETRIES,
+            breaker_threshold=BotConfig.REST_BREAKER_THRESHOLD,
+            breaker_reset=BotConfig.REST_BREAKER_RESET
+        )
+        self.last_account_info = None  # 조회 실패 시 사용할 마지막 정상 계좌 정보
+        self.last_prices: Dict[str, float] = {}  # 현재가 조회 실패 시 사용할 마지막 정상 현재가
+        self.order_submitter = OrderSubmitter(self.client, max_retries=BotConfig.ORDER_MAX_RETRIES)
+
+        # 사용자 스트림 이벤트는 별도 스레드에서 들어오므로 포지션 상태 변경은 잠금 후 처리
+        self._state_lock = threading.RLock()
+        self.orders = OrderManager(self.client, on_update=self._on_order_change, lock=self._state_lock)
+        self.stream_balances = {}       # 자산 -> 지갑 잔고 (ACCOUNT_UPDATE)
+        self.user_stream = UserDataStream(
+            self.client,
+            on_order_update=self.orders.apply_update,
+            on_account_update=self._on_account_update,
+            on_algo_update=self.orders.apply_algo_update
+        )
+
+        # 서버 시간 오프셋을 모든 서명 요청에 반영
+        self.time_sync = TimeSync(
+            self.client,
+            interval=BotConfig.TIME_SYNC_INTERVAL,
+            drift_warn_ms=BotConfig.TIME_DRIFT_WARN_MS
+        )
+        self.client.time_sync = self.time_sync
+        self.time_sync.sync_once()
+        self.time_sync.start()
         self.positions = {}  # 활성 포지션 추적
+        # clientOrderId 고유화용: 실행 세션, 봇 자체 분석 주기 카운터, 심볼별 포지션 번호
+        self.session_id = int(time.time())
+        self.cycle = 0
+        self.position_seq: Dict[str, int] = {}
         self.trades_history = []  # 거래 기록
         self.account_balance = BotConfig.INITIAL_BALANCE
         self.current_mode = BotConfig.TRADING_MODE  # 현재 거래 모드
         self.mode_switch_count = 0  # 모드 전환 횟수
+        self.exchange_info = ExchangeInfoCache(self.client, ttl=BotConfig.EXCHANGE_INFO_TTL)
+        self.risk = RiskEngine(
+            max_drawdown_percent=BotConfig.MAX_DRAWDOWN_PERCENT,
+            min_volume_usdt=BotConfig.MIN_VOLUME_USDT,
+            max_leverage=BotConfig.MAX_LEVERAGE,
+            max_order_notional=BotConfig.MAX_ORDER_NOTIONAL,
+            max_symbol_exposure_percent=BotConfig.MAX_SYMBOL_EXPOSURE_PERCENT,
+            exchange_info=self.exchange_info
+        )
+        self.margin = MarginEngine(self.exchange_info)
+        self._risk_closing = set()  # 마크 가격 스트림에서 종료를 시작한 심볼
+        self.mark_stream = MarkPriceStream(BotConfig.SYMBOLS, on_mark_price=self._on_mark_price)
+        self.grid_engine = GridEngine(
+            self.order_submitter, self.orders, self.exchange_info,
+            client_id=self._client_order_id, rearm=BotConfig.GRID_REARM, lock=self._state_lock
+        )
+        self.trailing_stops = TrailingStopManager(
+            self.order_submitter, self.orders, self.exchange_info,
+            mode=BotConfig.TRAILING_STOP_MODE,
+            trail_percent=BotConfig.TRAILING_STOP_PERCENT,
+            min_ticks=BotConfig.TRAILING_STOP_MIN_TICKS,
+            client_id=self._client_order_id,
+            lock=self._state_lock
+        )
+        self.kill_switch = KillSwitch(
+            self.client, self.order_submitter,
+            hedge_mode=True,  # 양방향 포지션 모드 (_initialize_futures_account)
+            max_workers=BotConfig.KILL_SWITCH_WORKERS,
+            client_id=self._client_order_id
+        )
+        self._flatten_lock = threading.Lock()
 
         # 바이낸스 선물 계좌 초기화
         try:
@@ -154,6 +299,20 @@ class BinanceETHBot:
             else:
                 logger.warning(f"계좌 설정 경고: {e}")
 
+        # 재시작 전에 낸 미체결 주문도 색인에 등록 (종료 시 지정 취소 대상)
+        for symbol in BotConfig.SYMBOLS:
+            try:
+                synced = self.orders.sync(symbol)
+                if synced:
+                    logger.info(f"{symbol} 기존 미체결 주문 {synced}건 인계")
+            except Exception as e:
+                logger.warning(f"{symbol} 미체결 주문 동기화 실패: {e}")
+
+        # 로컬 마진 계산 초기값 (이후 사용자/마크 가격 스트림으로 갱신)
+        self.get_account_info()
+        for symbol in BotConfig.SYMBOLS:
+            self.get_position(symbol)
+
     def check_and_switch_mode(self, rsi: float) -> bool:
         """
         RSI 기반 자동 모드 전환
@@ -196,15 +355,29 @@ class BinanceETHBot:
         """계좌 정보 조회"""
         try:
             account = self.client.futures_account()
-            return {
+            with self._state_lock:
+                for asset in account.get('assets', []):
+                    if asset.get('asset') == self.margin.asset:
+                        self.margin.update_balance(float(asset['crossWalletBalance']))
+                margin_level = self.margin.margin_level()
+            self.last_account_info = {
                 'balance': float(account.get('totalWalletBalance', 0)),
                 'unrealized_pnl': float(account.get('totalUnrealizedProfit', 0)),
-                'margin_level': float(account.get('marginLevel', 100.0)),
+                'margin_level': margin_level,  # USDT-M 계좌에는 marginLevel이 없으므로 로컬 계산
                 'available_balance': float(account.get('availableBalance', 0)),
                 'timestamp': datetime.now().isoformat()
             }
+            self.risk.update_equity(
+                self.last_account_info['balance'] + self.last_account_info['unrealized_pnl'],
+                self.last_account_info['available_balance']
+            )
+            return self.last_account_info
         except Exception as e:
             logger.error(f"계좌 정보 조회 실패: {e}")
+            # 재시도 후에도 실패하면 잔액 0 대신 마지막 정상 값 사용
+            if self.last_account_info:
+                logger.warning(f"  마지막 계좌 정보 사용 ({self.last_account_info['timestamp']})")
+                return dict(self.last_account_info, stale=True)
             return {
                 'balance': 0,
                 'unrealized_pnl': 0,
@@ -217,6 +390,7 @@ class BinanceETHBot:
         """현재 포지션 조회"""
         try:
             positions = self.client.futures_position_information(symbol=symbol)
+            self._sync_margin_positions(positions)
             for pos in positions:
                 if float(pos['positionAmt']) != 0:  # 포지션 보유 중
                     return {
@@ -235,6 +409,18 @@ class BinanceETHBot:
             logger.error(f"{symbol} 포지션 조회 실패: {e}")
             return None
     
+    def _sync_margin_positions(self, positions: List[Dict]):
+        """positionRisk 응답으로 로컬 마진 계산기 갱신 (스트림이 끊겼을 때 마크 가격도)"""
+        with self._state_lock:
+            for pos in positions:
+                self.margin.update_position(
+                    pos['symbol'], pos.get('positionSide', 'BOTH'),
+                    float(pos['positionAmt']), float(pos['entryPrice']),
+                    pos.get('marginType', 'cross'), float(pos.get('isolatedWallet', 0))
+                )
+                if not self.mark_stream.is_alive():
+                    self.margin.update_mark_price(pos['symbol'], float(pos['markPrice']))
+
     def get_klines(self, symbol: str, interval: str = '1h', limit: int = 200) -> pd.DataFrame:
         """캔들 데이터 조회"""
         try:
@@ -341,37 +527,23 @@ class BinanceETHBot:
         if not indicators:
             return 'HOLD', 0.0
 
-        signal_score = 0
-        max_score = 8
-
-        # RSI 약세 신호 (하락장)
-        if indicators['rsi'] > BotConfig.RSI_OVERBOUGHT:
-            signal_score += 2
-        elif indicators['rsi'] > 65:
-            signal_score += 1
-
-        # MACD 약세 신호
-        if indicators['macd'] < indicators['macd_signal']:
-            signal_score += 1
-            if indicators['macd_histogram'] < 0 and indicators['macd_histogram'] < indicators.get('prev_macd_hist', 0):
-                signal_score += 1
-
-        # 가격이 상단 볼린저밴드에 가까운 경우
-        if indicators['current_price'] > indicators['bb_mid']:
-            if indicators['current_price'] > indicators['sma_20']:
-                signal_score += 1
-
         # RSI 베어리쉬 다이버전스 신호
         bearish_div = detect_bearish_divergence(
             indicators.get('price_pivot_highs', []),
             indicators.get('rsi_pivot_highs', [])
         )
         if bearish_div:
-            signal_score += 2
             logger.info(f"  ⚡ RSI 베어리쉬 다이버전스 감지!")
 
-        confidence = signal_score / max_score
-        if confidence >= 0.50:
+        # RSI(+2/+1), MACD(+1, 히스토그램 +1), 볼린저 중심선/SMA20 위(+1), 다이버전스(+2)
+        signal_score = int(short_score(
+            indicators['rsi'], indicators['macd'], indicators['macd_signal'], indicators['macd_histogram'],
+            indicators['current_price'], indicators['bb_mid'], indicators['sma_20'], bearish_div,
+            prev_macd_hist=indicators.get('prev_macd_hist', 0), overbought=BotConfig.RSI_OVERBOUGHT
+        ))
+
+        confidence = signal_score / MAX_SCORE
+        if confidence >= BotConfig.SIGNAL_THRESHOLD:
             return 'SHORT', min(confidence, 1.0)
         else:
             return 'HOLD', confidence
@@ -384,61 +556,48 @@ class BinanceETHBot:
         if not indicators:
             return 'HOLD', 0.0
 
-        signal_score = 0
-        max_score = 8
-
-        # RSI 강세 신호 (상승장)
-        if indicators['rsi'] < BotConfig.RSI_OVERSOLD:
-            signal_score += 2
-        elif indicators['rsi'] < 35:
-            signal_score += 1
-
-        # MACD 강세 신호
-        if indicators['macd'] > indicators['macd_signal']:
-            signal_score += 1
-            if indicators['macd_histogram'] > 0 and indicators['macd_histogram'] > indicators.get('prev_macd_hist', 0):
-                signal_score += 1
-
-        # 가격이 하단 볼린저밴드에 가까운 경우
-        if indicators['current_price'] < indicators['bb_mid']:
-            if indicators['current_price'] < indicators['sma_20']:
-                signal_score += 1
-
         # RSI 불리시 다이버전스 신호
         bullish_div = detect_bullish_divergence(
             indicators.get('price_pivot_lows', []),
             indicators.get('rsi_pivot_lows', [])
         )
         if bullish_div:
-            signal_score += 2
             logger.info(f"  ⚡ RSI 불리시 다이버전스 감지!")
 
-        confidence = signal_score / max_score
-        if confidence >= 0.50:
+        # RSI(+2/+1), MACD(+1, 히스토그램 +1), 볼린저 중심선/SMA20 아래(+1), 다이버전스(+2)
+        signal_score = int(long_score(
+            indicators['rsi'], indicators['macd'], indicators['macd_signal'], indicators['macd_histogram'],
+            indicators['current_price'], indicators['bb_mid'], indicators['sma_20'], bullish_div,
+            prev_macd_hist=indicators.get('prev_macd_hist', 0), oversold=BotConfig.RSI_OVERSOLD
+        ))
+
+        confidence = signal_score / MAX_SCORE
+        if confidence >= BotConfig.SIGNAL_THRESHOLD:
             return 'LONG', min(confidence, 1.0)
         else:
             return 'HOLD', confidence
     
-    def calculate_position_size(self, symbol: str, leverage: int = 2) -> float:
+    def calculate_position_size(self, symbol: str, leverage: int = 2, price: Optional[float] = None) -> float:
         """
         포지션 크기 계산
         청산 위험을 최소화하는 보수적 계산
         """
         try:
-            account_info = self.get_account_info()
-            available_balance = account_info['available_balance']
+            available_balance = self._available_balance()
             
             # 계좌의 일정 % 사용
             position_value = available_balance * BotConfig.POSITION_SIZE_PERCENT / leverage
             
-            # 최소 포지션 체크
-            symbol_info = self.client.futures_exchange_info()
-            for symbol_data in symbol_info['symbols']:
-                if symbol_data['symbol'] == symbol:
-                    min_qty = float(symbol_data['filters'][1]['minQty'])
-                    if position_value / self._get_current_price(symbol) < min_qty:
-                        logger.warning(f"{symbol} 최소 포지션 미만")
-                        return 0
+            # 최소 포지션 체크 (캐시된 필터 사용)
+            if price is None:
+                price = self._get_current_price(symbol)
+            if price <= 0:
+                return 0
+            quantity = self.exchange_info.quantize_qty(symbol, position_value / price)
+            reject_reason = self.exchange_info.check_order(symbol, quantity, price)
+            if reject_reason:
+                logger.warning(f"{symbol} 최소 포지션 미만: {reject_reason}")
+                return 0
             
             return position_value
         
@@ -446,15 +605,54 @@ class BinanceETHBot:
             logger.error(f"포지션 크기 계산 실패: {e}")
             return 0
     
+    def _available_balance(self) -> float:
+        """가용 잔고 (최근 계좌 조회 캐시 사용, 오래됐을 때만 REST 조회)"""
+        if self.risk.available_margin is None or self.risk.is_stale(BotConfig.RISK_CACHE_MAX_AGE):
+            self.get_account_info()
+        return self.risk.available_margin or 0.0
+
+    def _update_volume(self, symbol: str):
+        """24시간 거래대금 갱신 (주기당 1회, 사전 위험 검사용)"""
+        try:
+            ticker = self.client.futures_ticker(symbol=symbol)
+            self.risk.update_volume(symbol, float(ticker['quoteVolume']))
+        except Exception as e:
+            logger.debug(f"{symbol} 24시간 거래량 조회 실패: {e}")
+
     def _get_current_price(self, symbol: str) -> float:
-        """현재가 조회"""
+        """현재가 조회 (실패 시 마크 가격 스트림 → 마지막 정상 현재가 순으로 대체)"""
         try:
             ticker = self.client.futures_symbol_ticker(symbol=symbol)
-            return float(ticker['price'])
+            price = float(ticker['price'])
+            self.last_prices[symbol] = price
+            return price
         except Exception as e:
             logger.error(f"{symbol} 현재가 조회 실패: {e}")
+            # 재시도 후에도 실패하면 0 대신 MarkPriceStream이 채운 마크 가격이나 마지막 정상 값 사용
+            mark = self.margin.mark_prices.get(symbol)
+            if mark:
+                logger.warning(f"  {symbol} 마크 가격으로 대체 (오래된 값일 수 있음): {mark}")
+                return mark
+            last = self.last_prices.get(symbol)
+            if last:
+                logger.warning(f"  {symbol} 마지막 현재가로 대체 (오래된 값): {last}")
+                return last
             return 0
     
+    def _client_order_id(self, symbol: str, purpose: str, *parts) -> str:
+        """
+        주문 의도로 만든 clientOrderId
+        재전송은 같은 ID → 응답 없이 다시 보내도 중복 진입 없음
+        실행 세션 / 분석 주기 카운터 / 포지션 번호를 넣어 다른 시점의 같은 주문(같은 수량/사유의 청산 등)과는
+        겹치지 않음 (거래소는 미체결 주문끼리만 중복을 막으므로 이전에 체결된 주문으로 오인하지 않도록)
+        """
+        return client_order_id(symbol, self.session_id, self.cycle, self.position_seq.get(symbol, 0),
+                               purpose, *parts, prefix=BotConfig.CLIENT_ORDER_PREFIX)
+
+    def _next_position(self, symbol: str):
+        """새 포지션 진입 시작 (이후 주문 ID는 이 포지션 번호 사용)"""
+        self.position_seq[symbol] = self.position_seq.get(symbol, 0) + 1
+
     def open_short_position(self, symbol: str, leverage: int = 2) -> Optional[Dict]:
         """
         숏 포지션 개설
@@ -472,60 +670,82 @@ class BinanceETHBot:
                 return None
             
             # 포지션 크기 계산
-            position_value = self.calculate_position_size(symbol, leverage)
+            position_value = self.calculate_position_size(symbol, leverage, price=current_price)
             if position_value <= 0:
                 logger.error(f"{symbol} 포지션 크기 계산 실패")
                 return None
             
-            quantity = position_value / current_price
+            quantity = self.exchange_info.quantize_qty(symbol, position_value / current_price)
+
+            # 사전 위험 검사 (캐시된 상태만 사용)
+            reject_reason = self.risk.check(symbol, quantity * current_price, leverage)
+            if reject_reason:
+                logger.warning(f"{symbol} 진입 거부: {reject_reason}")
+                return None
             
             # 레버리지 설정
             self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
             logger.info(f"{symbol} 레버리지 설정: {leverage}x")
+            self._next_position(symbol)
             
             # 손절매 계산
-            stop_loss_price = current_price * (1 + BotConfig.STOP_LOSS_PERCENT / 100)
-            take_profit_price = current_price * (1 - BotConfig.TAKE_PROFIT_PERCENT / 100)
+            stop_loss_price, take_profit_price = self.exchange_info.quantize_price(symbol, [
+                current_price * (1 + BotConfig.STOP_LOSS_PERCENT / 100),
+                current_price * (1 - BotConfig.TAKE_PROFIT_PERCENT / 100)
+            ]).tolist()
+
+            # 보호 주문은 진입 전에 미리 만들어 두고 진입 응답 직후 동시에 전송 (조건부 주문 → algoOrder)
+            protective_orders = [
+                {
+                    'symbol': symbol,
+                    'side': 'BUY',
+                    'positionSide': 'SHORT',
+                    'type': 'STOP_MARKET',
+                    'quantity': quantity,
+                    'stopPrice': stop_loss_price,
+                    'newClientOrderId': self._client_order_id(symbol, 'stop_loss', 'SHORT', stop_loss_price)
+                },
+                {
+                    'symbol': symbol,
+                    'side': 'BUY',
+                    'positionSide': 'SHORT',
+                    'type': 'TAKE_PROFIT_MARKET',
+                    'quantity': quantity,
+                    'stopPrice': take_profit_price,
+                    'newClientOrderId': self._client_order_id(symbol, 'take_profit', 'SHORT', take_profit_price)
+                }
+            ]
             
             # 숏 포지션 개설
             # 주문 1: 숏 진입
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side='SELL',
-                positionSide='SHORT',
-                type='MARKET',
-                quantity=quantity
-            )
+            entry_started = time.perf_counter()
+            order = self.order_submitter.create_order({
+                'symbol': symbol,
+                'side': 'SELL',
+                'positionSide': 'SHORT',
+                'type': 'MARKET',
+                'quantity': quantity,
+                'newClientOrderId': self._client_order_id(symbol, 'entry', 'SHORT', quantity)
+            })
+            if not is_order_ok(order):
+                logger.error(f"{symbol} 숏 진입 실패: {order.get('msg')}")
+                return None
             
+            # 주문 2, 3: 손절매 + 이익실현 (로그/등록보다 먼저 전송)
+            stop_loss_order, take_profit_order = self._place_protection(symbol, protective_orders, entry_started)
+
+            self.orders.track(order, tag='entry')
             logger.info(f"숏 진입: {symbol} {quantity:.4f}개 @ {current_price}")
-            
-            # 주문 2: 손절매 (TP/SL 주문)
-            try:
-                stop_loss_order = self.client.futures_create_order(
-                    symbol=symbol,
-                    side='BUY',
-                    positionSide='SHORT',
-                    type='STOP_MARKET',
-                    quantity=quantity,
-                    stopPrice=stop_loss_price
-                )
+            if is_order_ok(stop_loss_order):
+                self.orders.track(stop_loss_order, tag='stop_loss')
                 logger.info(f"손절매 설정: {symbol} {stop_loss_price}")
-            except Exception as e:
-                logger.warning(f"손절매 설정 실패: {e}")
-            
-            # 주문 3: 이익실현
-            try:
-                take_profit_order = self.client.futures_create_order(
-                    symbol=symbol,
-                    side='BUY',
-                    positionSide='SHORT',
-                    type='TAKE_PROFIT_MARKET',
-                    quantity=quantity,
-                    stopPrice=take_profit_price
-                )
+            else:
+                logger.warning(f"손절매 설정 실패: {stop_loss_order.get('msg')}")
+            if is_order_ok(take_profit_order):
+                self.orders.track(take_profit_order, tag='take_profit')
                 logger.info(f"이익실현 설정: {symbol} {take_profit_price}")
-            except Exception as e:
-                logger.warning(f"이익실현 설정 실패: {e}")
+            else:
+                logger.warning(f"이익실현 설정 실패: {take_profit_order.get('msg')}")
             
             # 포지션 기록
             self.positions[symbol] = {
@@ -538,8 +758,9 @@ class BinanceETHBot:
                 'status': 'OPEN',
                 'lowest_price_seen': current_price,  # 트레일링 스탑용 최저가 추적
                 'trailing_stop': stop_loss_price,    # 현재 트레일링 스탑 레벨
-                'stop_order_id': stop_loss_order.get('orderId') if 'stop_loss_order' in locals() else None  # 기존 STOP 주문 ID
+                'stop_order_id': order_id(stop_loss_order)  # 기존 STOP 주문 algoId (실패 시 None)
             }
+            self.risk.update_exposure(symbol, quantity * current_price)
             
             return {
                 'symbol': symbol,
@@ -560,14 +781,46 @@ class BinanceETHBot:
             logger.error(f"{symbol} 숏 진입 중 오류: {e}")
             return None
 
-    def open_grid_position(self, symbol: str, leverage: int = 2, side: str = 'SHORT') -> Optional[Dict]:
+    def _place_protection(self, symbol: str, protective_orders: List[Dict], entry_started: float) -> List[Dict]:
+        """
+        진입 직후 보호 주문(손절매/이익실현) 전송
+        조건부 주문이라 algoOrder로 건별 동시 전송되고 algoId/clientAlgoId로 추적
+        실패한 주문은 같은 clientAlgoId로 한 번 더 보내고, 모두 접수되면 진입→보호 완료 지연을 기록
+
+        Args:
+            symbol: 거래쌍
+            protective_orders: 미리 만든 주문 목록
+            entry_started: 진입 주문 전송 시각 (time.perf_counter)
+
+        Returns:
+            protective_orders와 같은 순서의 결과 목록
+        """
+        results = self.order_submitter.submit_batch(protective_orders)
+        retry = [i for i, result in enumerate(results) if not is_order_ok(result)]
+        if retry:
+            retried = self.order_submitter.submit_batch([protective_orders[i] for i in retry])
+            for i, result in zip(retry, retried):
+                results[i] = result
+
+        if all(is_order_ok(result) for result in results):
+            self.latency.record('entry_to_protected', time.perf_counter() - entry_started)
+        else:
+            logger.error(f"🚨 {symbol} 보호 주문 일부 실패 - 포지션이 보호되지 않음")
+        return results
+
+    def open_grid_position(self, symbol: str, leverage: int = 2, side: str = 'SHORT',
+                           signal_time: Optional[float] = None, atr: float = 0.0,
+                           price: Optional[float] = None) -> Optional[Dict]:
         """
         그리드 매매로 포지션 진입 (SHORT 또는 LONG)
-        - SHORT: 현재가 위에 3개 레벨의 LIMIT SELL 주문
-        - LONG: 현재가 아래에 3개 레벨의 LIMIT BUY 주문
+        - SHORT: 현재가 위에 GRID_NUM개 레벨의 LIMIT SELL 주문
+        - LONG: 현재가 아래에 GRID_NUM개 레벨의 LIMIT BUY 주문
+        signal_time: 신호 감지 시각 (time.perf_counter), 첫 주문 체결 응답까지 지연 기록용
+        atr: GRID_SPACING_MODE가 'ATR'일 때 간격 기준
+        price: 방금 분석한 현재가 (주어지면 시세 조회 생략)
         """
         try:
-            current_price = self._get_current_price(symbol)
+            current_price = price or self._get_current_price(symbol)
             if current_price <= 0:
                 logger.error(f"{symbol} 현재가를 가져올 수 없음")
                 return None
@@ -578,93 +831,81 @@ class BinanceETHBot:
                 logger.warning(f"{symbol}에 이미 포지션 존재")
                 return None
 
+            # 포지션 크기 계산 및 사전 위험 검사 (캐시된 상태만 사용)
+            available_balance = self._available_balance()
+            total_value = available_balance * BotConfig.POSITION_SIZE_PERCENT / leverage
+            reject_reason = self.risk.check(symbol, total_value, leverage)
+            if reject_reason:
+                logger.warning(f"{symbol} 진입 거부: {reject_reason}")
+                return None
+
             # 레버리지 설정
             self.client.futures_change_leverage(symbol=symbol, leverage=leverage)
 
-            # 포지션 크기 계산
-            account_info = self.get_account_info()
-            available_balance = account_info['available_balance']
-            total_value = available_balance * BotConfig.POSITION_SIZE_PERCENT / leverage
-            unit_value = total_value / BotConfig.GRID_NUM
+            # 그리드 레벨 생성 (간격 방식: PERCENT/ATR/GEOMETRIC)
+            # LONG: 현재가 아래로 배치, SHORT: 현재가 위로 배치
+            level_specs, farthest_price = self.grid_engine.build(
+                symbol, side, current_price, total_value, BotConfig.GRID_NUM,
+                BotConfig.GRID_SPACING, mode=BotConfig.GRID_SPACING_MODE, atr=atr
+            )
 
-            # 손절매/익절 가격 결정 (side에 따라)
+            # 손절매/익절 가격 결정 (손절매는 가장 먼 레벨에서 STOP_LOSS_PERCENT 바깥)
             if side == 'LONG':
                 # LONG: 손절매는 아래(-), 익절은 위(+)
-                stop_loss_price = round(
-                    current_price * (1 - BotConfig.STOP_LOSS_PERCENT / 100) *
-                    (1 - BotConfig.GRID_SPACING * BotConfig.GRID_NUM / 100), 2
-                )
-                take_profit_price = round(current_price * (1 + BotConfig.TAKE_PROFIT_PERCENT / 100), 2)
+                stop_loss_price, take_profit_price = self.exchange_info.quantize_price(symbol, [
+                    farthest_price * (1 - BotConfig.STOP_LOSS_PERCENT / 100),
+                    current_price * (1 + BotConfig.TAKE_PROFIT_PERCENT / 100)
+                ]).tolist()
             else:  # SHORT
                 # SHORT: 손절매는 위(+), 익절은 아래(-)
-                stop_loss_price = round(
-                    current_price * (1 + BotConfig.STOP_LOSS_PERCENT / 100) *
-                    (1 + BotConfig.GRID_SPACING * BotConfig.GRID_NUM / 100), 2
-                )
-                take_profit_price = round(current_price * (1 - BotConfig.TAKE_PROFIT_PERCENT / 100), 2)
+                stop_loss_price, take_profit_price = self.exchange_info.quantize_price(symbol, [
+                    farthest_price * (1 + BotConfig.STOP_LOSS_PERCENT / 100),
+                    current_price * (1 - BotConfig.TAKE_PROFIT_PERCENT / 100)
+                ]).tolist()
 
-            # 그리드 레벨 생성 및 주문 배치
-            grid_levels = []
             mode_str = "롱" if side == 'LONG' else "숏"
             logger.info(f"🔗 {symbol} {mode_str} 그리드 매매 시작 (현재가: {current_price:.2f})")
 
-            for i in range(1, BotConfig.GRID_NUM + 1):
-                if side == 'LONG':
-                    # LONG: 현재가 아래로 배치 (-0.5%, -1.0%, -1.5%)
-                    level_price = round(current_price * (1 - BotConfig.GRID_SPACING * i / 100), 2)
-                    order_side = 'BUY'
-                else:
-                    # SHORT: 현재가 위로 배치 (+0.5%, +1.0%, +1.5%)
-                    level_price = round(current_price * (1 + BotConfig.GRID_SPACING * i / 100), 2)
-                    order_side = 'SELL'
-
-                unit_qty = round(unit_value / level_price, 4)
-
-                # LIMIT 주문
-                try:
-                    order = self.client.futures_create_order(
-                        symbol=symbol,
-                        side=order_side,
-                        positionSide=side,
-                        type='LIMIT',
-                        timeInForce='GTC',
-                        price=level_price,
-                        quantity=unit_qty
-                    )
-                    grid_levels.append({
-                        'price': level_price,
-                        'quantity': unit_qty,
-                        'order_id': order['orderId'],
-                        'filled': False
-                    })
-                    logger.info(f"  📐 그리드 {i}: {level_price:.2f} USDT x {unit_qty}")
-                except Exception as e:
-                    logger.error(f"  그리드 {i} 주문 실패: {e}")
-                    continue
+            # LIMIT 주문을 batchOrders로 일괄 제출
+            self._next_position(symbol)
+            placement_started = time.perf_counter()
+            grid_levels, level_acks = self.grid_engine.place(symbol, side, level_specs)
+            self.latency.record('grid_placement', time.perf_counter() - placement_started)
+            if grid_levels and signal_time is not None:
+                self.latency.record('signal_to_order', time.perf_counter() - signal_time)
+            for level in grid_levels[:10]:
+                logger.info(f"  📐 그리드 {level['level']}: {level['price']:.2f} USDT x {level['quantity']}")
+            if len(grid_levels) > 10:
+                logger.info(f"  📐 ... 외 {len(grid_levels) - 10}개 (마지막: {grid_levels[-1]['price']:.2f} USDT)")
 
             if not grid_levels:
                 logger.error(f"{symbol} 그리드 주문 모두 실패")
                 return None
 
             # 포지션 기록 (초기 상태)
-            self.positions[symbol] = {
-                'entry_price': 0.0,  # 체결될 때 업데이트
-                'quantity': 0.0,
-                'leverage': leverage,
-                'entry_time': datetime.now(),
-                'stop_loss': stop_loss_price,
-                'take_profit': take_profit_price,
-                'status': 'GRID_OPEN',
-                'lowest_price_seen': current_price if side == 'SHORT' else float('inf'),
-                'highest_price_seen': float('-inf') if side == 'SHORT' else current_price,
-                'trailing_stop': stop_loss_price,
-                'stop_order_id': None,
-                # 그리드 전용 필드
-                'side': side,  # 포지션 방향 기록
-                'grid_levels': grid_levels,
-                'grid_filled_count': 0,
-                'grid_unit_qty': unit_qty
-            }
+            with self._state_lock:
+                self.positions[symbol] = {
+                    'entry_price': 0.0,  # 체결될 때 업데이트
+                    'quantity': 0.0,
+                    'leverage': leverage,
+                    'entry_time': datetime.now(),
+                    'stop_loss': stop_loss_price,
+                    'take_profit': take_profit_price,
+                    'status': 'GRID_OPEN',
+                    'lowest_price_seen': current_price if side == 'SHORT' else float('inf'),
+                    'highest_price_seen': float('-inf') if side == 'SHORT' else current_price,
+                    'trailing_stop': stop_loss_price,
+                    'stop_order_id': None,
+                    # 그리드 전용 필드
+                    'side': side,  # 포지션 방향 기록
+                    'grid_levels': grid_levels,
+                    'grid_filled_count': 0,
+                    'grid_unit_qty': grid_levels[-1]['quantity']
+                }
+                self.risk.update_exposure(symbol, sum(l['price'] * l['quantity'] for l in grid_levels))
+                # 체결 이벤트를 orderId로 바로 찾도록 등록 (먼저 도착한 이벤트는 여기서 반영)
+                for index, order in enumerate(level_acks):
+                    self.orders.track(order, tag='grid', level=index)
 
             logger.info(f"✅ {symbol} {mode_str} 그리드 배치 완료 (레벨: {len(grid_levels)}개)")
             return self.positions[symbol]
@@ -673,6 +914,138 @@ class BinanceETHBot:
             logger.error(f"{symbol} 그리드 포지션 진입 실패: {e}")
             return None
 
+    def _apply_grid_fill(self, symbol: str, level: Dict, delta: float, fill_price: float, done: bool):
+        """
+        그리드 레벨 체결 반영 (부분 체결 포함)
+        평균 진입가는 새로 체결된 수량(delta)만큼 증분 갱신 (VWAP)
+        """
+        pos = self.positions.get(symbol)
+        if not pos:
+            return
+        if delta > 0:
+            new_quantity = pos['quantity'] + delta
+            pos['entry_price'] = (pos['entry_price'] * pos['quantity'] + fill_price * delta) / new_quantity
+            pos['quantity'] = new_quantity
+            level['filled_qty'] += delta
+
+        if done and not level['filled']:
+            level['filled'] = True
+            pos['grid_filled_count'] += 1
+            logger.info(f"  ✅ 그리드 체결! ({pos['grid_filled_count']}/{len(pos['grid_levels'])}) 평균 진입가: {pos['entry_price']:.2f}")
+
+            # 모든 그리드가 체결되면 상태 변경
+            if pos['grid_filled_count'] == len(pos['grid_levels']):
+                pos['status'] = 'OPEN'
+                logger.info(f"  🎯 모든 그리드 체결 완료!")
+
+    def _poll_grid_fills(self, symbol: str):
+        """사용자 스트림이 없을 때 미체결 그리드 주문을 REST로 확인"""
+        for record in self.orders.open_orders(symbol, tag='grid'):
+            try:
+                order_status = self.client.futures_get_order(symbol=symbol, orderId=record.order_id)
+                self.orders.apply_rest(order_status)
+            except Exception as e:
+                logger.debug(f"  그리드 주문 상태 조회 실패: {e}")
+
+    def _on_order_change(self, record, delta: float, fill_price: float):
+        """
+        OrderManager 콜백 (스트림/폴링/주문 응답 어느 경로든 같은 처리)
+        state_lock을 잡은 상태로 호출되므로 REST 주문은 내지 않음
+        (그리드 재무장/익절 주문은 GridEngine 큐에 넣고 전송 스레드가 잠금 밖에서 전송)
+        """
+        if record.tag in ('grid', 'grid_exit'):
+            pos = self.positions.get(record.symbol)
+            if not pos or record.level is None or record.level >= len(pos.get('grid_levels', [])):
+                return
+            level = pos['grid_levels'][record.level]
+            if record.tag == 'grid' and record.order_id == level['order_id']:
+                was_filled = level['filled']
+                self._apply_grid_fill(record.symbol, level, delta, fill_price, record.status == FILLED)
+                if level['filled'] and not was_filled:
+                    self.grid_engine.on_level_filled(record.symbol, pos, record.level)
+            elif record.tag == 'grid_exit' and record.order_id == level['exit_order_id']:
+                self.grid_engine.on_exit_filled(record.symbol, pos, record.level, delta, record.status == FILLED)
+        elif record.tag in ('stop_loss', 'take_profit') and record.status == FILLED:
+            logger.info(f"  {record.symbol} {record.tag} 주문 체결 @ {record.avg_price:.2f}")
+
+    def _on_account_update(self, update: Dict):
+        """ACCOUNT_UPDATE 처리 (지갑 잔고, 포지션 → 로컬 마진 계산)"""
+        with self._state_lock:
+            self.margin.apply_account_update(update)
+            for balance in update.get('B', []):
+                self.stream_balances[balance['a']] = {
+                    'wallet_balance': float(balance['wb']),
+                    'cross_wallet_balance': float(balance['cw'])
+                }
+
+    def _on_mark_price(self, symbol: str, price: float):
+        """
+        마크 가격 스트림 콜백 (1초 단위)
+        마진 비율이 한도를 넘으면 다음 분석 주기를 기다리지 않고 바로 종료
+        """
+        with self._state_lock:
+            self.margin.update_mark_price(symbol, price)
+            # 지갑 잔고를 아직 모르면 (첫 계좌 조회 전) 판단하지 않음
+            if self.margin.wallet_balance <= 0 or not any(s == symbol for s, _ in self.margin.positions):
+                return
+            margin_ratio = self.margin.margin_ratio()
+            if margin_ratio < BotConfig.MARGIN_RATIO_HIGH or symbol in self._risk_closing:
+                return
+            self._risk_closing.add(symbol)
+
+        logger.warning(f"🚨 {symbol} 청산 위험 HIGH (마진 비율: {margin_ratio:.2f}%) - 즉시 종료")
+        threading.Thread(target=self._close_for_risk, args=(symbol,), daemon=True).start()
+
+    def _close_for_risk(self, symbol: str):
+        # 교차 마진 비율은 계좌 전체 기준이므로 모든 포지션을 동시에 청산
+        try:
+            self.flatten_all("AUTO_CLOSE_RISK")
+        finally:
+            with self._state_lock:
+                self._risk_closing.discard(symbol)
+
+    def flatten_all(self, reason: str = "KILL_SWITCH") -> Optional[Dict]:
+        """
+        전체 긴급 청산 (미체결 주문 취소 + 모든 심볼/방향 시장가 청산을 동시에 전송)
+
+        Returns:
+            킬 스위치 결과, 이미 청산 중이면 None
+        """
+        if not self._flatten_lock.acquire(blocking=False):
+            logger.warning("이미 전체 청산 진행 중")
+            return None
+        try:
+            result = self.kill_switch.flatten_all(reason, symbols=BotConfig.SYMBOLS)
+            remaining = {p['symbol'] for p in result['remaining']}
+
+            with self._state_lock:
+                for symbol, pos in self.positions.items():
+                    if pos.get('status') == 'CLOSED' or symbol in remaining:
+                        continue
+                    pos['status'] = 'CLOSED'
+                    pos['exit_time'] = datetime.now()
+                    pos['close_reason'] = reason
+                    self.trades_history.append(pos.copy())
+                for symbol in BotConfig.SYMBOLS:
+                    if symbol not in remaining:
+                        self.risk.update_exposure(symbol, 0.0)
+                # 스냅샷 기준으로 로컬 마진 계산기 정리
+                self._sync_margin_positions([
+                    dict(p, positionAmt='0') for p in result['snapshot'] if p['symbol'] not in remaining
+                ])
+
+            return result
+        except Exception as e:
+            logger.error(f"전체 청산 실패: {e}")
+            return None
+        finally:
+            self._flatten_lock.release()
+
+    def _on_kill_signal(self, signum, frame):
+        """SIGUSR1 수신 시 전체 청산 (시그널 핸들러에서는 주문을 보내지 않고 스레드로 넘김)"""
+        logger.warning(f"🛑 시그널 {signum} 수신 - 전체 청산")
+        threading.Thread(target=self.flatten_all, args=("SIGNAL",), daemon=True).start()
+
     def close_position(self, symbol: str, reason: str = "MANUAL", side: Optional[str] = None) -> Optional[Dict]:
         """
         포지션 종료 (SHORT 또는 LONG)
@@ -688,12 +1061,10 @@ class BinanceETHBot:
             if side is None:
                 side = self.positions.get(symbol, {}).get('side', 'SHORT')
 
-            # 포지션 청산 전 미결제 주문 모두 취소
-            try:
-                self.client.futures_cancel_all_open_orders(symbol=symbol)
-                logger.info(f"  {symbol} 미결제 주문 모두 취소됨")
-            except Exception as e:
-                logger.debug(f"  미결제 주문 취소 실패 (없을 수도): {e}")
+            # 포지션 청산 전 이 봇이 낸 미결제 주문만 지정 취소
+            canceled = self.orders.cancel_open(symbol)
+            if canceled:
+                logger.info(f"  {symbol} 미결제 주문 {canceled}건 취소됨")
 
             current_price = position['mark_price']
             quantity = abs(position['position_amount'])
@@ -704,13 +1075,17 @@ class BinanceETHBot:
             else:
                 close_side = 'BUY'
 
-            order = self.client.futures_create_order(
-                symbol=symbol,
-                side=close_side,
-                positionSide=side,
-                type='MARKET',
-                quantity=quantity
-            )
+            order = self.order_submitter.create_order({
+                'symbol': symbol,
+                'side': close_side,
+                'positionSide': side,
+                'type': 'MARKET',
+                'quantity': quantity,
+                'newClientOrderId': self._client_order_id(symbol, 'close', side, quantity, reason)
+            })
+            if not is_order_ok(order):
+                logger.error(f"{symbol} 포지션 종료 주문 실패: {order.get('msg')}")
+                return None
 
             exit_price = current_price
             pnl = position['unrealized_pnl']
@@ -719,6 +1094,8 @@ class BinanceETHBot:
             mode_str = "롱" if side == 'LONG' else "숏"
             logger.info(f"{mode_str} 종료: {symbol} @ {exit_price} | PnL: {pnl:.2f} USDT ({pnl_percent:.2f}%)")
 
+            self.risk.update_exposure(symbol, 0.0)
+
             # 거래 기록 저장
             if symbol in self.positions:
                 self.positions[symbol]['status'] = 'CLOSED'
@@ -758,50 +1135,36 @@ class BinanceETHBot:
             if not position:
                 return None
 
-            account_info = self.get_account_info()
-            margin_level = account_info['margin_level']
+            # 청산 위험 평가 (스트림 마크 가격/잔고로 로컬 계산, 계좌 조회 없음)
+            with self._state_lock:
+                margin_risk = self.margin.position_risk(symbol)
+            margin_ratio = margin_risk['margin_ratio']
+            margin_level = margin_risk['margin_level']
+            liquidation_price = margin_risk['liquidation_price'] or position['liquidation_price']
 
-            # 청산 위험 평가
             risk_level = 'LOW'
-            if margin_level < 50:
+            if margin_ratio >= BotConfig.MARGIN_RATIO_HIGH:
                 risk_level = 'HIGH'
-                logger.warning(f"⚠️ {symbol} 청산 위험 HIGH (마진율: {margin_level:.2f}%)")
+                logger.warning(f"⚠️ {symbol} 청산 위험 HIGH (마진 비율: {margin_ratio:.2f}%, 청산가: {liquidation_price:.2f})")
                 # 자동 포지션 종료 권장
                 return {
                     'symbol': symbol,
+                    'unrealized_pnl': position['unrealized_pnl'],
+                    'unrealized_pnl_percent': position['unrealized_pnl_percent'],
                     'risk_level': risk_level,
                     'margin_level': margin_level,
+                    'margin_ratio': margin_ratio,
                     'action': 'CLOSE_RECOMMENDED'
                 }
-            elif margin_level < 100:
+            elif margin_ratio >= BotConfig.MARGIN_RATIO_MEDIUM:
                 risk_level = 'MEDIUM'
-                logger.warning(f"⚠️ {symbol} 청산 위험 MEDIUM (마진율: {margin_level:.2f}%)")
+                logger.warning(f"⚠️ {symbol} 청산 위험 MEDIUM (마진 비율: {margin_ratio:.2f}%, 청산가: {liquidation_price:.2f})")
 
             # ===== 그리드 매매 체결 추적 =====
-            if symbol in self.positions and self.positions[symbol].get('status') == 'GRID_OPEN':
-                pos = self.positions[symbol]
-                for level in pos['grid_levels']:
-                    if level['filled']:
-                        continue
-                    try:
-                        order_status = self.client.futures_get_order(symbol=symbol, orderId=level['order_id'])
-                        if order_status['status'] == 'FILLED':
-                            level['filled'] = True
-                            pos['grid_filled_count'] += 1
-                            pos['quantity'] += level['quantity']
-
-                            # 가중 평균 진입가 업데이트
-                            if pos['quantity'] > 0:
-                                filled_levels = [l for l in pos['grid_levels'] if l['filled']]
-                                pos['entry_price'] = sum(l['price'] * l['quantity'] for l in filled_levels) / pos['quantity']
-                                logger.info(f"  ✅ 그리드 체결! ({pos['grid_filled_count']}/{len(pos['grid_levels'])}) 평균 진입가: {pos['entry_price']:.2f}")
-
-                            # 모든 그리드가 체결되면 상태 변경
-                            if pos['grid_filled_count'] == len(pos['grid_levels']):
-                                pos['status'] = 'OPEN'
-                                logger.info(f"  🎯 모든 그리드 체결 완료!")
-                    except Exception as e:
-                        logger.debug(f"  그리드 주문 상태 조회 실패: {e}")
+            # 사용자 스트림이 살아 있으면 체결은 이벤트로 이미 반영됨 (REST 조회 불필요)
+            if (symbol in self.positions and self.positions[symbol].get('status') == 'GRID_OPEN'
+                    and not self.user_stream.is_alive()):
+                self._poll_grid_fills(symbol)
 
             # ===== 트레일링 스탑 로직 =====
             if symbol in self.positions:
@@ -809,83 +1172,35 @@ class BinanceETHBot:
                 pos = self.positions[symbol]
                 side = pos.get('side', 'SHORT')
 
-                if side == 'LONG':
-                    # LONG: 최고가 추적 (가격이 올라가는 게 유리)
-                    if current_price > pos.get('highest_price_seen', 0):
-                        pos['highest_price_seen'] = current_price
-                        new_trailing_stop = round(current_price * (1 - BotConfig.TRAILING_STOP_PERCENT / 100), 2)
-
-                        # 기존 STOP 주문이 있으면 취소하고 교체
-                        if pos.get('stop_order_id'):
-                            try:
-                                self.client.futures_cancel_order(symbol=symbol, orderId=pos['stop_order_id'])
-                                logger.info(f"  🔄 기존 STOP 주문 취소: {pos['stop_order_id']}")
-                            except Exception as e:
-                                logger.debug(f"  STOP 주문 취소 실패 (이미 체결됐을 수도): {e}")
-
-                        # 새로운 STOP 주문 생성 (LONG은 SELL로 손절)
-                        try:
-                            new_stop_order = self.client.futures_create_order(
-                                symbol=symbol,
-                                side='SELL',
-                                positionSide='LONG',
-                                type='STOP_MARKET',
-                                quantity=pos['quantity'],
-                                stopPrice=new_trailing_stop
-                            )
-                            pos['stop_order_id'] = new_stop_order['orderId']
-                            pos['trailing_stop'] = new_trailing_stop
-                            logger.info(f"  🔄 롱 트레일링 스탑 업데이트: {new_trailing_stop:.2f} USDT (최고가: {current_price:.2f})")
-                        except Exception as e:
-                            logger.warning(f"  새로운 STOP 주문 생성 실패: {e}")
+                # 최고/최저가 추적 및 스탑 주문 유지 (NATIVE: 거래소 추적, AMEND: N틱 이상일 때만 교체)
+                # 새 스탑 계산만 상태 잠금 안에서 하고 주문 생성/취소는 잠금 밖에서 전송
+                self.trailing_stops.update(symbol, pos, current_price)
 
+                if side == 'LONG':
                     # 트레일링 스탑 돌파 감지 (LONG은 가격이 아래로 떨어지면 손절)
                     if current_price <= pos.get('trailing_stop', 0):
                         logger.warning(f"⚠️ {symbol} 롱 트레일링 스탑 부분! (현재가: {current_price:.2f}, 스탑: {pos['trailing_stop']:.2f})")
                         return {
                             'symbol': symbol,
+                            'unrealized_pnl': position['unrealized_pnl'],
+                            'unrealized_pnl_percent': position['unrealized_pnl_percent'],
                             'risk_level': risk_level,
                             'margin_level': margin_level,
+                            'margin_ratio': margin_ratio,
                             'action': 'TRAILING_STOP_HIT'
                         }
 
                 else:  # SHORT
-                    # SHORT: 최저가 추적 (가격이 내려가는 게 유리)
-                    if current_price < pos.get('lowest_price_seen', float('inf')):
-                        pos['lowest_price_seen'] = current_price
-                        new_trailing_stop = round(current_price * (1 + BotConfig.TRAILING_STOP_PERCENT / 100), 2)
-
-                        # 기존 STOP 주문이 있으면 취소하고 교체
-                        if pos.get('stop_order_id'):
-                            try:
-                                self.client.futures_cancel_order(symbol=symbol, orderId=pos['stop_order_id'])
-                                logger.info(f"  🔄 기존 STOP 주문 취소: {pos['stop_order_id']}")
-                            except Exception as e:
-                                logger.debug(f"  STOP 주문 취소 실패 (이미 체결됐을 수도): {e}")
-
-                        # 새로운 STOP 주문 생성
-                        try:
-                            new_stop_order = self.client.futures_create_order(
-                                symbol=symbol,
-                                side='BUY',
-                                positionSide='SHORT',
-                                type='STOP_MARKET',
-                                quantity=pos['quantity'],
-                                stopPrice=new_trailing_stop
-                            )
-                            pos['stop_order_id'] = new_stop_order['orderId']
-                            pos['trailing_stop'] = new_trailing_stop
-                            logger.info(f"  🔄 숏 트레일링 스탑 업데이트: {new_trailing_stop:.2f} USDT (최저가: {current_price:.2f})")
-                        except Exception as e:
-                            logger.warning(f"  새로운 STOP 주문 생성 실패: {e}")
-
                     # 트레일링 스탑 돌파 감지 (SHORT은 가격이 올라가면 손절)
                     if current_price >= pos.get('trailing_stop', 0):
                         logger.warning(f"⚠️ {symbol} 숏 트레일링 스탑 부분! (현재가: {current_price:.2f}, 스탑: {pos['trailing_stop']:.2f})")
                         return {
                             'symbol': symbol,
+                            'unrealized_pnl': position['unrealized_pnl'],
+                            'unrealized_pnl_percent': position['unrealized_pnl_percent'],
                             'risk_level': risk_level,
                             'margin_level': margin_level,
+                            'margin_ratio': margin_ratio,
                             'action': 'TRAILING_STOP_HIT'
                         }
 
@@ -893,8 +1208,9 @@ class BinanceETHBot:
                 'symbol': symbol,
                 'unrealized_pnl': position['unrealized_pnl'],
                 'unrealized_pnl_percent': position['unrealized_pnl_percent'],
-                'liquidation_price': position['liquidation_price'],
+                'liquidation_price': liquidation_price,
                 'margin_level': margin_level,
+                'margin_ratio': margin_ratio,
                 'risk_level': risk_level,
                 'entry_price': position['entry_price'],
                 'mark_price': position['mark_price'],
@@ -905,6 +1221,21 @@ class BinanceETHBot:
             logger.error(f"{symbol} 모니터링 실패: {e}")
             return None
     
+    def _wait_next_cycle(self):
+        """
+        다음 분석까지 대기
+        분석 직전에 커넥션을 예열해 신호 후 첫 주문이 DNS/TLS 비용을 치르지 않도록 함
+        """
+        if not BotConfig.PREWARM_CONNECTIONS:
+            time.sleep(BotConfig.CYCLE_SECONDS)
+            return
+
+        time.sleep(BotConfig.CYCLE_SECONDS - BotConfig.PREWARM_LEAD_SECONDS)
+        started = time.perf_counter()
+        self.client.warm_up(connections=2)
+        logger.debug(f"커넥션 예열 완료 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        time.sleep(BotConfig.PREWARM_LEAD_SECONDS)
+
     def get_trading_stats(self) -> Dict:
         """거래 통계"""
         if not self.trades_history:
@@ -947,10 +1278,23 @@ class BinanceETHBot:
         logger.info("=" * 60)
         
         loop_count = 0
+
+        self.grid_engine.start()
+        if BotConfig.USER_STREAM_ENABLED:
+            try:
+                self.user_stream.start()
+            except Exception as e:
+                logger.warning(f"사용자 데이터 스트림 시작 실패 (REST 폴링 사용): {e}")
+        if BotConfig.MARK_PRICE_STREAM_ENABLED:
+            self.mark_stream.start()
+        # kill -USR1 <pid>로 전체 청산 (메인 스레드에서만 등록 가능)
+        if hasattr(signal, 'SIGUSR1') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGUSR1, self._on_kill_signal)
         
         try:
             while True:
                 loop_count += 1
+                self.cycle += 1
                 current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
                 logger.info(f"\n[Loop {loop_count}] {current_time}")
                 
@@ -959,6 +1303,20 @@ class BinanceETHBot:
                 logger.info(f"계좌 잔액: {account_info['balance']:.2f} USDT | "
                           f"미결제손익: {account_info['unrealized_pnl']:.2f} USDT | "
                           f"마진율: {account_info['margin_level']:.2f}%")
+
+                # 최대 낙폭 초과 시 신규 진입 거부만으로는 부족하므로 전체 청산
+                drawdown = self.risk.drawdown_percent()
+                if drawdown >= BotConfig.MAX_DRAWDOWN_PERCENT and self.margin.positions:
+                    logger.warning(f"🚨 최대 낙폭 초과 ({drawdown:.2f}%) - 전체 청산")
+                    self.flatten_all("MAX_DRAWDOWN")
+                limit_stats = self.rate_limiter.get_stats()
+                logger.info(f"요청 가중치: {limit_stats['used_weight_1m']}/{BotConfig.RATE_LIMIT_WEIGHT_1M} (1분) | "
+                          f"주문 수: {limit_stats['order_count_1m']} (1분) | "
+                          f"대기: {limit_stats['throttled']}회")
+                time_stats = self.time_sync.get_metrics()
+                logger.info(f"서버 시간 오프셋: {time_stats['offset_ms']:+.0f}ms | "
+                          f"지터: {time_stats['jitter_ms']:.0f}ms | "
+                          f"RTT: {time_stats['rtt_ms']:.0f}ms")
                 
                 # 각 심볼 분석
                 for symbol in BotConfig.SYMBOLS:
@@ -987,6 +1345,9 @@ class BinanceETHBot:
                                     logger.info(f"  ✅ 포지션 종료 성공")
                         continue
                     
+                    # 24시간 거래량 (진입 전 위험 검사용)
+                    self._update_volume(symbol)
+
                     # 캔들 데이터 조회
                     df = self.get_klines(symbol, BotConfig.TIMEFRAME, BotConfig.CANDLES)
                     if df.empty:
@@ -998,12 +1359,14 @@ class BinanceETHBot:
                     
                     # 진입 신호 분석
                     signal, confidence = self.analyze_signal(symbol, indicators)
+                    signal_time = time.perf_counter()
 
                     # RSI 기반 자동 모드 전환 확인
                     rsi = indicators.get('rsi', 50)
                     if self.check_and_switch_mode(rsi):
                         # 모드가 전환되면 현재 모드로 신호 재분석
                         signal, confidence = self.analyze_signal(symbol, indicators)
+                        signal_time = time.perf_counter()
                         logger.info(f"  신호 재분석 (모드 전환 후): {signal} (확률: {confidence*100:.1f}%)")
 
                     logger.info(f"  RSI: {indicators.get('rsi', 0):.2f} | "
@@ -1012,23 +1375,29 @@ class BinanceETHBot:
                     logger.info(f"  신호: {signal} (확률: {confidence*100:.1f}%)")
 
                     # 신호에 따른 거래 (자동 모드 전환 시 self.current_mode 사용)
-                    if signal == 'SHORT' and confidence >= 0.50 and self.current_mode == 'SHORT':
+                    if signal == 'SHORT' and confidence >= BotConfig.ENTRY_THRESHOLD and self.current_mode == 'SHORT':
                         logger.info(f"  ✅ 숏 진입 신호 감지!")
 
                         # 테스트 모드가 아닌 경우만 실제 거래
                         if not test_mode:
-                            result = self.open_grid_position(symbol, BotConfig.LEVERAGE, side='SHORT')
+                            result = self.open_grid_position(symbol, BotConfig.LEVERAGE, side='SHORT',
+                                                             signal_time=signal_time,
+                                                             atr=indicators.get('atr', 0.0),
+                                                             price=indicators.get('current_price'))
                             if result and 'grid_levels' in result:
                                 logger.info(f"  그리드 레벨: {len(result['grid_levels'])}개")
                         else:
                             logger.info(f"  [테스트 모드] 실제 거래 미실행")
 
-                    elif signal == 'LONG' and confidence >= 0.50 and self.current_mode == 'LONG':
+                    elif signal == 'LONG' and confidence >= BotConfig.ENTRY_THRESHOLD and self.current_mode == 'LONG':
                         logger.info(f"  ✅ 롱 진입 신호 감지!")
 
                         # 테스트 모드가 아닌 경우만 실제 거래
                         if not test_mode:
-                            result = self.open_grid_position(symbol, BotConfig.LEVERAGE, side='LONG')
+                            result = self.open_grid_position(symbol, BotConfig.LEVERAGE, side='LONG',
+                                                             signal_time=signal_time,
+                                                             atr=indicators.get('atr', 0.0),
+                                                             price=indicators.get('current_price'))
                             if result and 'grid_levels' in result:
                                 logger.info(f"  그리드 레벨: {len(result['grid_levels'])}개")
                         else:
@@ -1042,21 +1411,45 @@ class BinanceETHBot:
                               f"승리율: {stats['win_rate']:.1f}%")
                     logger.info(f"  누적 PnL: {stats['total_pnl']:.2f} USDT | "
                               f"평균: {stats['avg_pnl']:.2f} USDT")
+
+                order_latency = self.latency.summary('signal_to_order')
+                if order_latency['count'] > 0:
+                    logger.info(f"  신호→주문 지연: p50 {order_latency['p50_ms']:.0f}ms | "
+                              f"p99 {order_latency['p99_ms']:.0f}ms ({order_latency['count']}건)")
+                protection_latency = self.latency.summary('entry_to_protected')
+                if protection_latency['count'] > 0:
+                    logger.info(f"  진입→보호 완료 지연: p50 {protection_latency['p50_ms']:.0f}ms | "
+                              f"p99 {protection_latency['p99_ms']:.0f}ms | "
+                              f"최대 {protection_latency['max_ms']:.0f}ms ({protection_latency['count']}건)")
+                for endpoint, endpoint_latency in self.client.get_latency_stats().items():
+                    if endpoint in ('signal_to_order', 'entry_to_protected'):
+                        continue
+                    logger.debug(f"  {endpoint}: p50 {endpoint_latency['p50_ms']:.0f}ms | "
+                               f"p99 {endpoint_latency['p99_ms']:.0f}ms ({endpoint_latency['count']}건)")
                 
                 # 대기 (1시간)
                 logger.info(f"\n⏰ 다음 분석까지 1시간 대기...")
-                time.sleep(3600)
+                self._wait_next_cycle()
         
         except KeyboardInterrupt:
             logger.info("\n봇이 사용자에 의해 중지됨")
         except Exception as e:
             logger.error(f"봇 실행 중 오류: {e}", exc_info=True)
+        finally:
+            self.user_stream.stop()
+            self.mark_stream.stop()
+            self.grid_engine.stop()
 
 # ============================================================================
 # 메인
 # ============================================================================
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binance 선물 트레이딩 봇")
+    parser.add_argument('--flatten', action='store_true',
+                        help="미체결 주문 취소 후 모든 포지션을 즉시 청산하고 종료")
+    args = parser.parse_args()
+
     try:
         # API 키 확인
         if not BotConfig.API_KEY or not BotConfig.API_SECRET:
@@ -1067,6 +1460,10 @@ if __name__ == "__main__":
         # 봇 시작
         bot = BinanceETHBot()
 
+        if args.flatten:
+            result = bot.flatten_all("CLI")
+            exit(0 if result and not result['remaining'] and not result['remaining_algo'] else 1)
+
         # 테스트 모드로 실행 (실제 거래 안 함)
         bot.run(test_mode=False)
     
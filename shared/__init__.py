@@ -7,9 +7,45 @@ from .indicators import (
     find_pivots, detect_bearish_divergence, detect_bullish_divergence
 )
 from .telegram_notifier import TelegramNotifier
+from .exchange_info import ExchangeInfoCache, SymbolFilters
+from .rate_limiter import RateLimiter
+from .futures_client import FuturesClient
+from .http_session import create_session, get_shared_session
+from .latency import LatencyRecorder
+from .time_sync import TimeSync
+from .resilience import CircuitBreaker, CircuitOpenError
+from .order_submitter import OrderSubmitter
+from .user_stream import UserDataStream
+from .order_manager import OrderManager, OrderRecord
+from .trailing_stop import TrailingStopManager
+from .grid_engine import GridEngine, ladder_prices
+from .risk_engine import RiskEngine
+from .margin_engine import MarginEngine
+from .market_stream import MarkPriceStream
+from .kill_switch import KillSwitch
+from .fills import first_touch, intrabar_exits, ladder_fills
+from .backtest_core import simulate_short, simulate_short_intrabar, simulate_grid, trade_statistics
+from .scoring import short_score, long_score, confidence_series
+from .sweep import SharedArrays, run_sweep, run_grid_variants
+from .walk_forward import walk_forward
+from .optimizer import successive_halving, hyperband
+from .monte_carlo import monte_carlo
+from .portfolio import build_panel, load_panel, save_panel, portfolio_backtest
 
 __all__ = [
     'RSI', 'MACD', 'SMA', 'EMA', 'BBANDS', 'ATR',
     'find_pivots', 'detect_bearish_divergence', 'detect_bullish_divergence',
     'TelegramNotifier',
+    'ExchangeInfoCache', 'SymbolFilters',
+    'RateLimiter', 'FuturesClient',
+    'create_session', 'get_shared_session', 'LatencyRecorder',
+    'TimeSync', 'CircuitBreaker', 'CircuitOpenError',
+    'OrderSubmitter', 'UserDataStream', 'OrderManager', 'OrderRecord',
+    'TrailingStopManager', 'GridEngine', 'ladder_prices', 'RiskEngine',
+    'MarginEngine', 'MarkPriceStream', 'KillSwitch',
+    'first_touch', 'intrabar_exits', 'ladder_fills',
+    'simulate_short', 'simulate_short_intrabar', 'simulate_grid', 'trade_statistics',
+    'short_score', 'long_score', 'confidence_series', 'SharedArrays', 'run_sweep',
+    'run_grid_variants', 'walk_forward', 'successive_halving', 'hyperband', 'monte_carlo',
+    'build_panel', 'load_panel', 'save_panel', 'portfolio_backtest',
 ]
@@ -0,0 +1,531 @@
+"""
+백테스트 시뮬레이션 코어
+행마다 pandas Series를 만들지 않고 미리 할당한 배열 위에서 포지션 상태를 스칼라로 갱신
+(BTC/ETH BacktestEngine 공용)
+"""
+
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .fills import TOUCH_REASONS, RangeExtrema, first_touch, intrabar_exits, ladder_fills
+from .grid_engine import ladder_prices, PERCENT
+from .scoring import MODE_KEEP, MODE_LONG, MODE_SHORT
+
+logger = logging.getLogger(__name__)
+
+# 신호 코드 (BacktestEngine.generate_signals의 signal 열은 이 코드로 만든 Categorical)
+SIGNAL_HOLD = 0
+SIGNAL_SHORT = 1
+SIGNAL_CLOSE = 2
+SIGNAL_LABELS = ['HOLD', 'SHORT', 'CLOSE']
+
+# 종료 사유
+EXIT_REASONS = ('STOP_LOSS', 'TAKE_PROFIT', 'SIGNAL')
+
+
+def signal_codes(signal) -> np.ndarray:
+    """signal 열(Categorical 또는 문자열)을 int8 코드 배열로 변환"""
+    if hasattr(signal, 'cat') and list(signal.cat.categories) == SIGNAL_LABELS:
+        return signal.cat.codes.to_numpy(dtype=np.int8)
+    lookup = {label: code for code, label in enumerate(SIGNAL_LABELS)}
+    return np.fromiter((lookup.get(s, SIGNAL_HOLD) for s in signal), dtype=np.int8, count=len(signal))
+
+
+def simulate_short(close: np.ndarray, signals: np.ndarray, initial_capital: float, leverage: int,
+                   stop_loss_pct: float, take_profit_pct: float, position_size_pct: float,
+                   risk=None, symbol: str = '', volume_24h: Optional[np.ndarray] = None,
+                   close_at_end: bool = False) -> Tuple[List[Tuple], np.ndarray, float]:
+    """
+    숏 전략 이벤트 루프 (종가 기준 손절/익절/신호 종료, SHORT 신호에 진입)
+
+    Args:
+        close: 종가 배열
+        signals: 신호 코드 배열 (SIGNAL_*)
+        initial_capital: 초기 자본
+        leverage: 레버리지
+        stop_loss_pct: 손절매 % (진입가 대비 상승률)
+        take_profit_pct: 익절 % (진입가 대비 하락률)
+        position_size_pct: 자본 대비 포지션 비율
+        risk: RiskEngine (진입 전 위험 검사), 없으면 생략
+        symbol: 위험 검사용 거래쌍
+        volume_24h: 봉별 24시간 거래대금 (risk 사용 시)
+        close_at_end: 마지막 봉에 남은 포지션을 종가로 청산 (사유 'END', 구간을 이어 붙일 때)
+
+    Returns:
+        (거래 목록 [(entry_index, exit_index, entry_price, exit_price, quantity, pnl, pnl_pct, reason)],
+         자본 곡선 (길이 n + 1, 첫 값은 초기 자본), 최종 잔액)
+    """
+    prices = close.tolist()
+    codes = signals.tolist()
+    n = len(prices)
+
+    equity = np.empty(n + 1, dtype=float)
+    equity[0] = initial_capital
+    trades: List[Tuple] = []
+
+    balance = initial_capital
+    in_position = False
+    entry_price = quantity = 0.0
+    entry_index = 0
+    last_equity = peak = float(initial_capital)
+
+    if risk is not None:
+        risk.update_equity(initial_capital)
+        volumes = volume_24h.tolist()
+
+    for i in range(n):
+        price = prices[i]
+        signal = codes[i]
+
+        # 기존 포지션 확인
+        if in_position:
+            loss_pct = (price - entry_price) / entry_price * 100
+            reason = -1
+            if loss_pct > stop_loss_pct:
+                reason = 0
+            elif loss_pct < -take_profit_pct:
+                reason = 1
+            elif signal == SIGNAL_CLOSE or signal == SIGNAL_SHORT:
+                reason = 2
+            if reason >= 0:
+                pnl = (entry_price - price) * quantity * leverage
+                pnl_pct = (entry_price - price) / entry_price * 100
+                balance += pnl
+                trades.append((entry_index, i, entry_price, price, quantity, pnl, pnl_pct, EXIT_REASONS[reason]))
+                in_position = False
+
+        # 새로운 숏 포지션 진입
+        if not in_position and signal == SIGNAL_SHORT:
+            position_value = balance * position_size_pct / leverage
+            rejected = False
+            if risk is not None:
+                # 최고점은 루프에서 추적하고 검사 직전에만 반영 (봉마다 호출하지 않음)
+                risk.update_equity(peak)
+                risk.update_equity(last_equity)
+                risk.update_volume(symbol, volumes[i])
+                reject_reason = risk.check(symbol, position_value * leverage, leverage)
+                if reject_reason:
+                    logger.debug(f"[{i}] 진입 거부: {reject_reason}")
+                    rejected = True
+            if not rejected:
+                in_position = True
+                entry_price = price
+                entry_index = i
+                quantity = position_value / price
+
+        # 자본 기록
+        if in_position:
+            last_equity = balance + (entry_price - price) * quantity * leverage
+        else:
+            last_equity = balance
+        equity[i + 1] = last_equity
+        if last_equity > peak:
+            peak = last_equity
+
+    if risk is not None:
+        risk.update_equity(peak)
+        risk.update_equity(last_equity)
+
+    if close_at_end and in_position:
+        price = prices[-1]
+        pnl = (entry_price - price) * quantity * leverage
+        balance += pnl
+        trades.append((entry_index, n - 1, entry_price, price, quantity, pnl,
+                       (entry_price - price) / entry_price * 100, 'END'))
+
+    return trades, equity, balance
+
+
+def simulate_short_intrabar(high: np.ndarray, low: np.ndarray, close: np.ndarray, signals: np.ndarray,
+                            initial_capital: float, leverage: int, stop_loss_pct: float, take_profit_pct: float,
+                            position_size_pct: float, trailing_stop_pct: Optional[float] = None,
+                            open_: Optional[np.ndarray] = None, sub_bars: Optional[Dict[str, np.ndarray]] = None,
+                            risk=None, symbol: str = '', volume_24h: Optional[np.ndarray] = None,
+                            close_at_end: bool = False) -> Tuple[List[Tuple], np.ndarray, float]:
+    """
+    숏 전략, 봉 내부 체결 버전 (진입/신호 종료는 simulate_short와 같고 손절/익절/트레일링은 고가/저가 터치)
+
+    SHORT 신호 봉마다 진입했을 때의 첫 터치(fills.intrabar_exits)와 다음 종료 신호를 미리 한 번에 구하고,
+    루프는 봉이 아니라 거래 단위로 진행 (보유 구간 자본 곡선은 종가 평가로 한 번에 채움)
+    같은 봉에서 터치와 종료 신호가 겹치면 봉 안에서 먼저 일어나는 터치로 청산
+
+    Args:
+        trailing_stop_pct: 진입 후 최저가 대비 트레일링 스탑 % (None이면 미사용)
+        open_: 봉 시가 (갭 체결가)
+        sub_bars: 하위 봉 정밀화 (fills.intrabar_exits 참고)
+        나머지는 simulate_short와 같음
+
+    Returns:
+        simulate_short와 같은 형태 (종료 사유에 'TRAILING_STOP' 추가)
+    """
+    close = np.asarray(close, dtype=float)
+    codes = np.asarray(signals)
+    n = len(close)
+
+    candidates = np.flatnonzero(codes == SIGNAL_SHORT)
+    touches = intrabar_exits(high, low, candidates + 1, close[candidates], -1, stop_loss_pct, take_profit_pct,
+                             trailing_stop_pct, open_, sub_bars=sub_bars)
+    touch_exit = np.where(touches['exit_index'] >= 0, touches['exit_index'], n).tolist()
+    touch_price = touches['exit_price'].tolist()
+    touch_reason = touches['reason'].tolist()
+    # 진입 봉 다음의 첫 종료 신호 (CLOSE 또는 새 SHORT)
+    closing = np.flatnonzero((codes == SIGNAL_CLOSE) | (codes == SIGNAL_SHORT))
+    k = np.searchsorted(closing, candidates, side='right')
+    signal_exit = np.where(k < len(closing), closing[np.minimum(k, len(closing) - 1)], n).tolist()
+    entries = candidates.tolist()
+    prices = close.tolist()
+
+    equity = np.empty(n + 1, dtype=float)
+    equity[0] = initial_capital
+    trades: List[Tuple] = []
+    balance = initial_capital
+    peak = float(initial_capital)
+    filled = 0   # equity[:filled + 1]까지 기록됨
+
+    if risk is not None:
+        risk.update_equity(initial_capital)
+
+    c = 0
+    while c < len(entries):
+        e = entries[c]
+        equity[filled + 1:e + 1] = balance
+        filled = max(filled, e)
+        position_value = balance * position_size_pct / leverage
+        if risk is not None:
+            risk.update_equity(peak)
+            risk.update_equity(equity[e])
+            risk.update_volume(symbol, volume_24h[e])
+            reject_reason = risk.check(symbol, position_value * leverage, leverage)
+            if reject_reason:
+                logger.debug(f"[{e}] 진입 거부: {reject_reason}")
+                c += 1
+                continue
+
+        entry_price = prices[e]
+        quantity = position_value / entry_price
+        if touch_exit[c] <= signal_exit[c]:
+            x, exit_price, reason = touch_exit[c], touch_price[c], TOUCH_REASONS[touch_reason[c]]
+        else:
+            x, exit_price, reason = signal_exit[c], None, EXIT_REASONS[2]
+
+        # 보유 구간 종가 평가 (진입 봉은 손익 0)
+        last = min(x, n)
+        marked = balance + (entry_price - close[e + 1:last]) * quantity * leverage
+        equity[e + 1] = balance
+        equity[e + 2:last + 1] = marked
+        if len(marked):
+            peak = max(peak, marked.max())
+        filled = last
+
+        if x >= n:
+            if close_at_end:
+                price = prices[-1]
+                pnl = (entry_price - price) * quantity * leverage
+                balance += pnl
+                trades.append((e, n - 1, entry_price, price, quantity, pnl,
+                               (entry_price - price) / entry_price * 100, 'END'))
+            break
+
+        if exit_price is None:
+            exit_price = prices[x]
+        pnl = (entry_price - exit_price) * quantity * leverage
+        balance += pnl
+        trades.append((e, x, entry_price, exit_price, quantity, pnl,
+                       (entry_price - exit_price) / entry_price * 100, reason))
+        equity[x + 1] = balance
+        peak = max(peak, balance)
+        filled = x
+        # 청산 봉에서 다시 SHORT 신호면 같은 봉 종가에 재진입
+        c = bisect_left(entries, x, c + 1)
+    else:
+        equity[filled + 1:] = balance
+
+    if risk is not None:
+        risk.update_equity(peak)
+        risk.update_equity(equity[-1])
+
+    return trades, equity, balance
+
+
+def simulate_grid(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                  short_confidence: np.ndarray, long_confidence: np.ndarray, mode_hint: np.ndarray,
+                  initial_capital: float, leverage: int, signal_threshold: float, entry_threshold: float,
+                  grid_num: int = 3, grid_spacing: float = 0.5, spacing_mode: str = PERCENT,
+                  atr: Optional[np.ndarray] = None, stop_loss_pct: float = 2.0,
+                  trailing_stop_pct: float = 2.0, position_size_pct: float = 0.05,
+                  initial_mode: str = 'SHORT', auto_mode_switch: bool = True,
+                  risk=None, symbol: str = '', volume_24h: Optional[np.ndarray] = None,
+                  close_at_end: bool = False) -> Tuple[List[Tuple], np.ndarray, float, int]:
+    """
+    라이브 봇 흐름 시뮬레이션 (봉 종가 = 분석 주기)
+
+    - 포지션이 없으면 현재 모드로 신뢰도 계산 → RSI 모드 전환 → 신뢰도가 두 임계값 이상이면 그리드 배치
+      (open_grid_position: 현재가 기준 grid_num개 LIMIT, 명목가치 = 잔액 × position_size_pct / leverage)
+    - 그리드 레벨은 다음 봉부터 고가/저가가 닿으면 레벨 가격에 체결, 평균 진입가는 VWAP
+    - 체결 수량이 있으면 분석 대신 모니터링: 종가로 트레일링 스탑 갱신 후 돌파 시 종가에 전체 청산,
+      남은 레벨은 취소 (초기 스탑은 가장 먼 레벨에서 stop_loss_pct 바깥)
+    - 체결 전 그리드는 모드 전환이나 새 진입 신호가 나오면 취소 후 교체
+    - close_at_end면 마지막 봉에 남은 포지션을 종가로 청산 (사유 'END')
+
+    Returns:
+        (거래 목록 [(entry_index, exit_index, side, entry_price, exit_price, quantity, pnl, pnl_pct,
+                    reason, filled_levels)],
+         자본 곡선 (길이 n + 1), 최종 잔액, 모드 전환 횟수)
+    """
+    highs = high.tolist()
+    lows = low.tolist()
+    prices = close.tolist()
+    short_conf = short_confidence.tolist()
+    long_conf = long_confidence.tolist()
+    hints = mode_hint.tolist()
+    atrs = atr.tolist() if atr is not None else None
+    n = len(prices)
+    threshold = max(signal_threshold, entry_threshold)
+
+    equity = np.empty(n + 1, dtype=float)
+    equity[0] = initial_capital
+    trades: List[Tuple] = []
+
+    balance = initial_capital
+    mode = MODE_LONG if initial_mode == 'LONG' else MODE_SHORT
+    switches = 0
+    last_equity = peak = float(initial_capital)
+
+    # 그리드 상태 (side: 0이면 그리드 없음)
+    side = 0
+    level_prices: List[float] = []
+    level_qtys: List[float] = []
+    next_level = 0
+    quantity = cost = 0.0
+    stop = extreme = 0.0
+    first_fill = placed_at = -1
+
+    if risk is not None:
+        risk.update_equity(initial_capital)
+        volumes = volume_24h.tolist()
+
+    for i in range(n):
+        price = prices[i]
+
+        # 배치된 다음 봉부터 레벨 체결 (SHORT는 위, LONG은 아래로 가까운 레벨부터)
+        if side and i > placed_at:
+            while next_level < len(level_prices):
+                level_price = level_prices[next_level]
+                if (side == MODE_SHORT and highs[i] >= level_price) or \
+                        (side == MODE_LONG and lows[i] <= level_price):
+                    quantity += level_qtys[next_level]
+                    cost += level_qtys[next_level] * level_price
+                    next_level += 1
+                    if first_fill < 0:
+                        first_fill = i
+                else:
+                    break
+
+        if quantity > 0:
+            # 모니터링: 트레일링 스탑 갱신 후 돌파 확인
+            if side == MODE_SHORT:
+                if price < extreme:
+                    extreme = price
+                    stop = min(stop, extreme * (1 + trailing_stop_pct / 100))
+                hit = price >= stop
+            else:
+                if price > extreme:
+                    extreme = price
+                    stop = max(stop, extreme * (1 - trailing_stop_pct / 100))
+                hit = price <= stop
+
+            entry_price = cost / quantity
+            direction = -1 if side == MODE_SHORT else 1
+            if hit:
+                pnl = direction * (price - entry_price) * quantity
+                balance += pnl
+                trades.append((first_fill, i, 'SHORT' if side == MODE_SHORT else 'LONG', entry_price, price,
+                               quantity, pnl, direction * (price - entry_price) / entry_price * 100,
+                               'TRAILING_STOP', next_level))
+                side = 0
+                quantity = cost = 0.0
+                last_equity = balance
+            else:
+                last_equity = balance + direction * (price - entry_price) * quantity
+        else:
+            # 분석: 현재 모드 신뢰도 → 모드 전환 → 진입
+            hint = hints[i]
+            if auto_mode_switch and hint != MODE_KEEP and hint != mode:
+                mode = hint
+                switches += 1
+                side = 0  # 체결 전 그리드 취소
+            confidence = short_conf[i] if mode == MODE_SHORT else long_conf[i]
+
+            if confidence >= threshold:
+                total_value = balance * position_size_pct / leverage
+                rejected = False
+                if risk is not None:
+                    risk.update_equity(peak)
+                    risk.update_equity(last_equity)
+                    risk.update_volume(symbol, volumes[i])
+                    reject_reason = risk.check(symbol, total_value, leverage)
+                    if reject_reason:
+                        logger.debug(f"[{i}] 진입 거부: {reject_reason}")
+                        rejected = True
+                if not rejected:
+                    side = mode
+                    side_str = 'SHORT' if side == MODE_SHORT else 'LONG'
+                    ladder = ladder_prices(price, side_str, grid_num, grid_spacing, spacing_mode,
+                                           atrs[i] if atrs is not None else 0.0)
+                    level_prices = ladder.tolist()
+                    level_qtys = (total_value / grid_num / ladder).tolist()
+                    next_level = 0
+                    placed_at = i
+                    first_fill = -1
+                    extreme = price
+                    stop = level_prices[-1] * (1 + (1 if side == MODE_SHORT else -1) * stop_loss_pct / 100)
+            last_equity = balance
+
+        equity[i + 1] = last_equity
+        if last_equity > peak:
+            peak = last_equity
+
+    if risk is not None:
+        risk.update_equity(peak)
+        risk.update_equity(last_equity)
+
+    if close_at_end and quantity > 0:
+        price = prices[-1]
+        entry_price = cost / quantity
+        direction = -1 if side == MODE_SHORT else 1
+        pnl = direction * (price - entry_price) * quantity
+        balance += pnl
+        trades.append((first_fill, n - 1, 'SHORT' if side == MODE_SHORT else 'LONG', entry_price, price,
+                       quantity, pnl, direction * (price - entry_price) / entry_price * 100, 'END', next_level))
+
+    return trades, equity, balance, switches
+
+
+def grid_ladder_trades(high: np.ndarray, low: np.ndarray, close: np.ndarray, placed_at: np.ndarray, side,
+                       notional, grid_num: int = 3, grid_spacing: float = 0.5, stop_loss_pct: float = 2.0,
+                       trailing_stop_pct: float = 2.0, expire: Optional[np.ndarray] = None,
+                       extrema: Optional[RangeExtrema] = None) -> Dict[str, np.ndarray]:
+    """
+    독립 그리드 사다리 여러 개를 한 번에 시뮬레이션 (simulate_grid의 사다리 하나와 같은 규칙)
+
+    - placed_at 봉 종가 기준 PERCENT 사다리, 레벨 수량 = notional / grid_num / 레벨 가격
+    - 다음 봉부터 고가/저가로 레벨 체결 (fills.ladder_fills), expire 봉까지 한 레벨도 체결되지 않으면 취소
+      (체결이 시작된 사다리는 포지션 보유 중이라 재분석/교체가 없으므로 나머지 레벨도 계속 유효)
+    - 첫 체결 봉부터 종가로 트레일링 스탑 (초기 스탑은 가장 먼 레벨에서 stop_loss_pct 바깥,
+      종가가 배치 봉 종가를 넘어선 뒤부터 트레일링), 돌파 봉 종가에 청산하고 그 뒤 레벨은 취소
+    - 사다리끼리 잔액/포지션을 공유하지 않음 (변형 비교용, 순서 의존 흐름은 simulate_grid)
+
+    Args:
+        placed_at: 사다리 배치 봉 (m,)
+        side: 1(LONG) / -1(SHORT), 스칼라 또는 (m,)
+        notional: 사다리별 명목가치 (스칼라 또는 (m,))
+        expire: 사다리별 주문 유효 끝 봉 (미포함, 체결 전 교체 시점, 그 전에 체결이 시작되면 무시)
+        extrema: 같은 high/low로 여러 번 호출할 때 재사용할 RangeExtrema
+
+    Returns:
+        {'placed_at', 'side', 'first_fill', 'exit_index' (미청산 -1), 'entry_price' (VWAP), 'exit_price',
+         'quantity', 'filled_levels', 'pnl', 'pnl_pct'} - 체결 없는 사다리는 first_fill -1, 손익 0,
+        미청산 사다리는 마지막 종가로 평가
+    """
+    close = np.asarray(close, dtype=float)
+    n = len(close)
+    placed_at = np.asarray(placed_at, dtype=np.int64)
+    m = len(placed_at)
+    side = np.broadcast_to(np.asarray(side), (m,))
+    away = np.where(side < 0, 1.0, -1.0)[:, None]   # SHORT는 위, LONG은 아래로
+    extrema = extrema or RangeExtrema(high, low)
+
+    base = close[placed_at][:, None]
+    levels = base * (1 + away * grid_spacing * np.arange(1, grid_num + 1) / 100)
+    quantities = np.broadcast_to(np.asarray(notional, dtype=float).reshape(-1, 1), (m, 1)) / grid_num / levels
+    end = None
+    if expire is not None:
+        # 가장 가까운 레벨이 교체 전에 체결된 사다리는 끝까지 유효
+        nearest = ladder_fills(extrema, placed_at, levels[:, :1], quantities[:, :1], side, end=expire)
+        end = np.where(nearest['first_fill'] >= 0, n, expire)
+    fills = ladder_fills(extrema, placed_at, levels, quantities, side, end=end)
+
+    first_fill = fills['first_fill']
+    exit_index = np.full(m, -1, dtype=np.int64)
+    opened = np.flatnonzero(first_fill >= 0)
+    if len(opened):
+        stop = levels[opened, -1] * (1 + away[opened, 0] * stop_loss_pct / 100)
+        touch = first_touch(close, close, first_fill[opened], close[placed_at[opened]], side[opened],
+                            trailing_stop_pct=trailing_stop_pct, stop_price=stop, trail_from_entry=False)
+        exit_index[opened] = touch['exit_index']
+        fills = ladder_fills(extrema, placed_at, levels, quantities, side, exit_index=exit_index, end=end)
+
+    quantity = fills['quantity']
+    entry_price = fills['vwap']
+    closed = exit_index >= 0
+    exit_price = np.where(closed, close[np.maximum(exit_index, 0)], close[n - 1] if n else np.nan)
+    direction = -away[:, 0]
+    with np.errstate(invalid='ignore'):
+        pnl = np.where(quantity > 0, direction * (exit_price - entry_price) * quantity, 0.0)
+        pnl_pct = np.where(quantity > 0, direction * (exit_price - entry_price) / entry_price * 100, 0.0)
+    return {
+        'placed_at': placed_at,
+        'side': side,
+        'first_fill': first_fill,
+        'exit_index': exit_index,
+        'entry_price': entry_price,
+        'exit_price': exit_price,
+        'quantity': quantity,
+        'filled_levels': fills['filled_levels'],
+        'pnl': pnl,
+        'pnl_pct': pnl_pct,
+    }
+
+
+def trade_statistics(pnls: np.ndarray, equity: np.ndarray, initial_capital: float) -> Dict:
+    """
+    거래 손익과 자본 곡선 통계
+
+    Args:
+        pnls: 거래별 손익 배열
+        equity: 자본 곡선
+        initial_capital: 초기 자본
+    """
+    total_trades = len(pnls)
+    if total_trades == 0:
+        return {
+            'total_trades': 0,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'win_rate': 0,
+            'profit_factor': 0,
+            'avg_win': 0,
+            'avg_loss': 0,
+            'total_pnl': 0,
+            'total_pnl_pct': 0,
+            'max_drawdown': 0,
+            'sharpe_ratio': 0
+        }
+    wins = pnls[pnls > 0]
+    losses = pnls[pnls < 0]
+
+    # 최대 낙폭
+    peak = np.maximum.accumulate(equity)
+    max_drawdown = np.min((equity - peak) / peak * 100)
+
+    # Sharpe Ratio (간단 계산)
+    returns = np.diff(equity) / equity[:-1]
+    sharpe_ratio = np.mean(returns) / np.std(returns) * np.sqrt(252 * 24) if len(returns) > 1 else 0
+
+    total_pnl = sum(pnls.tolist())
+    return {
+        'total_trades': total_trades,
+        'winning_trades': len(wins),
+        'losing_trades': total_trades - len(wins),
+        'win_rate': len(wins) / total_trades * 100 if total_trades > 0 else 0,
+        'profit_factor': abs(sum(wins.tolist()) / sum(losses.tolist())) if len(losses) else 0,
+        'avg_win': np.mean(wins) if len(wins) else 0,
+        'avg_loss': np.mean(losses) if len(losses) else 0,
+        'total_pnl': total_pnl,
+        'total_pnl_pct': (total_pnl / initial_capital) * 100,
+        'max_drawdown': max_drawdown,
+        'sharpe_ratio': sharpe_ratio,
+    }
@@ -0,0 +1,186 @@
+"""
+거래소 정보 캐시 모듈
+futures_exchange_info()를 TTL 캐시로 보관하고 심볼별 필터를 미리 계산
+주문 준비(가격/수량 반올림, 최소 주문량 확인)를 네트워크 호출 없이 처리
+"""
+
+import logging
+import time
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def _decimals(step: float) -> int:
+    """tickSize/stepSize 문자열에서 소수 자릿수 계산 (예: '0.0010' -> 3)"""
+    exponent = Decimal(str(step)).normalize().as_tuple().exponent
+    return max(0, -exponent)
+
+
+class SymbolFilters:
+    """심볼별 거래 필터 (tickSize, stepSize, minQty, minNotional, 레버리지 구간)"""
+
+    def __init__(self, symbol: str, filters: List[Dict], brackets: Optional[List[Dict]] = None):
+        self.symbol = symbol
+        by_type = {f['filterType']: f for f in filters}
+
+        price_filter = by_type.get('PRICE_FILTER', {})
+        lot_size = by_type.get('LOT_SIZE', {})
+        market_lot_size = by_type.get('MARKET_LOT_SIZE', lot_size)
+        min_notional = by_type.get('MIN_NOTIONAL', {})
+
+        self.tick_size = float(price_filter.get('tickSize', 0.01))
+        self.min_price = float(price_filter.get('minPrice', 0))
+        self.max_price = float(price_filter.get('maxPrice', 0))
+        self.step_size = float(lot_size.get('stepSize', 0.001))
+        self.min_qty = float(lot_size.get('minQty', 0))
+        self.max_qty = float(lot_size.get('maxQty', 0))
+        self.market_max_qty = float(market_lot_size.get('maxQty', self.max_qty))
+        # 선물은 'notional', 현물은 'minNotional' 키 사용
+        self.min_notional = float(min_notional.get('notional', min_notional.get('minNotional', 0)))
+
+        self.price_precision = _decimals(self.tick_size)
+        self.qty_precision = _decimals(self.step_size)
+
+        # 레버리지 구간: notionalCap 오름차순
+        self.brackets = sorted(brackets or [], key=lambda b: float(b['notionalCap']))
+
+    def max_leverage(self, notional: float = 0.0) -> int:
+        """명목가치에 허용되는 최대 레버리지"""
+        for bracket in self.brackets:
+            if notional < float(bracket['notionalCap']):
+                return int(bracket['initialLeverage'])
+        if self.brackets:
+            return int(self.brackets[-1]['initialLeverage'])
+        return 0
+
+    def maint_margin(self, notional: float) -> Dict:
+        """명목가치에 해당하는 유지증거금률과 누적 공제액 (maintMarginRatio, cum)"""
+        for bracket in self.brackets:
+            if notional < float(bracket['notionalCap']):
+                return {'ratio': float(bracket['maintMarginRatio']), 'cum': float(bracket.get('cum', 0))}
+        if self.brackets:
+            last = self.brackets[-1]
+            return {'ratio': float(last['maintMarginRatio']), 'cum': float(last.get('cum', 0))}
+        return {'ratio': 0.0, 'cum': 0.0}
+
+
+class ExchangeInfoCache:
+    """TTL 기반 거래소 정보 캐시 (심볼 인덱스)"""
+
+    def __init__(self, client, ttl: float = 3600):
+        """
+        초기화
+
+        Args:
+            client: binance Client
+            ttl: 캐시 유효 시간 (초)
+        """
+        self.client = client
+        self.ttl = ttl
+        self._symbols: Dict[str, SymbolFilters] = {}
+        self._loaded_at = 0.0
+
+    def refresh(self) -> bool:
+        """거래소 정보와 레버리지 구간을 다시 받아 인덱스 재구성"""
+        try:
+            info = self.client.futures_exchange_info()
+        except Exception as e:
+            logger.error(f"거래소 정보 조회 실패: {e}")
+            return False
+
+        # 레버리지 구간은 서명 요청이라 실패해도 필터는 사용
+        brackets = {}
+        try:
+            for item in self.client.futures_leverage_bracket():
+                brackets[item['symbol']] = item['brackets']
+        except Exception as e:
+            logger.debug(f"레버리지 구간 조회 실패: {e}")
+
+        self._symbols = {
+            s['symbol']: SymbolFilters(s['symbol'], s.get('filters', []), brackets.get(s['symbol']))
+            for s in info.get('symbols', [])
+        }
+        self._loaded_at = time.monotonic()
+        logger.info(f"거래소 정보 캐시 갱신: {len(self._symbols)}개 심볼")
+        return True
+
+    def is_stale(self) -> bool:
+        return not self._symbols or time.monotonic() - self._loaded_at > self.ttl
+
+    def get(self, symbol: str) -> Optional[SymbolFilters]:
+        """심볼 필터 조회 (만료 시에만 갱신, 갱신 실패 시 기존 캐시 사용)"""
+        if self.is_stale() and not self.refresh() and self._symbols:
+            logger.warning("거래소 정보 갱신 실패 - 기존 캐시 사용")
+        return self._symbols.get(symbol)
+
+    def quantize_price(self, symbol: str, price, mode: str = 'nearest'):
+        """
+        가격을 tickSize 단위로 맞춤 (스칼라 또는 배열)
+
+        Args:
+            mode: 'nearest', 'down', 'up'
+        """
+        f = self.get(symbol)
+        if f is None:
+            return _as_output(np.asarray(price, dtype=float))
+        return _quantize(price, f.tick_size, f.price_precision, mode)
+
+    def quantize_qty(self, symbol: str, qty, mode: str = 'down'):
+        """수량을 stepSize 단위로 맞춤 (기본: 내림, 스칼라 또는 배열)"""
+        f = self.get(symbol)
+        if f is None:
+            return _as_output(np.asarray(qty, dtype=float))
+        return _quantize(qty, f.step_size, f.qty_precision, mode)
+
+    def check_order(self, symbol: str, qty: float, price: float) -> Optional[str]:
+        """최소 수량/최소 명목가치 확인. 문제가 없으면 None, 있으면 사유 문자열"""
+        f = self.get(symbol)
+        if f is None:
+            return f"{symbol} 거래소 정보 없음"
+        if qty < f.min_qty:
+            return f"최소 수량 미만 ({qty} < {f.min_qty})"
+        if f.min_notional and qty * price < f.min_notional:
+            return f"최소 주문금액 미만 ({qty * price:.2f} < {f.min_notional})"
+        return None
+
+    def valid_orders(self, symbol: str, qty, price) -> np.ndarray:
+        """check_order의 배열 버전 (수백 개 그리드 레벨을 한 번에 확인), 통과하면 True"""
+        qty = np.asarray(qty, dtype=float)
+        price = np.asarray(price, dtype=float)
+        f = self.get(symbol)
+        if f is None:
+            return np.zeros(np.broadcast(qty, price).shape, dtype=bool)
+        valid = (qty >= f.min_qty) & (price > 0)
+        if f.max_qty:
+            valid &= qty <= f.max_qty
+        if f.min_price:
+            valid &= price >= f.min_price
+        if f.max_price:
+            valid &= price <= f.max_price
+        if f.min_notional:
+            valid &= qty * price >= f.min_notional
+        return valid
+
+
+def _quantize(value, step: float, precision: int, mode: str):
+    arr = np.asarray(value, dtype=float)
+    # 부동소수 오차로 한 단계 밀리지 않도록 작은 여유값 사용
+    units = arr / step
+    if mode == 'down':
+        units = np.floor(units + 1e-9)
+    elif mode == 'up':
+        units = np.ceil(units - 1e-9)
+    else:
+        units = np.round(units)
+    return _as_output(np.round(units * step, precision))
+
+
+def _as_output(arr: np.ndarray):
+    """0차원 배열은 float로, 그 외에는 배열 그대로 반환"""
+    if arr.ndim == 0:
+        return float(arr)
+    return arr
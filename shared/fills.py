@@ -0,0 +1,300 @@
+"""
+봉 내부 체결 시뮬레이션 모듈
+종가만 보면 놓치는 손절/익절/트레일링 스탑 터치를 고가/저가로 찾음
+(거래마다 파이썬 루프를 돌지 않고 거래 x 봉 창을 2차원 배열로 한 번에 검사,
+ 선택적으로 1분봉 같은 하위 봉 배열로 같은 검색을 반복해 체결 봉/가격을 정밀화)
+그리드 LIMIT 사다리의 레벨별 체결 봉, 누적 VWAP/수량, 청산 시 미체결 레벨 취소도 같은 방식으로 계산
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 터치 사유 코드 (TOUCH_REASONS 인덱스)
+TOUCH_STOP_LOSS = 0
+TOUCH_TAKE_PROFIT = 1
+TOUCH_TRAILING_STOP = 2
+TOUCH_REASONS = ('STOP_LOSS', 'TAKE_PROFIT', 'TRAILING_STOP')
+
+# 한 번에 검사하는 (거래 x 봉) 원소 수 상한
+MAX_WINDOW_ELEMENTS = 4_000_000
+
+
+def sub_bar_bounds(bar_times: np.ndarray, sub_times: np.ndarray) -> np.ndarray:
+    """
+    봉마다 하위 봉 구간 시작 위치 (길이 n + 1, 봉 i의 하위 봉은 [bounds[i], bounds[i + 1]))
+
+    Args:
+        bar_times: 봉 시작 시각 (오름차순)
+        sub_times: 하위 봉 시작 시각 (오름차순)
+    """
+    bounds = np.searchsorted(np.asarray(sub_times), np.asarray(bar_times), side='left')
+    return np.append(bounds, len(sub_times))
+
+
+def first_touch(high: np.ndarray, low: np.ndarray, start: np.ndarray, entry_price: np.ndarray, side,
+                stop_loss_pct: Optional[float] = None, take_profit_pct: Optional[float] = None,
+                trailing_stop_pct: Optional[float] = None, open_: Optional[np.ndarray] = None,
+                end: Optional[np.ndarray] = None, window: int = 64,
+                stop_price: Optional[np.ndarray] = None, trail_from_entry: bool = True) -> Dict[str, np.ndarray]:
+    """
+    거래별 첫 손절/익절/트레일링 스탑 터치 검색
+
+    - 봉 j의 스탑은 진입가와 j-1 봉까지의 유리한 극값(SHORT 최저가/LONG 최고가)으로 계산
+      (같은 봉 안의 극값 갱신과 터치 순서는 알 수 없으므로 보수적으로 직전 봉까지만 반영)
+    - 한 봉에서 스탑과 익절이 모두 닿으면 스탑 우선 (하위 봉으로 정밀화하면 순서가 풀림)
+    - 체결가는 레벨 가격, open_이 있으면 갭으로 레벨을 넘어 시작한 봉은 시가
+
+    Args:
+        high / low: 봉 고가/저가
+        start: 거래별 검색 시작 봉 (진입 봉 다음)
+        entry_price: 거래별 진입가
+        side: 1(LONG) / -1(SHORT), 스칼라 또는 거래별 배열
+        stop_loss_pct / take_profit_pct / trailing_stop_pct: 진입가/극값 대비 % (None이면 미사용)
+        open_: 봉 시가 (갭 체결가)
+        end: 거래별 검색 끝 봉 (미포함, 기본: 전체)
+        window: 처음 검사할 봉 수 (못 찾은 거래만 창을 두 배씩 늘려 이어서 검사)
+        stop_price: 거래별 고정 스탑 가격 (stop_loss_pct 대신, 그리드처럼 진입가가 아닌 레벨 기준일 때)
+        trail_from_entry: False면 극값이 진입가를 넘어선 뒤에만 트레일링 (라이브 봇 그리드 모니터링)
+
+    Returns:
+        {'exit_index': 터치 봉 (없으면 -1), 'exit_price', 'reason': TOUCH_* 코드 (없으면 -1)}
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(high)
+    start = np.asarray(start, dtype=np.int64)
+    m = len(start)
+    entry = np.broadcast_to(np.asarray(entry_price, dtype=float), (m,))
+    short = np.broadcast_to(np.asarray(side) < 0, (m,))
+    end = np.full(m, n, dtype=np.int64) if end is None else np.minimum(np.asarray(end, dtype=np.int64), n)
+
+    # 고정 레벨 (없으면 닿지 않는 무한대)
+    if stop_price is not None:
+        fixed_stop = np.broadcast_to(np.asarray(stop_price, dtype=float), (m,))
+    elif stop_loss_pct is not None:
+        fixed_stop = np.where(short, entry * (1 + stop_loss_pct / 100), entry * (1 - stop_loss_pct / 100))
+    else:
+        fixed_stop = np.where(short, np.inf, -np.inf)
+    if take_profit_pct is not None:
+        take_profit = np.where(short, entry * (1 - take_profit_pct / 100), entry * (1 + take_profit_pct / 100))
+    else:
+        take_profit = np.where(short, -np.inf, np.inf)
+    trail = trailing_stop_pct / 100 if trailing_stop_pct is not None else None
+
+    exit_index = np.full(m, -1, dtype=np.int64)
+    exit_price = np.full(m, np.nan)
+    reason = np.full(m, -1, dtype=np.int8)
+
+    extreme = entry.copy()               # 직전 봉까지의 유리한 극값
+    cursor = start.copy()
+    active = np.flatnonzero(cursor < end)
+    while len(active):
+        width = int(min(window, max(1, MAX_WINDOW_ELEMENTS // len(active))))
+        rows = cursor[active][:, None] + np.arange(width)
+        valid = rows < end[active][:, None]
+        rows = np.minimum(rows, n - 1)
+        bar_high = high[rows]
+        bar_low = low[rows]
+        is_short = short[active][:, None]
+
+        # 유리한 극값 (SHORT는 저가의 누적 최저, LONG은 고가의 누적 최고), 한 칸 밀어 직전 봉까지
+        favorable = np.where(is_short, bar_low, -bar_high)
+        running = np.minimum.accumulate(
+            np.concatenate((np.where(short[active], extreme[active], -extreme[active])[:, None],
+                            favorable[:, :-1]), axis=1), axis=1)
+        running = np.where(is_short, running, -running)
+
+        stop = np.broadcast_to(fixed_stop[active][:, None], rows.shape)
+        if trail is not None:
+            trailing = np.where(is_short, running * (1 + trail), running * (1 - trail))
+            if not trail_from_entry:
+                base = entry[active][:, None]
+                improved = np.where(is_short, running < base, running > base)
+                trailing = np.where(improved, trailing, np.where(is_short, np.inf, -np.inf))
+            stop = np.where(is_short, np.minimum(stop, trailing), np.maximum(stop, trailing))
+        target = take_profit[active][:, None]
+        stop_hit = np.where(is_short, bar_high >= stop, bar_low <= stop) & valid
+        target_hit = np.where(is_short, bar_low <= target, bar_high >= target) & valid
+        hit = stop_hit | target_hit
+
+        found = hit.any(axis=1)
+        col = hit.argmax(axis=1)
+        done = active[found]
+        pick = np.flatnonzero(found)
+        cols = col[found]
+        bars = rows[pick, cols]
+        by_stop = stop_hit[pick, cols]
+        level = np.where(by_stop, stop[pick, cols], target[pick, 0])
+        if open_ is not None:
+            bar_open = np.asarray(open_, dtype=float)[bars]
+            # 스탑은 불리한 갭(시가가 레벨 너머), 익절은 유리한 갭이면 시가 체결
+            beyond = np.where(short[done] == by_stop, bar_open > level, bar_open < level)
+            level = np.where(beyond, bar_open, level)
+        exit_index[done] = bars
+        exit_price[done] = level
+        trailing_hit = by_stop & (stop[pick, cols] != fixed_stop[done])
+        reason[done] = np.where(by_stop, np.where(trailing_hit, TOUCH_TRAILING_STOP, TOUCH_STOP_LOSS),
+                                TOUCH_TAKE_PROFIT)
+
+        # 못 찾은 거래는 극값을 이어받아 다음 창부터
+        rest = active[~found]
+        if len(rest):
+            last_valid = np.where(valid[~found], favorable[~found], np.inf).min(axis=1)
+            carried = np.where(short[rest], extreme[rest], -extreme[rest])
+            carried = np.minimum(carried, last_valid)
+            extreme[rest] = np.where(short[rest], carried, -carried)
+            cursor[rest] += width
+        active = rest[cursor[rest] < end[rest]]
+        window = width * 2
+
+    return {'exit_index': exit_index, 'exit_price': exit_price, 'reason': reason}
+
+
+def intrabar_exits(high: np.ndarray, low: np.ndarray, start: np.ndarray, entry_price: np.ndarray, side,
+                   stop_loss_pct: Optional[float] = None, take_profit_pct: Optional[float] = None,
+                   trailing_stop_pct: Optional[float] = None, open_: Optional[np.ndarray] = None,
+                   end: Optional[np.ndarray] = None,
+                   sub_bars: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+    """
+    first_touch + 선택적 하위 봉 정밀화
+
+    Args:
+        sub_bars: {'high', 'low', ('open'), 'bounds'} 하위 봉 배열과 sub_bar_bounds 결과
+                  주어지면 같은 검색을 하위 봉에서 실행하고 체결 위치를 원래 봉 번호로 환산
+                  (봉 안의 스탑/익절 순서와 트레일링 극값이 하위 봉 단위로 정확해짐)
+
+    Returns:
+        first_touch와 같은 형태 (exit_index는 원래 봉 번호)
+    """
+    if sub_bars is None:
+        return first_touch(high, low, start, entry_price, side, stop_loss_pct, take_profit_pct,
+                           trailing_stop_pct, open_, end)
+
+    bounds = np.asarray(sub_bars['bounds'])
+    n = len(bounds) - 1
+    start = np.asarray(start, dtype=np.int64)
+    end = np.full(len(start), n, dtype=np.int64) if end is None else np.minimum(np.asarray(end), n)
+    result = first_touch(sub_bars['high'], sub_bars['low'], bounds[np.minimum(start, n)], entry_price, side,
+                         stop_loss_pct, take_profit_pct, trailing_stop_pct, sub_bars.get('open'), bounds[end])
+    found = result['exit_index'] >= 0
+    result['exit_index'][found] = np.searchsorted(bounds, result['exit_index'][found], side='right') - 1
+    return result
+
+
+class RangeExtrema:
+    """
+    구간 최고가/최저가 희소 테이블 (n log n 한 번 구성)
+    시작 봉과 가격이 다른 많은 질의의 첫 돌파 봉을 거래 루프 없이 log n 단계 이분 탐색으로 찾음
+    """
+
+    def __init__(self, high: np.ndarray, low: np.ndarray):
+        self.n = len(high)
+        self._max = [np.asarray(high, dtype=float)]
+        self._min = [np.asarray(low, dtype=float)]
+        width = 1
+        while width * 2 <= self.n:
+            # [i, i + 2w) 구간 = [i, i + w) 와 [i + w, i + 2w)
+            self._max.append(np.maximum(self._max[-1][:-width], self._max[-1][width:]))
+            self._min.append(np.minimum(self._min[-1][:-width], self._min[-1][width:]))
+            width *= 2
+
+    def first_cross(self, start: np.ndarray, level: np.ndarray, side,
+                    end: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        start 이상 end 미만에서 SHORT(side < 0)는 고가 >= level, LONG은 저가 <= level인 첫 봉
+
+        Returns:
+            봉 번호 배열 (없으면 -1)
+        """
+        start = np.asarray(start, dtype=np.int64)
+        level = np.asarray(level, dtype=float)
+        start, level = np.broadcast_arrays(start, level)
+        short = np.broadcast_to(np.asarray(side) < 0, start.shape)
+        end = np.full(start.shape, self.n, dtype=np.int64) if end is None else \
+            np.broadcast_to(np.minimum(np.asarray(end, dtype=np.int64), self.n), start.shape)
+
+        # 닿지 않는 블록은 건너뜀 (큰 블록부터)
+        pos = start.copy()
+        for k in range(len(self._max) - 1, -1, -1):
+            width = 1 << k
+            fits = pos + width <= end
+            index = np.where(fits, pos, 0)
+            untouched = np.where(short, self._max[k][index] < level, self._min[k][index] > level)
+            pos = np.where(fits & untouched, pos + width, pos)
+
+        inside = pos < end
+        index = np.where(inside, pos, 0)
+        touched = np.where(short, self._max[0][index] >= level, self._min[0][index] <= level)
+        return np.where(inside & touched, pos, -1)
+
+
+def ladder_fills(extrema: RangeExtrema, placed_at: np.ndarray, levels: np.ndarray, quantities: np.ndarray,
+                 side, exit_index: Optional[np.ndarray] = None,
+                 end: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    사다리(그리드 LIMIT 주문 묶음)별 레벨 체결 시뮬레이션
+
+    - 레벨은 배치 다음 봉부터 고가(SHORT)/저가(LONG)가 닿으면 레벨 가격에 체결
+      (가까운 레벨부터 정렬돼 있으면 먼 레벨은 가까운 레벨보다 먼저 체결될 수 없음)
+    - exit_index가 주어지면 그 봉까지의 체결만 인정하고 남은 레벨은 취소
+
+    Args:
+        extrema: RangeExtrema(high, low)
+        placed_at: 사다리별 배치 봉 (m,)
+        levels: 레벨 가격 (m x L, 가까운 레벨부터)
+        quantities: 레벨 수량 (m x L)
+        side: 1(LONG) / -1(SHORT), 스칼라 또는 (m,)
+        exit_index: 사다리별 청산 봉 (m,), -1이면 청산 없음
+        end: 사다리별 주문 유효 끝 봉 (미포함, 교체/만료 등)
+
+    Returns:
+        {'fill_index': 레벨별 체결 봉 (m x L, 미체결/취소 -1), 'filled_levels', 'first_fill' (없으면 -1),
+         'quantity': 최종 수량, 'vwap': 최종 평균 진입가, 'cum_quantity' / 'cum_vwap': 레벨 순 누적 (m x L)}
+    """
+    levels = np.asarray(levels, dtype=float)
+    quantities = np.asarray(quantities, dtype=float)
+    m, count = levels.shape
+    start = np.asarray(placed_at, dtype=np.int64)[:, None] + 1
+    side = np.asarray(side)
+    limit = None if end is None else np.asarray(end, dtype=np.int64)[:, None]
+    fill_index = extrema.first_cross(np.broadcast_to(start, levels.shape), levels,
+                                     side[:, None] if side.ndim else side, limit)
+    if exit_index is not None:
+        exit_index = np.asarray(exit_index, dtype=np.int64)[:, None]
+        fill_index = np.where((exit_index >= 0) & (fill_index > exit_index), -1, fill_index)
+
+    filled = fill_index >= 0
+    cum_quantity = np.cumsum(np.where(filled, quantities, 0.0), axis=1)
+    cum_cost = np.cumsum(np.where(filled, quantities * levels, 0.0), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cum_vwap = np.where(cum_quantity > 0, cum_cost / cum_quantity, np.nan)
+    return {
+        'fill_index': fill_index,
+        'filled_levels': filled.sum(axis=1),
+        'first_fill': fill_index[:, 0] if count else np.full(m, -1),
+        'quantity': cum_quantity[:, -1],
+        'vwap': cum_vwap[:, -1],
+        'cum_quantity': cum_quantity,
+        'cum_vwap': cum_vwap,
+    }
+
+
+def position_at(fills: Dict[str, np.ndarray], bars: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    사다리별 bars 봉 종료 시점의 부분 체결 수량과 평균 진입가 (ladder_fills 결과)
+
+    Returns:
+        (수량, 평균 진입가 - 체결 없으면 NaN)
+    """
+    fill_index = fills['fill_index']
+    bars = np.asarray(bars, dtype=np.int64)
+    counts = ((fill_index >= 0) & (fill_index <= bars[:, None])).sum(axis=1)
+    rows = np.arange(len(counts))
+    last = np.maximum(counts - 1, 0)
+    quantity = np.where(counts > 0, fills['cum_quantity'][rows, last], 0.0)
+    vwap = np.where(counts > 0, fills['cum_vwap'][rows, last], np.nan)
+    return quantity, vwap
@@ -0,0 +1,229 @@
+"""
+바이낸스 선물 클라이언트 확장 모듈
+binance Client의 모든 REST 요청을 RateLimiter를 거쳐 보내고
+응답 헤더의 사용량을 반영 (keep-alive 커넥션 풀 사용)
+엔드포인트별 타임아웃, 조회 요청 재시도/헤징, 서킷 브레이커, 지연 기록 포함
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlparse
+
+from binance.client import Client
+from binance.exceptions import BinanceAPIException
+
+from .http_session import DEFAULT_POOL_MAXSIZE, mount_pool
+from .latency import LatencyRecorder
+from .rate_limiter import RateLimiter, endpoint_name
+from .resilience import CircuitBreaker, CircuitOpenError, backoff_delay, is_transient
+
+logger = logging.getLogger(__name__)
+
+# 엔드포인트별 요청 타임아웃 (초), 없으면 Client.REQUEST_TIMEOUT
+ENDPOINT_TIMEOUTS = {
+    'ping': 2,
+    'time': 2,
+    'ticker/price': 3,
+    'premiumIndex': 3,
+    'order': 5,
+    'batchOrders': 5,
+    'allOpenOrders': 5,
+    'algoOrder': 5,
+    'algoOpenOrders': 5,
+    'positionRisk': 5,
+    'account': 5,
+}
+
+# 헤징 대상 (가중치가 낮은 조회만, 늦으면 두 번째 요청을 병렬로 보냄)
+DEFAULT_HEDGE_ENDPOINTS = ('ticker/price', 'premiumIndex')
+
+# 서킷 브레이커 제외 (청산/보호 주문/킬 스위치가 장애 중에도 항상 시도할 수 있어야 함)
+DEFAULT_BREAKER_EXEMPT = (
+    'POST order', 'POST batchOrders', 'DELETE order', 'DELETE batchOrders', 'DELETE allOpenOrders',
+    'POST algoOrder', 'DELETE algoOrder', 'DELETE algoOpenOrders',
+)
+
+
+class FuturesClient(Client):
+    """요청 가중치/주문 수를 추적하고 일시적 오류에 강한 binance Client"""
+
+    def __init__(self, api_key: Optional[str] = None, api_secret: Optional[str] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 latency: Optional[LatencyRecorder] = None,
+                 max_retries: int = 3,
+                 breaker_threshold: int = 5,
+                 breaker_reset: float = 30,
+                 hedge_endpoints: Iterable[str] = DEFAULT_HEDGE_ENDPOINTS,
+                 hedge_min_delay: float = 0.3,
+                 breaker_exempt: Iterable[str] = DEFAULT_BREAKER_EXEMPT,
+                 **kwargs):
+        """
+        초기화
+
+        Args:
+            api_key: Binance API Key
+            api_secret: Binance API Secret
+            rate_limiter: 공유할 RateLimiter (없으면 새로 생성)
+            pool_maxsize: 커넥션 풀 크기 (동시 요청 수)
+            latency: 엔드포인트별 지연을 기록할 LatencyRecorder
+            max_retries: 조회(GET) 요청 재시도 횟수 (주문 등 비멱등 요청은 재시도 안 함)
+            breaker_threshold: 서킷을 열 연속 실패 횟수
+            breaker_reset: 서킷 OPEN 유지 시간 (초)
+            hedge_endpoints: 헤징할 조회 엔드포인트
+            hedge_min_delay: 헤징 요청을 보내기 전 최소 대기 (초, p95 지연과 비교해 큰 값 사용)
+            breaker_exempt: 서킷 브레이커를 거치지 않는 'METHOD endpoint' (주문/취소)
+            **kwargs: binance Client 인자
+        """
+        # Client.__init__에서 세션을 만들고 ping을 보내므로 먼저 설정
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.pool_maxsize = pool_maxsize
+        self.time_sync = None  # TimeSync 연결 시 -1021 오류에서 즉시 재동기화
+        self.latency = latency or LatencyRecorder()
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.hedge_endpoints = set(hedge_endpoints)
+        self.hedge_min_delay = hedge_min_delay
+        self.breaker_exempt = set(breaker_exempt)
+        self.hedged = 0
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
+        self._local = threading.local()
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        super().__init__(api_key, api_secret, **kwargs)
+
+    def _init_session(self):
+        session = mount_pool(super()._init_session(), pool_maxsize=self.pool_maxsize)
+        # 응답마다 헤더를 읽음 (스레드마다 self.response가 섞이지 않도록 훅 사용)
+        session.hooks['response'].append(self._on_response)
+        return session
+
+    def _on_response(self, response, *args, **kwargs):
+        self.rate_limiter.update_from_headers(response.headers, response.status_code)
+
+    def _get_request_kwargs(self, method, signed: bool, force_params: bool = False, **kwargs) -> Dict:
+        kwargs = super()._get_request_kwargs(method, signed, force_params, **kwargs)
+        timeout = getattr(self._local, 'timeout', None)
+        if timeout:
+            kwargs['timeout'] = timeout
+        return kwargs
+
+    def _breaker(self, key: str) -> Optional[CircuitBreaker]:
+        if key in self.breaker_exempt:
+            return None
+        with self._breakers_lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self._breakers[key]
+
+    def _request(self, method, uri: str, signed: bool, force_params: bool = False, **kwargs):
+        name = endpoint_name(urlparse(uri).path)
+        key = f"{method.upper()} {name}"
+        breaker = self._breaker(key)
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(key, breaker.retry_in())
+
+        # 서명 과정에서 data에 timestamp/signature가 추가되므로 재시도용 원본 보관
+        data = kwargs.get('data')
+        original = dict(data) if isinstance(data, dict) else data
+
+        def send():
+            return self._send(method, uri, signed, force_params, key, name, original, kwargs)
+
+        # 조회만 재시도 (주문 재전송은 중복 체결 위험)
+        idempotent = method.lower() == 'get'
+        attempts = 1 + (self.max_retries if idempotent else 0)
+        for attempt in range(attempts):
+            try:
+                if idempotent and name in self.hedge_endpoints:
+                    result = self._hedged(key, send)
+                else:
+                    result = send()
+                if breaker is not None:
+                    breaker.record_success()
+                return result
+            except Exception as e:
+                if breaker is None:
+                    raise  # 주문/취소는 재시도하지 않음 (OrderSubmitter가 clientOrderId로 처리)
+                if not is_transient(e):
+                    # 4xx 등 요청 자체 문제는 엔드포인트 장애가 아님
+                    breaker.record_success()
+                    raise
+                if breaker.record_failure():
+                    logger.warning(f"🔌 {key} 연속 실패로 서킷 열림 ({self.breaker_reset:.0f}초)")
+                if attempt + 1 >= attempts or not breaker.allow():
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"{key} 일시 오류, {delay:.2f}초 후 재시도 ({attempt + 1}/{self.max_retries}): {e}")
+                time.sleep(delay)
+
+    def _send(self, method, uri, signed, force_params, key, name, original, kwargs):
+        """요청 1회 전송 (한도 확인, 타임아웃, 지연 기록, -1021 재동기화)"""
+        kwargs = dict(kwargs)
+        kwargs['data'] = dict(original) if isinstance(original, dict) else original
+        path = urlparse(uri).path
+        self.rate_limiter.acquire(method, path, original)
+        self._local.timeout = ENDPOINT_TIMEOUTS.get(name)
+        started = time.perf_counter()
+        try:
+            return super()._request(method, uri, signed, force_params, **kwargs)
+        except BinanceAPIException as e:
+            # -1021: 타임스탬프가 recvWindow 밖 → 서버가 거부했으므로 재동기화 후 한 번만 재전송
+            if e.code != -1021 or not signed or self.time_sync is None:
+                raise
+            logger.warning("타임스탬프 오류(-1021) - 서버 시간 재동기화 후 재시도")
+            self.time_sync.sync_once()
+            kwargs['data'] = dict(original) if isinstance(original, dict) else original
+            self.rate_limiter.acquire(method, path, original)
+            return super()._request(method, uri, signed, force_params, **kwargs)
+        finally:
+            self.latency.record(key, time.perf_counter() - started)
+            self._local.timeout = None
+
+    def _hedged(self, key: str, send):
+        """첫 요청이 p95 지연을 넘기면 두 번째 요청을 보내고 먼저 끝난 결과 사용"""
+        if self._hedge_pool is None:
+            self._hedge_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='hedge')
+        delay = max(self.hedge_min_delay, self.latency.percentile(key, 95))
+        first = self._hedge_pool.submit(send)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self.hedged += 1
+        pending = {first, self._hedge_pool.submit(send)}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+
+    def get_latency_stats(self) -> Dict[str, Dict]:
+        """엔드포인트별 p50/p99 지연"""
+        return {key: self.latency.summary(key) for key in self.latency.keys()}
+
+    def warm_up(self, connections: int = 1) -> bool:
+        """
+        주문 전에 커넥션을 미리 열어 둠 (ping 가중치 1)
+
+        Args:
+            connections: 동시에 열어 둘 커넥션 수
+        """
+        try:
+            if connections <= 1:
+                self.futures_ping()
+            else:
+                with ThreadPoolExecutor(max_workers=connections) as pool:
+                    list(pool.map(lambda _: self.futures_ping(), range(connections)))
+            return True
+        except Exception as e:
+            logger.debug(f"커넥션 예열 실패: {e}")
+            return False
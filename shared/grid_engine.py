@@ -0,0 +1,293 @@
+"""
+그리드 엔진 모듈
+레벨 가격을 한 번에 계산(고정 %, ATR, 기하 간격)하고 batchOrders로 배치
+체결은 OrderRecord.level로 O(1) 조회, 선택적으로 체결된 레벨을 재무장(익절 후 재진입)
+재무장/익절 주문은 체결 콜백(상태 잠금 보유)에서 큐에 넣고 전송 스레드가 잠금 밖에서 전송
+"""
+
+import logging
+import queue
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .order_submitter import is_order_ok
+
+logger = logging.getLogger(__name__)
+
+# 재무장 주문 의도
+EXIT = 'EXIT'    # 체결된 레벨의 한 칸 안쪽 익절
+REARM = 'REARM'  # 익절된 레벨의 원래 주문 재배치
+
+# 주문을 이어서 낼 수 있는 포지션 상태
+ACTIVE_STATES = ('GRID_OPEN', 'OPEN')
+
+# 레벨 간격 방식
+PERCENT = 'PERCENT'      # 현재가 대비 spacing% * k (등차)
+ATR = 'ATR'              # 현재가 ± spacing * ATR * k
+GEOMETRIC = 'GEOMETRIC'  # 현재가 * (1 ± spacing%)^k (등비)
+
+
+def ladder_prices(price: float, side: str, levels: int, spacing: float,
+                  mode: str = PERCENT, atr: float = 0.0) -> np.ndarray:
+    """
+    그리드 레벨 가격 계산 (SHORT는 현재가 위, LONG은 현재가 아래)
+
+    Args:
+        price: 기준가 (현재가)
+        side: 'SHORT' 또는 'LONG'
+        levels: 레벨 수
+        spacing: 간격 (PERCENT/GEOMETRIC은 %, ATR은 ATR 배수)
+        mode: PERCENT, ATR, GEOMETRIC
+        atr: ATR 값 (ATR 모드)
+
+    Returns:
+        1번 레벨부터 순서대로 정렬된 가격 배열
+    """
+    direction = -1 if side == 'LONG' else 1
+    steps = np.arange(1, levels + 1)
+    mode = mode.upper()
+    if mode == PERCENT:
+        return price * (1 + direction * spacing * steps / 100)
+    if mode == GEOMETRIC:
+        return price * (1 + direction * spacing / 100) ** steps
+    if mode == ATR:
+        if atr <= 0:
+            raise ValueError("ATR 간격에는 양수 ATR 값이 필요")
+        return price + direction * spacing * atr * steps
+    raise ValueError(f"지원하지 않는 그리드 간격 방식: {mode}")
+
+
+class GridEngine:
+    """그리드 레벨 생성/배치/재무장"""
+
+    def __init__(self, submitter, orders, exchange_info,
+                 client_id: Optional[Callable[..., str]] = None, rearm: bool = False, lock=None):
+        """
+        초기화
+
+        Args:
+            submitter: OrderSubmitter (배치 제출)
+            orders: OrderManager (주문 등록)
+            exchange_info: ExchangeInfoCache (틱/수량 보정, 최소 주문 확인)
+            client_id: (symbol, purpose, *parts) -> newClientOrderId
+            rearm: 체결된 레벨에 한 칸 안쪽 익절 주문을 내고, 익절되면 레벨 주문을 다시 배치
+            lock: 포지션 dict를 보호하는 잠금 (봇 상태 잠금, 기본: 자체 RLock)
+        """
+        self.submitter = submitter
+        self.orders = orders
+        self.exchange_info = exchange_info
+        self.client_id = client_id
+        self.rearm = rearm
+        self.lock = lock or threading.RLock()
+        self._intents: 'queue.Queue[Optional[Tuple]]' = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+
+    def build(self, symbol: str, side: str, price: float, total_value: float, levels: int,
+              spacing: float, mode: str = PERCENT, atr: float = 0.0) -> Tuple[List[Dict], float]:
+        """
+        레벨 사양 생성 (거래소 필터를 통과한 레벨만)
+
+        Returns:
+            ([{'level', 'price', 'quantity', 'exit_price'}, ...], 가장 먼 레벨 가격)
+        """
+        raw = ladder_prices(price, side, levels, spacing, mode, atr)
+        prices = np.asarray(self.exchange_info.quantize_price(symbol, raw), dtype=float)
+        qtys = np.asarray(self.exchange_info.quantize_qty(symbol, (total_value / levels) / raw), dtype=float)
+        # 재무장 익절가 = 한 칸 안쪽 레벨 (1번 레벨은 기준가)
+        exits = np.concatenate(([self.exchange_info.quantize_price(symbol, price)], prices[:-1]))
+
+        valid = self.exchange_info.valid_orders(symbol, qtys, prices)
+        skipped = int((~valid).sum())
+        if skipped:
+            logger.warning(f"  {symbol} 그리드 {skipped}/{levels}개 레벨 생략 (최소 수량/주문금액/가격 범위)")
+
+        specs = [
+            {'level': int(k), 'price': p, 'quantity': q, 'exit_price': e}
+            for k, p, q, e in zip(np.flatnonzero(valid) + 1, prices[valid].tolist(),
+                                  qtys[valid].tolist(), exits[valid].tolist())
+        ]
+        return specs, float(prices[-1])
+
+    def _client_id(self, symbol: str, purpose: str, *parts) -> Optional[str]:
+        return self.client_id(symbol, purpose, *parts) if self.client_id else None
+
+    def place(self, symbol: str, side: str, specs: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        레벨 주문 일괄 제출 (batchOrders 5개 단위, 주문 수 한도는 RateLimiter가 조절)
+
+        Returns:
+            (grid_levels, 주문 응답 목록) - 성공한 레벨만, 같은 순서
+        """
+        order_side = 'BUY' if side == 'LONG' else 'SELL'
+        orders = [{
+            'symbol': symbol,
+            'side': order_side,
+            'positionSide': side,
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'price': spec['price'],
+            'quantity': spec['quantity'],
+            'newClientOrderId': self._client_id(symbol, 'grid', side, spec['level'], spec['price'])
+        } for spec in specs]
+        results = self.submitter.submit_batch(orders)
+
+        grid_levels = []
+        acks = []
+        for spec, order in zip(specs, results):
+            if not is_order_ok(order):
+                logger.error(f"  그리드 {spec['level']} 주문 실패: {order.get('msg')}")
+                continue
+            grid_levels.append({
+                'price': spec['price'],
+                'quantity': spec['quantity'],
+                'order_id': order['orderId'],
+                'filled': False,
+                'filled_qty': 0.0,
+                'level': spec['level'],
+                'exit_price': spec['exit_price'],
+                'exit_order_id': None,
+                'rearm_count': 0
+            })
+            acks.append(order)
+        return grid_levels, acks
+
+    def on_level_filled(self, symbol: str, pos: Dict, index: int):
+        """레벨 완전 체결 시 한 칸 안쪽 reduce 방향 LIMIT 익절 주문을 큐에 넣음 (체결 콜백에서 호출)"""
+        if not self.rearm:
+            return
+        level = pos['grid_levels'][index]
+        side = pos['side']
+        order = {
+            'symbol': symbol,
+            'side': 'SELL' if side == 'LONG' else 'BUY',
+            'positionSide': side,
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'price': level['exit_price'],
+            'quantity': level['quantity'],
+            'newClientOrderId': self._client_id(symbol, 'grid_exit', side, level['level'], level['rearm_count'])
+        }
+        self._intents.put((EXIT, symbol, pos, index, level['rearm_count'], order))
+
+    def on_exit_filled(self, symbol: str, pos: Dict, index: int, delta: float, done: bool):
+        """익절 체결 반영, 완전 체결되면 원래 레벨 재배치 주문을 큐에 넣음 (체결 콜백에서 호출)"""
+        level = pos['grid_levels'][index]
+        if delta > 0:
+            pos['quantity'] = max(0.0, pos['quantity'] - delta)
+            level['filled_qty'] = max(0.0, level['filled_qty'] - delta)
+        if not done:
+            return
+
+        level['exit_order_id'] = None
+        level['rearm_count'] += 1
+        side = pos['side']
+        order = {
+            'symbol': symbol,
+            'side': 'BUY' if side == 'LONG' else 'SELL',
+            'positionSide': side,
+            'type': 'LIMIT',
+            'timeInForce': 'GTC',
+            'price': level['price'],
+            'quantity': level['quantity'],
+            'newClientOrderId': self._client_id(symbol, 'grid', side, level['level'], level['price'],
+                                                level['rearm_count'])
+        }
+        self._intents.put((REARM, symbol, pos, index, level['rearm_count'], order))
+
+    # ------------------------------------------------------------------
+    # 재무장 주문 전송 (잠금 밖)
+    # ------------------------------------------------------------------
+
+    @property
+    def pending(self) -> int:
+        """전송 대기 중인 재무장/익절 주문 수"""
+        return self._intents.qsize()
+
+    def start(self):
+        """재무장/익절 주문 전송 스레드 시작"""
+        if self._worker and self._worker.is_alive():
+            return
+        self._worker = threading.Thread(target=self._run, name='grid-orders', daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5):
+        """전송 스레드 종료 (대기 중인 주문을 보낸 뒤)"""
+        if self._worker and self._worker.is_alive():
+            self._intents.put(None)
+            self._worker.join(timeout)
+        self._worker = None
+
+    def _run(self):
+        while True:
+            intent = self._intents.get()
+            if intent is None:
+                return
+            try:
+                self._send(*intent)
+            except Exception as e:
+                logger.error(f"  그리드 재무장 주문 처리 실패: {e}")
+
+    def process_pending(self) -> int:
+        """
+        큐에 쌓인 주문을 호출 스레드에서 전송 (전송 스레드를 쓰지 않을 때)
+
+        Returns:
+            접수된 주문 수
+        """
+        sent = 0
+        while True:
+            try:
+                intent = self._intents.get_nowait()
+            except queue.Empty:
+                return sent
+            if intent is not None:
+                sent += self._send(*intent)
+
+    @staticmethod
+    def _still_wanted(pos: Dict, level: Dict, rearm_count: int) -> bool:
+        """
+        큐에 넣은 뒤 상태가 바뀌지 않았는지 (포지션 종료, 이미 처리된 의도)
+        익절 대기/재배치 대기 모두 '체결됨 + 익절 주문 없음 + 같은 재무장 횟수' 상태
+        """
+        return (pos.get('status') in ACTIVE_STATES and level['filled']
+                and level['exit_order_id'] is None and level['rearm_count'] == rearm_count)
+
+    def _send(self, kind: str, symbol: str, pos: Dict, index: int, rearm_count: int, order: Dict) -> bool:
+        """주문 전송 후 잠금을 잡고 레벨 상태 반영 (그사이 포지션이 끝났으면 바로 취소)"""
+        level = pos['grid_levels'][index]
+        with self.lock:
+            if not self._still_wanted(pos, level, rearm_count):
+                logger.debug(f"  그리드 {level['level']} {kind} 주문 생략 (상태 변경)")
+                return False
+
+        result = self.submitter.create_order(order)
+        if not is_order_ok(result):
+            action = '익절 주문' if kind == EXIT else '재배치'
+            logger.warning(f"  그리드 {level['level']} {action} 실패: {result.get('msg')}")
+            return False
+
+        with self.lock:
+            stale = not self._still_wanted(pos, level, rearm_count)
+            if stale:
+                self.orders.track(result, tag='grid_exit' if kind == EXIT else 'grid', level=index)
+            elif kind == EXIT:
+                # 먼저 도착한 체결 이벤트가 레벨과 맞도록 ID를 먼저 기록한 뒤 등록
+                level['exit_order_id'] = result['orderId']
+                self.orders.track(result, tag='grid_exit', level=index)
+                logger.info(f"  ↩️ 그리드 {level['level']} 익절 주문: {level['exit_price']:.2f}")
+            else:
+                level['order_id'] = result['orderId']
+                level['filled'] = False
+                pos['grid_filled_count'] -= 1
+                if pos['status'] == 'OPEN':
+                    pos['status'] = 'GRID_OPEN'
+                self.orders.track(result, tag='grid', level=index)
+                logger.info(f"  🔁 그리드 {level['level']} 재배치: {level['price']:.2f}")
+
+        if stale:
+            logger.warning(f"  그리드 {level['level']} 주문 접수 중 포지션 상태 변경 - 취소")
+            self.orders.cancel(symbol, [result['orderId']])
+            return False
+        return True
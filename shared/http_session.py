@@ -0,0 +1,50 @@
+"""
+HTTP 세션 모듈
+keep-alive 커넥션 풀을 쓰는 requests 세션 생성과 공유 세션 제공
+매 요청마다 DNS 조회/TLS 핸드셰이크를 반복하지 않도록 함
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONNECTIONS = 4   # 호스트별 풀 개수
+DEFAULT_POOL_MAXSIZE = 16      # 풀당 최대 커넥션 (동시 요청 수)
+
+_shared_session: Optional[requests.Session] = None
+_shared_lock = threading.Lock()
+
+
+def mount_pool(session: requests.Session, pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+               pool_maxsize: int = DEFAULT_POOL_MAXSIZE) -> requests.Session:
+    """세션에 크기를 지정한 커넥션 풀 어댑터 장착 (자동 재시도는 상위 계층에서 처리)"""
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Connection': 'keep-alive'})
+    return session
+
+
+def create_session(pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                   pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                   headers: Optional[Dict] = None) -> requests.Session:
+    """keep-alive 커넥션 풀 세션 생성"""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    return mount_pool(session, pool_connections, pool_maxsize)
+
+
+def get_shared_session() -> requests.Session:
+    """프로세스 전체에서 공유하는 세션 (Telegram 등 부가 요청용)"""
+    global _shared_session
+    with _shared_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+        return _shared_session
+
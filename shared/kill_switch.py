@@ -0,0 +1,153 @@
+"""
+긴급 전체 청산 모듈 (킬 스위치)
+모든 심볼의 미체결 주문(조건부 algo 주문 포함) 취소와 시장가 청산을 동시에 보내고
+포지션/조건부 주문 스냅샷으로 청산 완료를 확인
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .order_submitter import is_order_ok
+
+logger = logging.getLogger(__name__)
+
+
+class KillSwitch:
+    """전체 포지션 동시 청산"""
+
+    def __init__(self, client, submitter, hedge_mode: bool = True, max_workers: int = 8,
+                 confirm_retries: int = 2, client_id: Optional[Callable[..., str]] = None):
+        """
+        초기화
+
+        Args:
+            client: binance Client (포지션 스냅샷, 주문 취소)
+            submitter: OrderSubmitter (clientOrderId 기반 시장가 청산)
+            hedge_mode: 양방향 포지션 모드면 positionSide로 청산 (reduceOnly 사용 불가)
+            max_workers: 동시에 보낼 요청 수
+            confirm_retries: 스냅샷에 남은 포지션을 다시 청산할 횟수
+            client_id: (symbol, purpose, *parts) -> newClientOrderId
+        """
+        self.client = client
+        self.submitter = submitter
+        self.hedge_mode = hedge_mode
+        self.max_workers = max_workers
+        self.confirm_retries = confirm_retries
+        self.client_id = client_id
+        self.triggered = 0
+
+    def _open_positions(self) -> List[Dict]:
+        """전체 심볼 포지션 스냅샷 (수량이 0이 아닌 것만)"""
+        return [p for p in self.client.futures_position_information() if float(p['positionAmt']) != 0]
+
+    def _close_order(self, pos: Dict, reason: str, attempt: int) -> Dict:
+        amount = float(pos['positionAmt'])
+        order = {
+            'symbol': pos['symbol'],
+            'side': 'SELL' if amount > 0 else 'BUY',
+            'type': 'MARKET',
+            'quantity': pos['positionAmt'].lstrip('-'),
+        }
+        if self.hedge_mode:
+            order['positionSide'] = pos.get('positionSide', 'LONG' if amount > 0 else 'SHORT')
+        else:
+            order['reduceOnly'] = 'true'
+        if self.client_id:
+            order['newClientOrderId'] = self.client_id(
+                pos['symbol'], 'flatten', order.get('positionSide', 'BOTH'), pos['positionAmt'], reason, attempt)
+        return self.submitter.create_order(order)
+
+    def _cancel_all(self, symbol: str) -> bool:
+        try:
+            self.client.futures_cancel_all_open_orders(symbol=symbol)
+            return True
+        except Exception as e:
+            logger.warning(f"{symbol} 미체결 주문 전체 취소 실패: {e}")
+            return False
+
+    def _cancel_all_algo(self, symbol: str) -> bool:
+        """조건부 주문(손절매/이익실현/트레일링)은 allOpenOrders로 취소되지 않음"""
+        try:
+            self.client.futures_cancel_all_algo_open_orders(symbol=symbol)
+            return True
+        except Exception as e:
+            logger.warning(f"{symbol} 조건부 주문 전체 취소 실패: {e}")
+            return False
+
+    def _open_algo_orders(self, symbols: List[str]) -> List[Dict]:
+        """남은 조건부 주문 스냅샷 (조회 실패한 심볼은 남은 것으로 간주)"""
+        remaining = []
+        for symbol in symbols:
+            try:
+                remaining.extend(self.client.futures_get_open_algo_orders(symbol=symbol))
+            except Exception as e:
+                logger.warning(f"{symbol} 조건부 주문 조회 실패: {e}")
+                remaining.append({'symbol': symbol, 'algoId': None})
+        return remaining
+
+    def flatten_all(self, reason: str = "KILL_SWITCH", symbols: Optional[List[str]] = None) -> Dict:
+        """
+        전체 청산
+
+        Args:
+            reason: 청산 사유 (로그/clientOrderId)
+            symbols: 주문을 취소할 추가 심볼 (포지션이 없어도 미체결 주문 정리)
+
+        Returns:
+            {'closed': [...], 'failed': [...], 'remaining': [...], 'remaining_algo': [...],
+             'snapshot': [...], 'elapsed_ms'}
+        """
+        started = time.perf_counter()
+        self.triggered += 1
+        logger.warning(f"🛑 킬 스위치 작동: {reason}")
+
+        positions = self._open_positions()
+        cancel_symbols = sorted({p['symbol'] for p in positions} | set(symbols or []))
+        closed: List[Dict] = []
+        failed: List[Dict] = []
+        remaining = positions
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='kill') as pool:
+            # 주문 취소와 청산을 동시에 전송 (청산은 취소를 기다리지 않음)
+            cancels = [pool.submit(cancel, symbol) for symbol in cancel_symbols
+                       for cancel in (self._cancel_all, self._cancel_all_algo)]
+            for attempt in range(1 + self.confirm_retries):
+                if not remaining:
+                    break
+                results = list(pool.map(lambda p: self._close_order(p, reason, attempt), remaining))
+                for pos, result in zip(remaining, results):
+                    (closed if is_order_ok(result) else failed).append(
+                        {'position': pos, 'result': result})
+                # 스냅샷으로 확인, 남은 포지션(부분 체결/실패)은 다시 청산
+                remaining = self._open_positions()
+                if remaining and attempt < self.confirm_retries:
+                    logger.warning(f"  청산 후 남은 포지션 {len(remaining)}개 - 재시도")
+            for future in cancels:
+                future.result()
+
+            # 조건부 주문은 포지션이 없어도 남아 있으면 새 포지션을 열 수 있으므로 스냅샷으로 확인
+            remaining_algo = self._open_algo_orders(cancel_symbols)
+            for attempt in range(self.confirm_retries):
+                if not remaining_algo:
+                    break
+                symbols_left = sorted({order['symbol'] for order in remaining_algo})
+                logger.warning(f"  남은 조건부 주문 {len(remaining_algo)}개 - 재취소")
+                list(pool.map(self._cancel_all_algo, symbols_left))
+                remaining_algo = self._open_algo_orders(symbols_left)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if remaining or remaining_algo:
+            logger.error(f"🛑 킬 스위치 완료 - 남은 포지션 {len(remaining)}개, "
+                         f"조건부 주문 {len(remaining_algo)}개 ({elapsed_ms:.0f}ms)")
+        else:
+            logger.warning(f"🛑 킬 스위치 완료 - 포지션 {len(positions)}개 청산 ({elapsed_ms:.0f}ms)")
+        return {
+            'closed': closed,
+            'failed': failed,
+            'remaining': remaining,
+            'remaining_algo': remaining_algo,
+            'snapshot': positions,
+            'elapsed_ms': elapsed_ms,
+        }
@@ -0,0 +1,69 @@
+"""
+지연 시간 측정 모듈
+키별로 최근 샘플을 보관하고 p50/p99 등 백분위를 계산
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List
+
+import numpy as np
+
+
+class LatencyRecorder:
+    """키별 지연 시간 히스토그램 (초 단위 저장, 밀리초 단위 요약)"""
+
+    def __init__(self, max_samples: int = 1000):
+        """
+        초기화
+
+        Args:
+            max_samples: 키별로 보관할 최근 샘플 수
+        """
+        self.max_samples = max_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.max_samples)
+            self._samples[key].append(seconds)
+
+    @contextmanager
+    def timer(self, key: str):
+        """with 블록 실행 시간을 기록"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(key, time.perf_counter() - started)
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._samples)
+
+    def percentile(self, key: str, q: float) -> float:
+        """백분위 지연 (초). 샘플이 없으면 0"""
+        with self._lock:
+            samples = np.fromiter(self._samples.get(key, ()), dtype=float)
+        if samples.size == 0:
+            return 0.0
+        return float(np.percentile(samples, q))
+
+    def summary(self, key: str) -> Dict:
+        """샘플 수와 p50/p90/p99/최대 지연 (ms)"""
+        with self._lock:
+            samples = np.fromiter(self._samples.get(key, ()), dtype=float)
+        if samples.size == 0:
+            return {'count': 0, 'p50_ms': 0.0, 'p90_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99]) * 1000
+        return {
+            'count': int(samples.size),
+            'p50_ms': float(p50),
+            'p90_ms': float(p90),
+            'p99_ms': float(p99),
+            'max_ms': float(samples.max() * 1000),
+        }
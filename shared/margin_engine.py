@@ -0,0 +1,177 @@
+"""
+마진 계산 모듈
+캐시된 유지증거금 구간(leverageBracket)과 스트림으로 받은 마크 가격/잔고/포지션으로
+마진 비율과 청산가를 로컬에서 계산 (REST 가중치 사용 없음)
+청산가는 바이낸스 USDⓈ-M 공식 (교차/격리, 단방향/양방향) 사용
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class MarginEngine:
+    """계좌 마진 비율 / 포지션 청산가 계산기"""
+
+    def __init__(self, exchange_info, asset: str = 'USDT'):
+        """
+        초기화
+
+        Args:
+            exchange_info: ExchangeInfoCache (심볼별 유지증거금 구간)
+            asset: 증거금 자산
+        """
+        self.exchange_info = exchange_info
+        self.asset = asset
+        self.wallet_balance = 0.0  # 교차 지갑 잔고
+        self.positions: Dict[Tuple[str, str], Dict] = {}  # (symbol, positionSide) -> 포지션
+        self.mark_prices: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # 상태 갱신 (스트림/REST 어느 쪽이든)
+    # ------------------------------------------------------------------
+
+    def update_balance(self, wallet_balance: float):
+        self.wallet_balance = wallet_balance
+
+    def update_position(self, symbol: str, position_side: str, amount: float, entry_price: float,
+                        margin_type: str = 'cross', isolated_wallet: float = 0.0):
+        """
+        포지션 갱신 (amount는 부호 포함, 0이면 제거)
+
+        Args:
+            symbol: 거래쌍
+            position_side: 'BOTH', 'LONG', 'SHORT'
+            amount: 포지션 수량 (숏은 음수)
+            entry_price: 평균 진입가
+            margin_type: 'cross' 또는 'isolated'
+            isolated_wallet: 격리 마진 지갑 잔고
+        """
+        key = (symbol, position_side)
+        if amount == 0:
+            self.positions.pop(key, None)
+            return
+        self.positions[key] = {
+            'amount': amount,
+            'entry_price': entry_price,
+            'isolated': margin_type.lower() == 'isolated',
+            'isolated_wallet': isolated_wallet,
+        }
+
+    def update_mark_price(self, symbol: str, price: float):
+        self.mark_prices[symbol] = price
+
+    def apply_account_update(self, update: Dict):
+        """ACCOUNT_UPDATE의 'a' 객체 반영 (잔고 'B', 포지션 'P')"""
+        for balance in update.get('B', []):
+            if balance['a'] == self.asset:
+                self.update_balance(float(balance['cw']))
+        for pos in update.get('P', []):
+            self.update_position(pos['s'], pos.get('ps', 'BOTH'), float(pos['pa']), float(pos['ep']),
+                                 pos.get('mt', 'cross'), float(pos.get('iw', 0)))
+
+    # ------------------------------------------------------------------
+    # 계산
+    # ------------------------------------------------------------------
+
+    def _mark(self, symbol: str, pos: Dict) -> float:
+        return self.mark_prices.get(symbol, pos['entry_price'])
+
+    def _bracket(self, symbol: str, notional: float) -> Dict:
+        filters = self.exchange_info.get(symbol) if self.exchange_info else None
+        if filters is None:
+            return {'ratio': 0.0, 'cum': 0.0}
+        return filters.maint_margin(notional)
+
+    def unrealized_pnl(self, symbol: str, position_side: str) -> float:
+        pos = self.positions.get((symbol, position_side))
+        if not pos:
+            return 0.0
+        return pos['amount'] * (self._mark(symbol, pos) - pos['entry_price'])
+
+    def maint_margin(self, symbol: str, position_side: str) -> float:
+        """유지증거금 = 명목가치 × 유지증거금률 − 누적 공제액"""
+        pos = self.positions.get((symbol, position_side))
+        if not pos:
+            return 0.0
+        notional = abs(pos['amount']) * self._mark(symbol, pos)
+        bracket = self._bracket(symbol, notional)
+        return max(0.0, notional * bracket['ratio'] - bracket['cum'])
+
+    def margin_balance(self) -> float:
+        """교차 마진 잔고 = 지갑 잔고 + 교차 포지션 미실현손익"""
+        return self.wallet_balance + sum(
+            self.unrealized_pnl(s, ps) for (s, ps), pos in self.positions.items() if not pos['isolated'])
+
+    def margin_ratio(self) -> float:
+        """교차 마진 비율 (%) = 유지증거금 합 / 마진 잔고, 100%에 도달하면 청산"""
+        maint = sum(self.maint_margin(s, ps) for (s, ps), pos in self.positions.items() if not pos['isolated'])
+        if maint == 0:
+            return 0.0
+        balance = self.margin_balance()
+        if balance <= 0:
+            return 100.0
+        return maint / balance * 100
+
+    def margin_level(self) -> float:
+        """청산까지 남은 여유 (%) = 100 − 마진 비율 (포지션이 없으면 100)"""
+        return max(0.0, 100.0 - self.margin_ratio())
+
+    def liquidation_price(self, symbol: str) -> Optional[float]:
+        """
+        심볼 청산가 (바이낸스 공식)
+
+        LP = (WB − TMM1 + UPNL1 + Σcum − Side·Pos_BOTH·EP_BOTH − Pos_LONG·EP_LONG + Pos_SHORT·EP_SHORT)
+             / (Σ Pos·MMR − Side·Pos_BOTH − Pos_LONG + Pos_SHORT)
+        WB/TMM1/UPNL1은 교차 마진일 때 다른 심볼의 지갑 잔고/유지증거금/미실현손익 (격리는 격리 지갑만)
+        """
+        sides = {ps: pos for (s, ps), pos in self.positions.items() if s == symbol}
+        if not sides:
+            return None
+
+        isolated = any(pos['isolated'] for pos in sides.values())
+        if isolated:
+            wallet = sum(pos['isolated_wallet'] for pos in sides.values())
+            other_maint = other_upnl = 0.0
+        else:
+            wallet = self.wallet_balance
+            others = [(s, ps) for (s, ps), pos in self.positions.items() if s != symbol and not pos['isolated']]
+            other_maint = sum(self.maint_margin(s, ps) for s, ps in others)
+            other_upnl = sum(self.unrealized_pnl(s, ps) for s, ps in others)
+
+        numerator = wallet - other_maint + other_upnl
+        denominator = 0.0
+        for position_side, pos in sides.items():
+            size = abs(pos['amount'])
+            bracket = self._bracket(symbol, size * self._mark(symbol, pos))
+            # 롱은 +1, 숏은 −1 (BOTH는 수량 부호로 판단)
+            if position_side == 'BOTH':
+                direction = 1 if pos['amount'] > 0 else -1
+            else:
+                direction = 1 if position_side == 'LONG' else -1
+            numerator += bracket['cum'] - direction * size * pos['entry_price']
+            denominator += size * bracket['ratio'] - direction * size
+
+        if denominator == 0:
+            return None
+        price = numerator / denominator
+        return price if price > 0 else 0.0
+
+    def position_risk(self, symbol: str) -> Dict:
+        """심볼 위험 요약 (청산가까지 거리 포함)"""
+        mark = self.mark_prices.get(symbol)
+        liquidation = self.liquidation_price(symbol)
+        distance = None
+        if mark and liquidation:
+            distance = abs(mark - liquidation) / mark * 100
+        return {
+            'symbol': symbol,
+            'mark_price': mark,
+            'liquidation_price': liquidation,
+            'liquidation_distance_percent': distance,
+            'maint_margin': sum(self.maint_margin(s, ps) for (s, ps) in self.positions if s == symbol),
+            'unrealized_pnl': sum(self.unrealized_pnl(s, ps) for (s, ps) in self.positions if s == symbol),
+            'margin_ratio': self.margin_ratio(),
+            'margin_level': self.margin_level(),
+        }
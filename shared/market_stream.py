@@ -0,0 +1,102 @@
+"""
+마크 가격 스트림 모듈
+<symbol>@markPrice@1s 스트림을 구독해 심볼별 마크 가격을 콜백으로 전달
+(청산 위험 계산을 REST 조회 없이 1초 단위로 갱신)
+"""
+
+import json
+import logging
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+FUTURES_STREAM_URL = 'wss://fstream.binance.com/stream?streams='
+FUTURES_TESTNET_STREAM_URL = 'wss://stream.binancefuture.com/stream?streams='
+
+
+class MarkPriceStream:
+    """심볼별 마크 가격 구독"""
+
+    def __init__(self, symbols: Iterable[str],
+                 on_mark_price: Optional[Callable[[str, float], None]] = None,
+                 testnet: bool = False, ws_url: Optional[str] = None,
+                 use_websocket: bool = True):
+        """
+        초기화
+
+        Args:
+            symbols: 구독할 거래쌍
+            on_mark_price: (symbol, 마크 가격) 콜백
+            testnet: 테스트넷 주소 사용 여부
+            ws_url: 결합 스트림 주소 (기본: 실서버/테스트넷)
+            use_websocket: False면 소켓 없이 dispatch()로 넣은 이벤트만 처리 (로컬 대체/재생용)
+        """
+        self.symbols = [s.upper() for s in symbols]
+        self.on_mark_price = on_mark_price
+        if ws_url is None:
+            ws_url = FUTURES_TESTNET_STREAM_URL if testnet else FUTURES_STREAM_URL
+        self.ws_url = ws_url + '/'.join(f"{s.lower()}@markPrice@1s" for s in self.symbols)
+        self.use_websocket = use_websocket
+
+        self.prices: Dict[str, float] = {}
+        self.events = 0
+        self._connected = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def dispatch(self, event: Dict):
+        """markPriceUpdate 이벤트 처리 (결합 스트림의 {'stream', 'data'} 형태도 허용)"""
+        data = event.get('data', event)
+        if data.get('e') != 'markPriceUpdate':
+            return
+        self.events += 1
+        symbol = data['s']
+        price = float(data['p'])
+        self.prices[symbol] = price
+        if self.on_mark_price:
+            try:
+                self.on_mark_price(symbol, price)
+            except Exception as e:
+                logger.error(f"마크 가격 처리 실패 ({symbol}): {e}")
+
+    def is_alive(self) -> bool:
+        if not self.use_websocket:
+            return not self._stop.is_set()
+        return self._connected
+
+    def _socket_loop(self):
+        from websockets.sync.client import connect
+
+        retry_delay = 1
+        while not self._stop.is_set():
+            try:
+                with connect(self.ws_url, open_timeout=10) as ws:
+                    self._connected = True
+                    retry_delay = 1
+                    logger.info(f"✅ 마크 가격 스트림 연결 ({', '.join(self.symbols)})")
+                    while not self._stop.is_set():
+                        try:
+                            message = ws.recv(timeout=1)
+                        except TimeoutError:
+                            continue
+                        self.dispatch(json.loads(message))
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"마크 가격 스트림 끊김: {e}")
+            self._connected = False
+            if self._stop.wait(retry_delay):
+                break
+            retry_delay = min(retry_delay * 2, 60)
+
+    def start(self):
+        self._stop.clear()
+        if self.use_websocket:
+            self._thread = threading.Thread(target=self._socket_loop, name='MarkPriceStream', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._connected = False
+        if self._thread:
+            self._thread.join(timeout=2)
@@ -0,0 +1,148 @@
+"""
+몬테카를로 강건성 분석 모듈
+백테스트 거래 손익 순서를 재추출(부트스트랩/셔플)하거나 봉 수익률을 블록 부트스트랩해
+수천 개 자본 경로를 2차원 배열(경로 x 시점)로 한 번에 만들고
+최대 낙폭, 최종 자본, 파산 확률 분포를 계산 (메모리는 batch_size 단위로 제한)
+"""
+
+import logging
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BOOTSTRAP = 'bootstrap'  # 거래 복원 추출 (거래 수 유지)
+SHUFFLE = 'shuffle'      # 거래 순서만 섞기 (최종 자본 동일, 경로/낙폭만 달라짐)
+BLOCK = 'block'          # 봉 수익률 원형 블록 부트스트랩 (변동성 군집 유지)
+
+PERCENTILES = (5, 25, 50, 75, 95)
+# 한 번에 만드는 경로 행렬 원소 수 상한 (float64 약 64MB)
+MAX_BATCH_ELEMENTS = 8_000_000
+
+
+def trade_returns(pnls: np.ndarray, initial_capital: float) -> np.ndarray:
+    """거래별 손익을 직전 잔액 대비 수익률로 변환 (포지션 크기가 잔액 비율이므로 복리 재추출에 사용)"""
+    pnls = np.asarray(pnls, dtype=float)
+    balance_before = initial_capital + np.concatenate(([0.0], np.cumsum(pnls)[:-1]))
+    return pnls / balance_before
+
+
+def _index_batches(rng: np.random.Generator, method: str, length: int, steps: int, paths: int,
+                   batch_size: int, block_size: int) -> Iterator[np.ndarray]:
+    """경로 batch_size개씩 재추출 인덱스 행렬 (batch x steps)"""
+    for start in range(0, paths, batch_size):
+        rows = min(batch_size, paths - start)
+        if method == BOOTSTRAP:
+            yield rng.integers(0, length, size=(rows, steps))
+        elif method == SHUFFLE:
+            yield rng.permuted(np.broadcast_to(np.arange(length), (rows, length)), axis=1)
+        else:
+            blocks = -(-steps // block_size)
+            starts = rng.integers(0, length, size=(rows, blocks, 1))
+            index = (starts + np.arange(block_size)) % length
+            yield index.reshape(rows, blocks * block_size)[:, :steps]
+
+
+def simulate_paths(returns: np.ndarray, initial_capital: float, paths: int = 10000, method: str = BOOTSTRAP,
+                   block_size: int = 24, steps: Optional[int] = None, batch_size: Optional[int] = None,
+                   seed: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    재추출 자본 경로를 배치 단위로 생성
+
+    Args:
+        returns: 거래별(BOOTSTRAP/SHUFFLE) 또는 봉별(BLOCK) 수익률
+        method: BOOTSTRAP / SHUFFLE / BLOCK
+        block_size: BLOCK 블록 길이 (1시간 봉 24개 = 하루)
+        steps: 경로 길이 (기본: 원래 수익률 개수)
+        batch_size: 한 번에 만들 경로 수 (기본: MAX_BATCH_ELEMENTS 이내)
+
+    Yields:
+        자본 경로 행렬 (batch x (steps + 1), 첫 열은 초기 자본)
+    """
+    if method not in (BOOTSTRAP, SHUFFLE, BLOCK):
+        raise ValueError(f"지원하지 않는 방식: {method}")
+    returns = np.asarray(returns, dtype=float)
+    length = len(returns)
+    steps = length if method == SHUFFLE or steps is None else steps
+    batch_size = batch_size or max(1, MAX_BATCH_ELEMENTS // max(steps + 1, 1))
+    rng = np.random.default_rng(seed)
+
+    for index in _index_batches(rng, method, length, steps, paths, batch_size, block_size):
+        equity = np.empty((len(index), steps + 1))
+        equity[:, 0] = initial_capital
+        np.cumprod(1.0 + returns[index], axis=1, out=equity[:, 1:])
+        equity[:, 1:] *= initial_capital
+        yield equity
+
+
+def path_statistics(equity: np.ndarray) -> Dict[str, np.ndarray]:
+    """경로별 최대 낙폭(%, 음수), 최종 자본, 최저 자본"""
+    peak = np.maximum.accumulate(equity, axis=1)
+    return {
+        'max_drawdown': ((equity - peak) / peak).min(axis=1) * 100,
+        'final_equity': equity[:, -1],
+        'min_equity': equity.min(axis=1),
+    }
+
+
+def _distribution(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, float]:
+    summary = {'mean': float(values.mean()), 'std': float(values.std())}
+    for q, value in zip(percentiles, np.percentile(values, percentiles)):
+        summary[f'p{q:g}'] = float(value)
+    return summary
+
+
+def monte_carlo(initial_capital: float, pnls: Optional[np.ndarray] = None, equity: Optional[np.ndarray] = None,
+                method: str = BOOTSTRAP, paths: int = 10000, block_size: int = 24,
+                ruin_pct: float = 50.0, drawdown_limit: Optional[float] = None,
+                percentiles: Sequence[float] = PERCENTILES, seed: Optional[int] = None) -> Dict:
+    """
+    몬테카를로 분석
+
+    Args:
+        initial_capital: 초기 자본
+        pnls: 거래별 손익 (BOOTSTRAP/SHUFFLE)
+        equity: 백테스트 자본 곡선 (BLOCK, 봉 수익률로 변환)
+        method: BOOTSTRAP / SHUFFLE / BLOCK
+        paths: 경로 수
+        block_size: BLOCK 블록 길이
+        ruin_pct: 초기 자본 대비 이 비율(%) 이상 잃은 적이 있으면 파산
+        drawdown_limit: 주어지면 최대 낙폭이 이 값(%) 이상인 경로 비율도 계산 (봇 MAX_DRAWDOWN_PERCENT 등)
+        percentiles: 분포 요약 백분위
+        seed: 난수 시드
+
+    Returns:
+        {'method', 'paths', 'max_drawdown': 분포, 'final_equity': 분포, 'risk_of_ruin', 'prob_loss',
+         ('prob_drawdown_limit'), 'samples': 경로별 통계 배열}
+    """
+    if method == BLOCK:
+        if equity is None or len(equity) < 2:
+            raise ValueError("BLOCK 방식은 자본 곡선이 필요함")
+        equity = np.asarray(equity, dtype=float)
+        returns = equity[1:] / equity[:-1] - 1.0
+    else:
+        if pnls is None:
+            raise ValueError(f"{method} 방식은 거래 손익이 필요함")
+        returns = trade_returns(pnls, initial_capital)
+    if len(returns) == 0:
+        logger.warning("재추출할 수익률 없음 (거래 없음)")
+        return {'method': method, 'paths': 0}
+
+    parts = [path_statistics(batch) for batch in
+             simulate_paths(returns, initial_capital, paths, method, block_size, seed=seed)]
+    samples = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+    ruin_level = initial_capital * (1 - ruin_pct / 100)
+    result = {
+        'method': method,
+        'paths': paths,
+        'max_drawdown': _distribution(samples['max_drawdown'], percentiles),
+        'final_equity': _distribution(samples['final_equity'], percentiles),
+        'risk_of_ruin': float(np.mean(samples['min_equity'] <= ruin_level)),
+        'prob_loss': float(np.mean(samples['final_equity'] < initial_capital)),
+        'samples': samples,
+    }
+    if drawdown_limit is not None:
+        result['prob_drawdown_limit'] = float(np.mean(samples['max_drawdown'] <= -drawdown_limit))
+    return result
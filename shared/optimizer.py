@@ -0,0 +1,136 @@
+"""
+조기 종료 파라미터 최적화 모듈 (Successive Halving / Hyperband)
+많은 후보를 짧은 이력 앞부분에서 평가하고 상위 1/eta만 더 긴 구간으로 올려
+전체 격자 탐색보다 훨씬 적은 봉 수로 최적 조합을 찾음
+(하나의 공유 메모리 프로세스 풀을 모든 단계가 재사용)
+"""
+
+import logging
+import math
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sweep import SIMPLE, SharedPool, _evaluate_chunk, _worker_arrays, random_params
+
+logger = logging.getLogger(__name__)
+
+# 가장 짧은 평가 구간 (1시간 봉 1주, 지표 워밍업 50봉 이후에도 거래가 나올 길이)
+MIN_BARS = 168
+
+
+def _run_prefix_chunk(task: Tuple[int, int, List[Tuple[int, Dict]]]) -> List[Dict]:
+    rung, bars, chunk = task
+    window = {name: array[:bars] for name, array in _worker_arrays.items()}
+    return _evaluate_chunk(window, chunk, rung=rung, bars=bars)
+
+
+def rung_budgets(n: int, min_bars: int, eta: int = 3) -> List[int]:
+    """단계별 평가 봉 수 (min_bars부터 eta배씩, 마지막 단계는 전체 n)"""
+    if min_bars >= n:
+        return [n]
+    rungs = int(math.floor(math.log(n / min_bars, eta) + 1e-9)) + 1
+    budgets = [int(n / eta ** (rungs - 1 - i)) for i in range(rungs)]
+    budgets[-1] = n
+    return budgets
+
+
+def _halving(pool: SharedPool, candidates: List[Tuple[int, Dict]], budgets: Sequence[int], eta: int,
+             rank_by: str, bracket: int = 0) -> List[Dict]:
+    """단계마다 후보 전체를 budget 봉으로 평가하고 상위 1/eta만 다음 단계로 (평가 결과 행 전체 반환)"""
+    history: List[Dict] = []
+    for rung, bars in enumerate(budgets):
+        chunksize = max(1, len(candidates) // (pool.workers * 4))
+        tasks = [(rung, bars, candidates[i:i + chunksize]) for i in range(0, len(candidates), chunksize)]
+        rows = [row for chunk_rows in pool.imap(_run_prefix_chunk, tasks) for row in chunk_rows]
+        for row in rows:
+            row['bracket'] = bracket
+        history.extend(rows)
+
+        ranked = pd.DataFrame(rows).sort_values([rank_by, 'param_id'], ascending=[False, True])
+        keep = max(1, len(candidates) // eta)
+        logger.info(f"[브래킷 {bracket} 단계 {rung}] {len(candidates)}개 후보 x {bars}봉 → 상위 {keep}개 "
+                    f"(최고 {rank_by} {ranked[rank_by].iloc[0]:.4f})")
+        if rung < len(budgets) - 1:
+            by_id = dict(candidates)
+            candidates = [(int(i), by_id[int(i)]) for i in ranked['param_id'].iloc[:keep]]
+    return history
+
+
+def _summarize(history: List[Dict], params_by_id: Dict[int, Dict], n: int, rank_by: str) -> Dict:
+    table = pd.DataFrame(history)
+    final = table[table['bars'] == n].sort_values([rank_by, 'param_id'], ascending=[False, True])
+    final = final.drop_duplicates('param_id').reset_index(drop=True)
+    final.insert(0, 'rank', np.arange(1, len(final) + 1))
+    bar_evaluations = int(table['bars'].sum())
+    return {
+        'best': params_by_id[int(final['param_id'].iloc[0])] if len(final) else {},
+        'ranking': final,
+        'history': table,
+        'evaluations': len(table),
+        'bar_evaluations': bar_evaluations,
+        # 같은 후보를 모두 전체 이력으로 평가하는 격자 탐색 대비 시뮬레이션 봉 수 비율
+        'cost_ratio': bar_evaluations / (len(params_by_id) * n) if params_by_id else 0.0,
+    }
+
+
+def successive_halving(arrays: Dict[str, np.ndarray], params: Sequence[Dict], strategy: str = SIMPLE,
+                       initial_capital: float = 100.0, eta: int = 3, min_bars: Optional[int] = None,
+                       rank_by: str = 'total_pnl', max_workers: Optional[int] = None) -> Dict:
+    """
+    Successive Halving
+
+    Args:
+        arrays: 전체 이력 배열 (sweep.REQUIRED_ARRAYS)
+        params: 후보 파라미터 조합
+        eta: 단계마다 남길 비율의 역수 (평가 구간은 eta배씩 늘어남)
+        min_bars: 첫 단계 평가 봉 수 (기본: 마지막 단계에 후보가 1~eta개 남도록, 최소 MIN_BARS)
+        rank_by: 순위 기준 열 (큰 값이 우수)
+        max_workers: 프로세스 수 (1이면 현재 프로세스에서 실행)
+
+    Returns:
+        {'best': 최종 1위 파라미터, 'ranking': 전체 구간까지 올라간 후보 순위표, 'history': 모든 평가 행,
+         'evaluations', 'bar_evaluations', 'cost_ratio'}
+    """
+    n = len(arrays['close'])
+    if min_bars is None:
+        halvings = int(math.floor(math.log(max(len(params), 1), eta) + 1e-9))
+        min_bars = max(MIN_BARS, n // eta ** halvings)
+    budgets = rung_budgets(n, min_bars, eta)
+
+    with SharedPool(arrays, strategy, initial_capital, max_workers) as pool:
+        history = _halving(pool, list(enumerate(params)), budgets, eta, rank_by)
+    return _summarize(history, dict(enumerate(params)), n, rank_by)
+
+
+def hyperband(arrays: Dict[str, np.ndarray], space: Dict[str, object], strategy: str = SIMPLE,
+              initial_capital: float = 100.0, eta: int = 3, min_bars: int = MIN_BARS,
+              rank_by: str = 'total_pnl', max_workers: Optional[int] = None,
+              seed: Optional[int] = None) -> Dict:
+    """
+    Hyperband (시작 구간 길이가 다른 Successive Halving 브래킷 여러 개)
+    짧은 구간에서 순위가 뒤집히는 전략이 있어도 긴 구간부터 시작하는 브래킷이 보완
+
+    Args:
+        space: random_params 탐색 공간 (목록은 균등 선택, (최소, 최대) 튜플은 균등 실수)
+        min_bars: 가장 공격적인 브래킷의 첫 단계 봉 수
+        seed: 후보 추출 난수 시드
+
+    Returns:
+        successive_halving과 같은 형태 (history에 bracket 열), 'ranking'은 모든 브래킷의 전체 구간 결과
+    """
+    n = len(arrays['close'])
+    s_max = len(rung_budgets(n, min_bars, eta)) - 1
+    history: List[Dict] = []
+    params_by_id: Dict[int, Dict] = {}
+    with SharedPool(arrays, strategy, initial_capital, max_workers) as pool:
+        for s in range(s_max, -1, -1):
+            count = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+            params = random_params(space, count, seed=None if seed is None else seed + s)
+            # 브래킷 사이에 param_id가 겹치지 않도록 이어서 번호 부여
+            candidates = [(len(params_by_id) + i, p) for i, p in enumerate(params)]
+            params_by_id.update(candidates)
+            budgets = rung_budgets(n, max(1, n // eta ** s), eta)
+            history.extend(_halving(pool, candidates, budgets, eta, rank_by, bracket=s))
+    return _summarize(history, params_by_id, n, rank_by)
@@ -0,0 +1,361 @@
+"""
+주문 상태 관리 모듈
+봇이 낸 주문을 orderId / clientOrderId로 색인하고
+NEW → PARTIALLY_FILLED → FILLED / CANCELED / EXPIRED 상태 전이를 추적
+(REST 응답, 사용자 스트림, 폴링 결과를 같은 경로로 반영)
+조건부 주문(algoOrder)은 algoId / clientAlgoId로 따로 색인하고 취소도 algo 엔드포인트 사용
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NEW = 'NEW'
+PARTIALLY_FILLED = 'PARTIALLY_FILLED'
+FILLED = 'FILLED'
+CANCELED = 'CANCELED'
+EXPIRED = 'EXPIRED'
+REJECTED = 'REJECTED'
+
+TERMINAL_STATES = {FILLED, CANCELED, EXPIRED, REJECTED}
+
+# 허용되는 상태 전이 (같은 상태 유지는 항상 허용, 그 외는 늦게 도착한 이벤트로 보고 무시)
+TRANSITIONS = {
+    NEW: {PARTIALLY_FILLED, FILLED, CANCELED, EXPIRED, REJECTED},
+    PARTIALLY_FILLED: {FILLED, CANCELED, EXPIRED},
+}
+
+MAX_CANCEL_BATCH = 10  # DELETE batchOrders 최대 개수
+
+# 조건부 주문 algoStatus → 주문 상태 (발동되면 시장가 주문이 따로 나가므로 조건부 주문 자체는 종료)
+ALGO_STATUS = {
+    'NEW': NEW,
+    'TRIGGERING': NEW,
+    'TRIGGERED': FILLED,
+    'FINISHED': FILLED,
+    'CANCELED': CANCELED,
+    'EXPIRED': EXPIRED,
+    'REJECTED': REJECTED,
+}
+
+
+class OrderRecord:
+    """주문 1건 (수백 개 그리드 주문도 가볍게 유지하도록 __slots__ 사용)"""
+
+    __slots__ = ('order_id', 'client_order_id', 'symbol', 'side', 'position_side', 'order_type',
+                 'price', 'stop_price', 'quantity', 'filled_qty', 'avg_price', 'status',
+                 'tag', 'level', 'update_time', 'algo')
+
+    def __init__(self, order_id: int, client_order_id: str, symbol: str, side: str,
+                 position_side: str, order_type: str, price: float, stop_price: float,
+                 quantity: float, tag: Optional[str] = None, level: Optional[int] = None,
+                 algo: bool = False):
+        self.order_id = order_id
+        self.client_order_id = client_order_id
+        self.symbol = symbol
+        self.side = side
+        self.position_side = position_side
+        self.order_type = order_type
+        self.price = price
+        self.stop_price = stop_price
+        self.quantity = quantity
+        self.filled_qty = 0.0
+        self.avg_price = 0.0
+        self.status = NEW
+        self.tag = tag        # 'entry', 'grid', 'stop_loss', 'take_profit' 등 용도
+        self.level = level    # 그리드 레벨 번호
+        self.update_time = 0
+        self.algo = algo      # 조건부 주문 (order_id = algoId, client_order_id = clientAlgoId)
+
+    @property
+    def is_open(self) -> bool:
+        return self.status not in TERMINAL_STATES
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class OrderManager:
+    """주문 색인 및 상태 머신"""
+
+    def __init__(self, client,
+                 on_update: Optional[Callable[[OrderRecord, float, float], None]] = None,
+                 lock=None, max_closed: int = 1000, max_pending: int = 500):
+        """
+        초기화
+
+        Args:
+            client: binance Client (취소/동기화용)
+            on_update: 주문이 바뀔 때 (record, 새 체결 수량, 체결가)로 호출되는 콜백
+            lock: 호출 측 상태와 함께 묶을 잠금 (기본: 자체 RLock)
+            max_closed: 색인에 남겨 둘 종료 주문 수 (늦게 온 중복 이벤트 판별용)
+            max_pending: 등록 전에 도착한 이벤트를 보관할 최대 개수
+        """
+        self.client = client
+        self.on_update = on_update
+        self.lock = lock or threading.RLock()
+        self.max_closed = max_closed
+        self.max_pending = max_pending
+
+        self._by_id: Dict[int, OrderRecord] = {}
+        self._algo_by_id: Dict[int, OrderRecord] = {}  # algoId는 orderId와 다른 번호 체계
+        self._by_client_id: Dict[str, OrderRecord] = {}
+        self._closed: 'OrderedDict[tuple, None]' = OrderedDict()
+        self._pending: 'OrderedDict[int, Dict]' = OrderedDict()
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def get(self, order_id: int, algo: bool = False) -> Optional[OrderRecord]:
+        return (self._algo_by_id if algo else self._by_id).get(order_id)
+
+    def get_by_client_id(self, client_order_id: str) -> Optional[OrderRecord]:
+        return self._by_client_id.get(client_order_id)
+
+    def open_orders(self, symbol: Optional[str] = None, tag: Optional[str] = None) -> List[OrderRecord]:
+        """미체결 주문 목록 (심볼/용도로 필터)"""
+        with self.lock:
+            return [r for records in (self._by_id, self._algo_by_id) for r in records.values()
+                    if r.is_open and (symbol is None or r.symbol == symbol)
+                    and (tag is None or r.tag == tag)]
+
+    # ------------------------------------------------------------------
+    # 등록 / 상태 반영
+    # ------------------------------------------------------------------
+
+    def track(self, ack: Dict, tag: Optional[str] = None, level: Optional[int] = None) -> OrderRecord:
+        """
+        주문 응답(REST ack)을 등록
+
+        Args:
+            ack: futures_create_order / batchOrders / futures_create_algo_order 응답 항목
+            tag: 주문 용도
+            level: 그리드 레벨 번호
+
+        Returns:
+            등록된 OrderRecord (먼저 도착한 스트림 이벤트가 있으면 반영된 상태)
+        """
+        if 'orderId' not in ack and 'algoId' in ack:
+            return self._track_algo(ack, tag)
+        with self.lock:
+            record = self._by_id.get(ack['orderId'])
+            if record is None:
+                record = OrderRecord(
+                    ack['orderId'], ack.get('clientOrderId', ''), ack['symbol'],
+                    ack.get('side', ''), ack.get('positionSide', 'BOTH'), ack.get('type', ''),
+                    float(ack.get('price') or 0), float(ack.get('stopPrice') or 0),
+                    float(ack.get('origQty') or ack.get('quantity') or 0), tag, level
+                )
+                self._by_id[record.order_id] = record
+                if record.client_order_id:
+                    self._by_client_id[record.client_order_id] = record
+            else:
+                record.tag = tag or record.tag
+                record.level = level if level is not None else record.level
+
+            # 응답 자체에 체결 정보가 있으면 (시장가 주문 등) 반영
+            if 'status' in ack:
+                self._apply(record, ack.get('status'), float(ack.get('executedQty') or 0),
+                            float(ack.get('avgPrice') or 0), ack.get('updateTime', 0))
+            early = self._pending.pop(record.order_id, None)
+            if early:
+                self.apply_update(early)
+            return record
+
+    def _track_algo(self, ack: Dict, tag: Optional[str]) -> OrderRecord:
+        """조건부 주문 응답 등록 (algoId 색인)"""
+        with self.lock:
+            record = self._algo_by_id.get(ack['algoId'])
+            if record is None:
+                record = OrderRecord(
+                    ack['algoId'], ack.get('clientAlgoId', ''), ack['symbol'],
+                    ack.get('side', ''), ack.get('positionSide', 'BOTH'),
+                    ack.get('orderType') or ack.get('type', ''),
+                    float(ack.get('price') or 0), float(ack.get('triggerPrice') or 0),
+                    float(ack.get('quantity') or 0), tag, algo=True
+                )
+                self._algo_by_id[record.order_id] = record
+                if record.client_order_id:
+                    self._by_client_id[record.client_order_id] = record
+            else:
+                record.tag = tag or record.tag
+            if 'algoStatus' in ack:
+                self._apply(record, ALGO_STATUS.get(ack['algoStatus']), record.filled_qty, 0.0,
+                            ack.get('updateTime', 0))
+            return record
+
+    def apply_algo_update(self, order: Dict) -> Optional[OrderRecord]:
+        """
+        ALGO_UPDATE의 'o' 객체 반영 (aid: algoId, X: algoStatus)
+
+        Returns:
+            해당 OrderRecord (추적하지 않는 주문이면 None)
+        """
+        with self.lock:
+            record = self._algo_by_id.get(order.get('aid'))
+            if record is not None:
+                self._apply(record, ALGO_STATUS.get(order.get('X')), record.filled_qty, 0.0,
+                            order.get('T', 0))
+            return record
+
+    def apply_update(self, order: Dict) -> Optional[OrderRecord]:
+        """
+        ORDER_TRADE_UPDATE의 'o' 객체 반영
+
+        Returns:
+            해당 OrderRecord (등록 전 주문이면 보관 후 None)
+        """
+        with self.lock:
+            record = self._by_id.get(order['i'])
+            if record is None:
+                # 주문 응답보다 이벤트가 먼저 올 수 있으므로 최신 이벤트만 보관
+                self._pending[order['i']] = order
+                self._pending.move_to_end(order['i'])
+                while len(self._pending) > self.max_pending:
+                    self._pending.popitem(last=False)
+                return None
+            self._apply(record, order.get('X'), float(order.get('z', 0)),
+                        float(order.get('L', 0)), order.get('T', 0))
+            return record
+
+    def apply_rest(self, order: Dict) -> Optional[OrderRecord]:
+        """futures_get_order 응답 반영 (스트림이 없을 때 폴링 경로)"""
+        with self.lock:
+            record = self._by_id.get(order['orderId'])
+            if record is None:
+                return None
+            filled_qty = float(order.get('executedQty') or 0)
+            avg_price = float(order.get('avgPrice') or 0) or record.price
+            # avgPrice는 누적 평균이므로 새로 체결된 수량의 가격으로 환산
+            delta = filled_qty - record.filled_qty
+            fill_price = (avg_price * filled_qty - record.avg_price * record.filled_qty) / delta if delta > 0 else avg_price
+            self._apply(record, order.get('status'), filled_qty, fill_price, order.get('updateTime', 0))
+            return record
+
+    def _apply(self, record: OrderRecord, status: Optional[str], filled_qty: float,
+               fill_price: float, update_time: int):
+        """상태 전이와 누적 체결 수량 반영 (중복/역순 이벤트는 무시)"""
+        if status is None:
+            return
+        if status != record.status and status not in TRANSITIONS.get(record.status, ()):
+            logger.debug(f"주문 {record.order_id} 상태 전이 무시: {record.status} → {status}")
+            return
+
+        delta = filled_qty - record.filled_qty
+        if delta > 0:
+            record.avg_price = (record.avg_price * record.filled_qty + fill_price * delta) / filled_qty
+            record.filled_qty = filled_qty
+        changed = delta > 0 or status != record.status
+        record.status = status
+        record.update_time = update_time or record.update_time
+
+        if status in TERMINAL_STATES:
+            self._closed[(record.algo, record.order_id)] = None
+            self._prune()
+        if changed and self.on_update:
+            self.on_update(record, max(delta, 0.0), fill_price)
+
+    def _prune(self):
+        while len(self._closed) > self.max_closed:
+            (algo, order_id), _ = self._closed.popitem(last=False)
+            record = (self._algo_by_id if algo else self._by_id).pop(order_id, None)
+            if record and self._by_client_id.get(record.client_order_id) is record:
+                del self._by_client_id[record.client_order_id]
+
+    def sync(self, symbol: str) -> int:
+        """
+        거래소 미체결 주문을 색인에 등록 (재시작 후 기존 주문 인계)
+
+        Returns:
+            새로 등록된 주문 수
+        """
+        orders = self.client.futures_get_open_orders(symbol=symbol)
+        added = 0
+        for order in orders:
+            if order['orderId'] not in self._by_id:
+                self.track(order)
+                added += 1
+        for order in self.client.futures_get_open_algo_orders(symbol=symbol):
+            if order['algoId'] not in self._algo_by_id:
+                self._track_algo(order, None)
+                added += 1
+        return added
+
+    # ------------------------------------------------------------------
+    # 취소
+    # ------------------------------------------------------------------
+
+    def cancel(self, symbol: str, order_ids: Iterable[int], algo: bool = False) -> int:
+        """
+        지정한 주문만 취소 (1건은 단건 취소, 여러 건은 최대 10개씩 batch 취소)
+
+        Args:
+            symbol: 거래쌍
+            order_ids: orderId 목록 (algo면 algoId 목록)
+            algo: 조건부 주문 취소 (algo 일괄 취소가 없으므로 건별)
+
+        Returns:
+            취소 요청이 접수된 주문 수
+        """
+        order_ids = list(order_ids)
+        if algo:
+            return self._cancel_algo(symbol, order_ids)
+        canceled = 0
+        for i in range(0, len(order_ids), MAX_CANCEL_BATCH):
+            chunk = order_ids[i:i + MAX_CANCEL_BATCH]
+            try:
+                if len(chunk) == 1:
+                    results = [self.client.futures_cancel_order(symbol=symbol, orderId=chunk[0])]
+                else:
+                    results = self.client.futures_cancel_orders(symbol=symbol, orderidlist=chunk)
+            except Exception as e:
+                logger.warning(f"{symbol} 주문 취소 실패 ({len(chunk)}건): {e}")
+                continue
+
+            for order_id, result in zip(chunk, results):
+                if result.get('status') == CANCELED or (result.get('orderId') == order_id and 'code' not in result):
+                    canceled += 1
+                    with self.lock:
+                        record = self._by_id.get(order_id)
+                        if record:
+                            self._apply(record, CANCELED, record.filled_qty, 0.0, result.get('updateTime', 0))
+                else:
+                    # 이미 체결/취소된 주문 (-2011 등)은 스트림/폴링이 상태를 맞춤
+                    logger.debug(f"  주문 {order_id} 취소 안 됨: {result.get('msg')}")
+        return canceled
+
+    def _cancel_algo(self, symbol: str, algo_ids: List[int]) -> int:
+        canceled = 0
+        for algo_id in algo_ids:
+            try:
+                result = self.client.futures_cancel_algo_order(symbol=symbol, algoId=algo_id)
+            except Exception as e:
+                # 이미 발동/취소된 주문은 스트림/동기화가 상태를 맞춤
+                logger.debug(f"  조건부 주문 {algo_id} 취소 안 됨: {e}")
+                continue
+            # 성공 응답도 code 필드가 있음 ("200")
+            if str(result.get('code', 200)) != '200':
+                logger.debug(f"  조건부 주문 {algo_id} 취소 안 됨: {result.get('msg')}")
+                continue
+            canceled += 1
+            with self.lock:
+                record = self._algo_by_id.get(algo_id)
+                if record:
+                    self._apply(record, CANCELED, record.filled_qty, 0.0, result.get('updateTime', 0))
+        return canceled
+
+    def cancel_open(self, symbol: str, tag: Optional[str] = None) -> int:
+        """심볼(및 용도)의 추적 중인 미체결 주문만 취소 (시장가 주문은 취소 대상 아님)"""
+        records = [r for r in self.open_orders(symbol, tag) if r.order_type != 'MARKET']
+        canceled = 0
+        order_ids = [r.order_id for r in records if not r.algo]
+        if order_ids:
+            canceled += self.cancel(symbol, order_ids)
+        algo_ids = [r.order_id for r in records if r.algo]
+        if algo_ids:
+            canceled += self.cancel(symbol, algo_ids, algo=True)
+        return canceled
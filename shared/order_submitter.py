@@ -0,0 +1,235 @@
+"""
+주문 제출 모듈
+여러 주문을 batchOrders(호출당 최대 5개)로 묶어 보내고
+주문별 결과를 입력 순서대로 돌려줌 (부분 실패 처리)
+newClientOrderId가 있는 주문은 타임아웃 시 clientOrderId로 조회 후 즉시 재전송 (중복 진입 방지)
+조건부 주문(STOP_MARKET 등)은 algoOrder 엔드포인트로 보내고 clientAlgoId/algoId로 추적
+"""
+
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from binance.exceptions import BinanceAPIException
+
+from .resilience import backoff_delay, is_transient
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ORDERS = 5  # 바이낸스 선물 batchOrders 최대 개수
+MAX_CLIENT_ORDER_ID = 36  # newClientOrderId 최대 길이
+
+DUPLICATE_CLIENT_ORDER_ID = -4116  # 같은 clientOrderId의 주문이 이미 있음
+ORDER_NOT_FOUND = -2013
+
+# 조건부 주문 타입 (order/batchOrders에서 받지 않고 algoOrder로만 접수됨)
+CONDITIONAL_TYPES = {'STOP', 'STOP_MARKET', 'TAKE_PROFIT', 'TAKE_PROFIT_MARKET', 'TRAILING_STOP_MARKET'}
+
+
+def client_order_id(*parts, prefix: str = 'bot') -> str:
+    """
+    주문 의도(심볼, 주기, 용도, 레벨 등)로 만든 결정적 newClientOrderId
+    같은 의도의 주문은 항상 같은 ID이므로 재전송해도 거래소가 중복으로 판별
+
+    Args:
+        *parts: ID를 구성할 값들
+        prefix: 봇 주문 식별용 접두어
+    """
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f"{prefix}_{digest[:MAX_CLIENT_ORDER_ID - len(prefix) - 1]}"
+
+
+def _to_param(value) -> str:
+    """batchOrders 값은 문자열이어야 함 (지수 표기 없이)"""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float):
+        return format(Decimal(str(value)), 'f')
+    return str(value)
+
+
+def is_conditional(order: Dict) -> bool:
+    """algoOrder로 보내야 하는 조건부 주문인지"""
+    return str(order.get('type', '')).upper() in CONDITIONAL_TYPES
+
+
+def to_algo_order(order: Dict) -> Dict:
+    """
+    futures_create_order 인자를 futures_create_algo_order 인자로 변환
+    (newClientOrderId → clientAlgoId, stopPrice → triggerPrice)
+    """
+    if 'algoType' in order:
+        return order
+    algo = dict(order, algoType='CONDITIONAL')
+    client_id = algo.pop('newClientOrderId', None)
+    if client_id:
+        algo['clientAlgoId'] = client_id
+    if 'stopPrice' in algo:
+        algo['triggerPrice'] = algo.pop('stopPrice')
+    return algo
+
+
+def order_id(result: Dict) -> Optional[int]:
+    """주문 응답의 거래소 주문 ID (일반 주문 orderId, 조건부 주문 algoId)"""
+    return result.get('orderId', result.get('algoId'))
+
+
+def is_order_ok(result: Dict) -> bool:
+    """주문 응답이 성공인지 (실패 항목은 code/msg만 있음, 조건부 주문은 algoId)"""
+    return bool(result) and ('orderId' in result or 'algoId' in result)
+
+
+class OrderSubmitter:
+    """batchOrders 기반 주문 제출기"""
+
+    def __init__(self, client, max_workers: int = 4, max_retries: int = 2):
+        """
+        초기화
+
+        Args:
+            client: binance Client
+            max_workers: 배치를 동시에 보낼 최대 스레드 수
+            max_retries: 응답을 받지 못한 주문의 재전송 횟수 (newClientOrderId가 있을 때만)
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.resolved = 0  # 타임아웃/중복 후 clientOrderId 조회로 찾은 주문 수
+
+    def find_order(self, symbol: str, client_id: str) -> Optional[Dict]:
+        """clientOrderId로 주문 조회 (없으면 None, 조회 자체 실패는 예외)"""
+        try:
+            return self.client.futures_get_order(symbol=symbol, origClientOrderId=client_id)
+        except BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND:
+                return None
+            raise
+
+    def find_algo_order(self, symbol: str, client_id: str) -> Optional[Dict]:
+        """clientAlgoId로 조건부 주문 조회 (없으면 None, 조회 자체 실패는 예외)"""
+        try:
+            return self.client.futures_get_algo_order(symbol=symbol, clientAlgoId=client_id)
+        except BinanceAPIException as e:
+            if e.code == ORDER_NOT_FOUND:
+                return None
+            raise
+
+    def create_order(self, order: Dict, unknown: bool = False) -> Dict:
+        """
+        단건 주문 제출
+
+        타임아웃 등으로 접수 여부를 모르면 clientOrderId로 먼저 조회하고,
+        없을 때만 같은 ID로 즉시 재전송 (다음 주기까지 기다리지 않음)
+        조건부 주문은 futures_create_algo_order로 보내고 clientAlgoId로 같은 방식 처리
+
+        Args:
+            order: futures_create_order 인자 (newClientOrderId 권장)
+            unknown: 이미 한 번 보냈지만 결과를 모르는 주문인지
+
+        Returns:
+            주문 응답(조건부 주문은 algoId 응답) 또는 {'code', 'msg'}
+        """
+        if is_conditional(order):
+            order = to_algo_order(order)
+            client_id = order.get('clientAlgoId')
+            send, find = self.client.futures_create_algo_order, self.find_algo_order
+        else:
+            client_id = order.get('newClientOrderId')
+            send, find = self.client.futures_create_order, self.find_order
+        symbol = order['symbol']
+        error = None
+        for attempt in range(1 + self.max_retries):
+            if unknown:
+                try:
+                    found = find(symbol, client_id)
+                except Exception as e:
+                    # 조회도 실패하면 재전송하지 않고 조회만 다시 시도
+                    error = e
+                    time.sleep(backoff_delay(attempt))
+                    continue
+                if found:
+                    self.resolved += 1
+                    logger.info(f"{symbol} 주문 접수 확인 (clientOrderId: {client_id})")
+                    return found
+            try:
+                return send(**order)
+            except Exception as e:
+                error = e
+                if client_id and getattr(e, 'code', None) == DUPLICATE_CLIENT_ORDER_ID:
+                    unknown = True
+                    continue
+                if not client_id or not is_transient(e):
+                    break
+                unknown = True
+                logger.warning(f"{symbol} 주문 응답 없음 - clientOrderId 확인 후 재전송 ({client_id}): {e}")
+        logger.error(f"{symbol} 주문 실패: {error}")
+        return {'code': getattr(error, 'code', None), 'msg': str(error), 'clientOrderId': client_id}
+
+    def _submit_chunk(self, chunk: List[Dict]) -> List[Dict]:
+        payload = [{k: _to_param(v) for k, v in order.items() if v is not None} for order in chunk]
+        try:
+            results = self.client.futures_place_batch_order(batchOrders=payload)
+        except Exception as e:
+            if is_transient(e) and all(order.get('newClientOrderId') for order in chunk):
+                # 일부는 접수됐을 수 있으므로 주문별로 조회 후 없는 것만 재전송
+                logger.warning(f"배치 주문 응답 없음 ({len(chunk)}건) - clientOrderId로 확인: {e}")
+                return [self.create_order(order, unknown=True) for order in chunk]
+            # 배치 전체 실패: 모든 항목을 실패로 표시
+            logger.error(f"배치 주문 실패 ({len(chunk)}건): {e}")
+            code = getattr(e, 'code', None)
+            return [{'code': code, 'msg': str(e)} for _ in chunk]
+
+        if len(results) != len(chunk):
+            logger.error(f"배치 주문 응답 개수 불일치 ({len(results)}/{len(chunk)})")
+            results = list(results) + [{'code': None, 'msg': '응답 없음'}] * (len(chunk) - len(results))
+
+        # 같은 clientOrderId가 이미 있으면 (이전 전송이 접수된 경우) 기존 주문으로 대체
+        for i, (order, result) in enumerate(zip(chunk, results)):
+            if result.get('code') == DUPLICATE_CLIENT_ORDER_ID and order.get('newClientOrderId'):
+                results[i] = self.create_order(order, unknown=True)
+        return results
+
+    def submit_batch(self, orders: List[Dict]) -> List[Dict]:
+        """
+        주문 목록 제출
+
+        일반 주문은 batchOrders로 묶고, 조건부 주문은 algo 일괄 주문이 없으므로
+        건별 algoOrder를 배치와 함께 동시에 전송
+
+        Args:
+            orders: futures_create_order 인자와 같은 형태의 dict 목록
+
+        Returns:
+            입력과 같은 순서의 결과 목록 (성공: 주문 응답, 실패: {'code', 'msg'})
+        """
+        if not orders:
+            return []
+
+        regular = [i for i, order in enumerate(orders) if not is_conditional(order)]
+        conditional = [i for i, order in enumerate(orders) if is_conditional(order)]
+        groups = [regular[i:i + MAX_BATCH_ORDERS] for i in range(0, len(regular), MAX_BATCH_ORDERS)]
+        groups += [[i] for i in conditional]
+
+        def submit(group: List[int]) -> List[Dict]:
+            if is_conditional(orders[group[0]]):
+                return [self.create_order(orders[group[0]])]
+            return self._submit_chunk([orders[i] for i in group])
+
+        if len(groups) == 1:
+            group_results = [submit(groups[0])]
+        else:
+            # 주문 수 한도는 RateLimiter가 관리하므로 배치/조건부 주문은 동시에 전송
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(groups))) as pool:
+                group_results = list(pool.map(submit, groups))
+
+        results: List[Dict] = [{}] * len(orders)
+        for group, group_result in zip(groups, group_results):
+            for i, result in zip(group, group_result):
+                results[i] = result
+        failed = sum(1 for r in results if not is_order_ok(r))
+        if failed:
+            logger.warning(f"배치 주문 부분 실패: {failed}/{len(results)}건")
+        return results
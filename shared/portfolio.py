@@ -0,0 +1,305 @@
+"""
+멀티 심볼 포트폴리오 백테스트 모듈
+여러 심볼을 공통 시간 축의 (봉 x 심볼) 배열로 맞춰 .npy로 저장하고 메모리 맵으로 읽어,
+하나의 지갑/마진을 공유하는 라이브 봇 그리드 흐름을 시간 한 번 순회로 모든 심볼에 동시에 적용
+(심볼별 손익 기여도와 상관관계를 반영한 낙폭 분석 포함)
+"""
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .backtest_core import trade_statistics
+from .monte_carlo import BLOCK, monte_carlo
+from .scoring import MODE_KEEP, MODE_LONG, MODE_SHORT, SIZING, THRESHOLDS
+
+logger = logging.getLogger(__name__)
+
+PANEL_FIELDS = ('open', 'high', 'low', 'close', 'volume', 'short_confidence', 'long_confidence', 'mode_hint')
+
+
+# ----------------------------------------------------------------------
+# 입력 (공통 시간 축 패널, 메모리 맵)
+# ----------------------------------------------------------------------
+
+def build_panel(frames: Dict[str, pd.DataFrame], fields: Sequence[str] = PANEL_FIELDS) -> Dict:
+    """
+    심볼별 DataFrame(time 열 + fields)을 공통 시간 축(합집합)의 (봉 x 심볼) 배열로 정렬
+
+    - 봉이 없는 시점은 valid False, 가격은 직전 종가(상장 전은 첫 종가), 거래량/신뢰도/모드 권고는 0
+
+    Returns:
+        {'time': int64 ns 배열, 'symbols': [...], 'valid': bool (n x S), field: (n x S), ...}
+    """
+    symbols = list(frames)
+    index = pd.DatetimeIndex(sorted(set().union(*(frame['time'] for frame in frames.values()))))
+    aligned = {symbol: frame.set_index('time').reindex(index) for symbol, frame in frames.items()}
+
+    panel = {
+        'time': index.asi8.copy(),
+        'symbols': symbols,
+        'valid': np.column_stack([aligned[s]['close'].notna().to_numpy() for s in symbols]),
+    }
+    closes = {s: aligned[s]['close'].ffill().bfill() for s in symbols}
+    for field in fields:
+        columns = []
+        for symbol in symbols:
+            frame = aligned[symbol]
+            if field == 'close':
+                column = closes[symbol]
+            elif field in ('open', 'high', 'low'):
+                column = frame[field].fillna(closes[symbol])
+            else:
+                column = frame[field].fillna(0) if field in frame else pd.Series(0.0, index=index)
+            columns.append(column.to_numpy(dtype=np.int8 if field == 'mode_hint' else float))
+        panel[field] = np.column_stack(columns)
+    return panel
+
+
+def save_panel(panel: Dict, directory: str):
+    """배열마다 .npy 파일 하나 + symbols.json (load_panel로 메모리 맵 읽기)"""
+    os.makedirs(directory, exist_ok=True)
+    for name, value in panel.items():
+        if name != 'symbols':
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(value))
+    with open(os.path.join(directory, 'symbols.json'), 'w') as f:
+        json.dump(panel['symbols'], f)
+
+
+def load_panel(directory: str, mmap: bool = True) -> Dict:
+    """save_panel 결과 읽기 (mmap이면 np.load(mmap_mode='r'), 필요한 봉만 디스크에서 읽음)"""
+    with open(os.path.join(directory, 'symbols.json')) as f:
+        panel: Dict = {'symbols': json.load(f)}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.npy'):
+            panel[filename[:-4]] = np.load(os.path.join(directory, filename), mmap_mode='r' if mmap else None)
+    return panel
+
+
+# ----------------------------------------------------------------------
+# 시뮬레이션
+# ----------------------------------------------------------------------
+
+def _max_drop(curve: np.ndarray) -> np.ndarray:
+    """곡선(열별)의 최고점 대비 최대 하락폭 (USDT, 양수)"""
+    return (np.maximum.accumulate(curve, axis=0) - curve).max(axis=0)
+
+
+def portfolio_backtest(panel: Dict, initial_capital: float = 100.0, grid_num: int = 3,
+                       grid_spacing: float = 0.5, stop_loss_pct: float = 2.0, trailing_stop_pct: float = 2.0,
+                       sizing: Optional[Dict[str, tuple]] = None, thresholds: Optional[Dict[str, tuple]] = None,
+                       initial_mode: str = 'SHORT', auto_mode_switch: bool = True, margin_sizing: bool = True,
+                       risk=None, bootstrap_paths: int = 2000, seed: Optional[int] = None) -> Dict:
+    """
+    공유 지갑 포트폴리오 백테스트 (심볼마다 simulate_grid와 같은 그리드 흐름)
+
+    - 봉마다 모든 심볼을 배열 연산으로 처리: 레벨 체결(고가/저가) → 종가 트레일링 스탑 청산 → 포지션 없는
+      심볼의 RSI 모드 전환 → 신뢰도가 임계값 이상이면 그리드 배치 (심볼 순서대로)
+    - 크기는 라이브 봇 규칙: 가용 마진 × POSITION_SIZE_PERCENT / 레버리지 (margin_sizing=False면 지갑 잔고 기준),
+      배치한 그리드는 명목가치 / 레버리지만큼 마진을 잡아 다른 심볼의 가용 마진에서 빠짐
+    - risk(RiskEngine)가 있으면 포트폴리오 자본/가용 마진/24시간 거래대금/심볼 노출로 진입 전 검사
+
+    Args:
+        panel: build_panel / load_panel 결과 (PANEL_FIELDS + valid)
+        sizing: 심볼별 (레버리지, 포지션 비율), 기본 SIZING
+        thresholds: 심볼별 (신호, 진입) 임계값, 기본 scoring.THRESHOLDS
+        bootstrap_paths: 낙폭 블록 부트스트랩 경로 수 (0이면 생략)
+
+    Returns:
+        {'time', 'equity' (n + 1), 'margin_used' (n), 'contribution' (심볼별 누적 손익 DataFrame),
+         'trades' (DataFrame), 'attribution' (심볼별 DataFrame), 'correlation' (심볼별 봉 손익 상관),
+         'drawdown' (상관 반영 낙폭 dict), 'statistics', 'mode_switches'}
+    """
+    symbols: List[str] = list(panel['symbols'])
+    high, low, close = panel['high'], panel['low'], panel['close']
+    short_conf, long_conf, hints = panel['short_confidence'], panel['long_confidence'], panel['mode_hint']
+    valid = panel['valid']
+    n, count = close.shape
+
+    sizing = sizing or SIZING
+    thresholds = thresholds or THRESHOLDS
+    leverage = np.array([sizing.get(s, SIZING['BTCUSDT'])[0] for s in symbols], dtype=float)
+    size_pct = np.array([sizing.get(s, SIZING['BTCUSDT'])[1] for s in symbols], dtype=float)
+    threshold = np.array([max(thresholds.get(s, THRESHOLDS['BTCUSDT'])) for s in symbols])
+    steps = np.arange(1, grid_num + 1) * grid_spacing / 100
+
+    volume_24h = None
+    if risk is not None:
+        # 24시간 거래대금 (1시간 봉 24개 합, 심볼별 누적합 차분)
+        turnover = np.cumsum(np.asarray(panel['volume']) * np.asarray(close), axis=0)
+        volume_24h = turnover - np.vstack((np.zeros((24, count)), turnover[:-24]))[:n]
+        risk.update_equity(initial_capital, initial_capital)
+
+    mode = np.full(count, MODE_LONG if initial_mode == 'LONG' else MODE_SHORT, dtype=np.int8)
+    side = np.zeros(count, dtype=np.int8)
+    levels = np.zeros((count, grid_num))
+    level_qtys = np.zeros((count, grid_num))
+    filled = np.zeros((count, grid_num), dtype=bool)
+    placed_at = np.full(count, -1)
+    first_fill = np.full(count, -1)
+    quantity = np.zeros(count)
+    cost = np.zeros(count)
+    extreme = np.zeros(count)
+    stop = np.zeros(count)
+    reserved = np.zeros(count)
+    realized = np.zeros(count)
+
+    balance = float(initial_capital)
+    switches = 0
+    equity = np.empty(n + 1)
+    equity[0] = initial_capital
+    margin_used = np.empty(n)
+    contribution = np.empty((n, count))
+    trades = []
+
+    for i in range(n):
+        bar_high, bar_low, price = high[i], low[i], close[i]
+        live = valid[i]
+        is_short = side == MODE_SHORT
+
+        # 1) 배치 다음 봉부터 레벨 체결
+        active = (side != 0) & (placed_at < i) & live
+        if active.any():
+            touched = np.where(is_short[:, None], bar_high[:, None] >= levels, bar_low[:, None] <= levels)
+            new = touched & ~filled & active[:, None]
+            if new.any():
+                quantity += (level_qtys * new).sum(axis=1)
+                cost += (level_qtys * levels * new).sum(axis=1)
+                filled |= new
+                first_fill = np.where((first_fill < 0) & new.any(axis=1), i, first_fill)
+
+        # 2) 포지션 모니터링: 종가 트레일링 스탑
+        holding = (quantity > 0) & live
+        flat = (quantity == 0) & live
+        if holding.any():
+            better = holding & np.where(is_short, price < extreme, price > extreme)
+            extreme = np.where(better, price, extreme)
+            trail = np.where(is_short, extreme * (1 + trailing_stop_pct / 100),
+                             extreme * (1 - trailing_stop_pct / 100))
+            stop = np.where(better, np.where(is_short, np.minimum(stop, trail), np.maximum(stop, trail)), stop)
+            hit = holding & np.where(is_short, price >= stop, price <= stop)
+            for s in np.flatnonzero(hit):
+                entry_price = cost[s] / quantity[s]
+                direction = -1 if side[s] == MODE_SHORT else 1
+                pnl = direction * (price[s] - entry_price) * quantity[s]
+                balance += pnl
+                realized[s] += pnl
+                trades.append((symbols[s], int(first_fill[s]), i, 'SHORT' if direction < 0 else 'LONG',
+                               entry_price, float(price[s]), float(quantity[s]), pnl,
+                               direction * (price[s] - entry_price) / entry_price * 100, 'TRAILING_STOP',
+                               int(filled[s].sum())))
+                if risk is not None:
+                    risk.update_exposure(symbols[s], 0.0)
+            if hit.any():
+                side[hit] = 0
+                quantity[hit] = cost[hit] = 0.0
+                filled[hit] = False
+                reserved[hit] = 0.0
+
+        # 3) 포지션 없는 심볼 분석 (이번 봉에 청산한 심볼 제외): 모드 전환 → 진입 (심볼 순서대로 공유 마진 차감)
+        if auto_mode_switch:
+            hint = hints[i]
+            switch = flat & (hint != MODE_KEEP) & (hint != mode)
+            if switch.any():
+                switches += int(switch.sum())
+                mode = np.where(switch, hint, mode).astype(np.int8)
+                side[switch] = 0          # 체결 전 그리드 취소
+                reserved[switch] = 0.0
+                if risk is not None:
+                    for s in np.flatnonzero(switch):
+                        risk.update_exposure(symbols[s], 0.0)
+        confidence = np.where(mode == MODE_SHORT, short_conf[i], long_conf[i])
+        candidates = np.flatnonzero(flat & (confidence >= threshold))
+        if len(candidates):
+            unrealized = np.where(quantity > 0, np.where(side == MODE_SHORT, -1, 1) *
+                                  (price * quantity - cost), 0.0)
+            account_equity = balance + unrealized.sum()
+            for s in candidates:
+                # 기존 미체결 그리드는 진입이 통과하면 교체되므로 그 마진은 가용으로 계산
+                available = account_equity - reserved.sum() + reserved[s]
+                base = available if margin_sizing else balance
+                total_value = max(base, 0.0) * size_pct[s] / leverage[s]
+                if risk is not None:
+                    risk.update_equity(account_equity, available)
+                    risk.update_volume(symbols[s], volume_24h[i, s])
+                    reject_reason = risk.check(symbols[s], total_value, leverage[s])
+                    if reject_reason:
+                        logger.debug(f"[{i}] {symbols[s]} 진입 거부: {reject_reason}")
+                        continue
+                if total_value <= 0:
+                    continue
+                side[s] = mode[s]
+                direction = 1 if side[s] == MODE_SHORT else -1
+                levels[s] = price[s] * (1 + direction * steps)
+                level_qtys[s] = total_value / grid_num / levels[s]
+                filled[s] = False
+                placed_at[s] = i
+                first_fill[s] = -1
+                extreme[s] = price[s]
+                stop[s] = levels[s, -1] * (1 + direction * stop_loss_pct / 100)
+                reserved[s] = total_value / leverage[s]
+                if risk is not None:
+                    risk.update_exposure(symbols[s], total_value)
+
+        # 4) 기록 (미실현 손익은 종가 평가)
+        unrealized = np.where(quantity > 0, np.where(side == MODE_SHORT, -1, 1) * (price * quantity - cost), 0.0)
+        contribution[i] = realized + unrealized
+        equity[i + 1] = balance + unrealized.sum()
+        margin_used[i] = reserved.sum()
+        if risk is not None:
+            risk.update_equity(equity[i + 1])
+
+    trade_table = pd.DataFrame(trades, columns=['symbol', 'entry_index', 'exit_index', 'side', 'entry_price',
+                                                'exit_price', 'quantity', 'pnl', 'pnl_pct', 'reason',
+                                                'filled_levels'])
+    times = pd.to_datetime(np.asarray(panel['time']))
+    contribution_table = pd.DataFrame(contribution, index=times, columns=symbols)
+
+    # 심볼별 기여도
+    standalone = _max_drop(np.vstack((np.zeros((1, count)), contribution)))
+    grouped = trade_table.groupby('symbol')['pnl']
+    attribution = pd.DataFrame({
+        'trades': grouped.count().reindex(symbols, fill_value=0),
+        'win_rate': grouped.apply(lambda p: (p > 0).mean() * 100).reindex(symbols, fill_value=0.0),
+        'pnl': contribution[-1] if n else np.zeros(count),
+        'contribution_pct': (contribution[-1] / initial_capital * 100) if n else np.zeros(count),
+        'standalone_drawdown': standalone,
+    }, index=symbols)
+
+    # 상관 반영 낙폭: 봉 손익 상관, 실제 포트폴리오 낙폭 vs 심볼별 낙폭 합(완전 상관 가정),
+    # 포트폴리오 봉 수익률 블록 부트스트랩 (같은 봉의 심볼 간 상관 유지)
+    bar_pnl = np.diff(np.vstack((np.zeros((1, count)), contribution)), axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        correlation = pd.DataFrame(np.corrcoef(bar_pnl, rowvar=False).reshape(count, count),
+                                   index=symbols, columns=symbols)
+    portfolio_drop = float(_max_drop(equity[:, None])[0])
+    drawdown = {
+        'max_drawdown': float(np.min((equity - np.maximum.accumulate(equity)) /
+                                     np.maximum.accumulate(equity)) * 100),
+        'max_drawdown_usdt': portfolio_drop,
+        'sum_standalone_usdt': float(standalone.sum()),
+        'diversification_ratio': float(standalone.sum() / portfolio_drop) if portfolio_drop > 0 else 0.0,
+    }
+    if bootstrap_paths and n > 1:
+        mc = monte_carlo(initial_capital, equity=equity, method=BLOCK, paths=bootstrap_paths, seed=seed)
+        drawdown['bootstrap_p50'] = mc['max_drawdown']['p50']
+        drawdown['bootstrap_p5'] = mc['max_drawdown']['p5']
+
+    statistics = trade_statistics(trade_table['pnl'].to_numpy(dtype=float), equity, initial_capital)
+    statistics['final_balance'] = balance
+    return {
+        'time': times,
+        'equity': equity,
+        'margin_used': margin_used,
+        'contribution': contribution_table,
+        'trades': trade_table,
+        'attribution': attribution,
+        'correlation': correlation,
+        'drawdown': drawdown,
+        'statistics': statistics,
+        'mode_switches': switches,
+    }
@@ -0,0 +1,264 @@
+"""
+요청 가중치/주문 수 제한 모듈
+바이낸스 선물 IP 가중치(X-MBX-USED-WEIGHT-1M)와 주문 수(X-MBX-ORDER-COUNT-*)를
+클라이언트에서 추적하고 우선순위별 토큰 버킷으로 요청을 조절
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (숫자가 작을수록 먼저)
+PRIORITY_HIGH = 0    # 주문/취소
+PRIORITY_NORMAL = 1  # 계좌/포지션 조회
+PRIORITY_LOW = 2     # 캔들/거래소 정보 등 대량 조회
+
+# 우선순위별로 남겨둘 버킷 비율 (낮은 우선순위는 여유분을 건드리지 못함)
+PRIORITY_RESERVE = {
+    PRIORITY_HIGH: 0.0,
+    PRIORITY_NORMAL: 0.1,
+    PRIORITY_LOW: 0.3,
+}
+
+# 엔드포인트별 IP 가중치 (/fapi/vN/ 이후 경로 기준, 메서드별)
+ENDPOINT_WEIGHTS = {
+    ('GET', 'ping'): 1,
+    ('GET', 'time'): 1,
+    ('GET', 'exchangeInfo'): 1,
+    ('GET', 'premiumIndex'): 1,
+    ('GET', 'leverageBracket'): 1,
+    ('GET', 'account'): 5,
+    ('GET', 'balance'): 5,
+    ('GET', 'positionRisk'): 5,
+    ('GET', 'order'): 1,
+    ('GET', 'allOrders'): 5,
+    ('GET', 'userTrades'): 5,
+    ('GET', 'income'): 30,
+    ('POST', 'order'): 0,
+    ('POST', 'batchOrders'): 5,
+    ('PUT', 'order'): 1,
+    ('DELETE', 'order'): 1,
+    ('DELETE', 'batchOrders'): 1,
+    ('DELETE', 'allOpenOrders'): 1,
+    ('GET', 'algoOrder'): 1,
+    ('POST', 'algoOrder'): 0,
+    ('DELETE', 'algoOrder'): 1,
+    ('DELETE', 'algoOpenOrders'): 1,
+    ('POST', 'leverage'): 1,
+    ('POST', 'marginType'): 1,
+    ('POST', 'positionSide/dual'): 1,
+    ('POST', 'listenKey'): 1,
+    ('PUT', 'listenKey'): 1,
+    ('DELETE', 'listenKey'): 1,
+}
+
+# 주문 수 제한에 포함되는 엔드포인트: (10초 카운트, 1분 카운트)
+ORDER_COUNTS = {
+    ('POST', 'order'): (1, 1),
+    ('POST', 'batchOrders'): (5, 1),
+    ('PUT', 'order'): (1, 1),
+    ('POST', 'algoOrder'): (1, 1),
+}
+
+HIGH_PRIORITY_PATHS = {'order', 'batchOrders', 'allOpenOrders', 'countdownCancelAll', 'algoOrder', 'algoOpenOrders'}
+LOW_PRIORITY_PATHS = {'klines', 'continuousKlines', 'markPriceKlines', 'exchangeInfo',
+                      'ticker/24hr', 'income', 'allOrders', 'userTrades'}
+
+
+def _klines_weight(limit: int) -> int:
+    """klines 가중치는 limit에 따라 달라짐"""
+    if limit < 100:
+        return 1
+    if limit < 500:
+        return 2
+    if limit <= 1000:
+        return 5
+    return 10
+
+
+def endpoint_name(path: str) -> str:
+    """'/fapi/v1/ticker/price' -> 'ticker/price'"""
+    parts = path.strip('/').split('/')
+    if len(parts) > 2 and parts[1].startswith('v'):
+        parts = parts[2:]
+    return '/'.join(parts)
+
+
+def endpoint_cost(method: str, path: str, params: Optional[Dict] = None) -> Tuple[int, int, int, int]:
+    """
+    요청 비용 계산
+
+    Args:
+        method: HTTP 메서드
+        path: '/fapi/v1/klines' 형태의 경로 (또는 'klines')
+        params: 요청 파라미터
+
+    Returns:
+        (가중치, 10초 주문 수, 1분 주문 수, 우선순위)
+    """
+    method = method.upper()
+    params = params or {}
+    name = endpoint_name(path)
+
+    if name in ('klines', 'continuousKlines', 'markPriceKlines'):
+        weight = _klines_weight(int(params.get('limit', 500)))
+    elif name == 'ticker/price':
+        weight = 1 if params.get('symbol') else 2
+    elif name == 'ticker/24hr':
+        weight = 1 if params.get('symbol') else 40
+    elif name in ('openOrders', 'openAlgoOrders') and method == 'GET':
+        weight = 1 if params.get('symbol') else 40
+    else:
+        weight = ENDPOINT_WEIGHTS.get((method, name), 1)
+
+    orders_10s, orders_1m = ORDER_COUNTS.get((method, name), (0, 0))
+
+    if name in HIGH_PRIORITY_PATHS:
+        priority = PRIORITY_HIGH
+    elif name in LOW_PRIORITY_PATHS:
+        priority = PRIORITY_LOW
+    else:
+        priority = PRIORITY_NORMAL
+
+    return weight, orders_10s, orders_1m, priority
+
+
+class TokenBucket:
+    """기간 내 허용량을 일정 속도로 회복하는 토큰 버킷"""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float, reserve: float, now: float) -> float:
+        """amount만큼 쓰고도 reserve 비율이 남을 때까지 필요한 대기 시간"""
+        self._refill(now)
+        needed = amount + self.capacity * reserve - self.tokens
+        if needed <= 0 or amount == 0:
+            return 0.0
+        return needed / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= amount
+
+    def sync(self, used: float, now: float):
+        """서버가 알려준 사용량 기준으로 보정 (서버 값이 더 많이 썼다면 그에 맞춤)"""
+        self._refill(now)
+        self.tokens = min(self.tokens, self.capacity - used)
+
+
+class RateLimiter:
+    """요청 가중치/주문 수 기반 우선순위 스로틀러"""
+
+    WEIGHT_LIMIT_1M = 2400
+    ORDER_LIMIT_10S = 300
+    ORDER_LIMIT_1M = 1200
+
+    def __init__(self, weight_limit: int = WEIGHT_LIMIT_1M, order_limit_10s: int = ORDER_LIMIT_10S,
+                 order_limit_1m: int = ORDER_LIMIT_1M, safety: float = 0.9):
+        """
+        초기화
+
+        Args:
+            weight_limit: 1분 IP 가중치 한도
+            order_limit_10s: 10초 주문 수 한도
+            order_limit_1m: 1분 주문 수 한도
+            safety: 한도 중 실제로 사용할 비율
+        """
+        self.weight = TokenBucket(weight_limit * safety, 60)
+        self.orders_10s = TokenBucket(order_limit_10s * safety, 10)
+        self.orders_1m = TokenBucket(order_limit_1m * safety, 60)
+        self._cond = threading.Condition()
+        self._waiting = {PRIORITY_HIGH: 0, PRIORITY_NORMAL: 0, PRIORITY_LOW: 0}
+        self._blocked_until = 0.0
+
+        # 통계
+        self.used_weight_1m = 0
+        self.order_count_1m = 0
+        self.order_count_10s = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.bans = 0
+
+    def _higher_waiting(self, priority: int) -> bool:
+        return any(self._waiting[p] for p in self._waiting if p < priority)
+
+    def acquire(self, method: str, path: str, params: Optional[Dict] = None):
+        """요청 전에 호출. 한도 여유가 생길 때까지 대기"""
+        weight, orders_10s, orders_1m, priority = endpoint_cost(method, path, params)
+        reserve = PRIORITY_RESERVE[priority]
+        started = time.monotonic()
+
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = max(
+                        self._blocked_until - now,
+                        self.weight.wait_time(weight, reserve, now),
+                        self.orders_10s.wait_time(orders_10s, reserve, now),
+                        self.orders_1m.wait_time(orders_1m, reserve, now),
+                    )
+                    # 더 높은 우선순위 요청이 대기 중이면 양보
+                    if wait <= 0 and not self._higher_waiting(priority):
+                        break
+                    self._cond.wait(timeout=wait if wait > 0 else 0.05)
+
+                self.weight.consume(weight)
+                self.orders_10s.consume(orders_10s)
+                self.orders_1m.consume(orders_1m)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        if waited > 0.01:
+            self.throttled += 1
+            self.total_wait += waited
+            logger.debug(f"요청 대기 {waited:.2f}s ({method} {path})")
+
+    def update_from_headers(self, headers, status_code: int = 200):
+        """응답 헤더의 사용량으로 버킷 보정, 429/418이면 Retry-After 동안 차단"""
+        now = time.monotonic()
+        with self._cond:
+            used = headers.get('X-MBX-USED-WEIGHT-1M')
+            if used is not None:
+                self.used_weight_1m = int(used)
+                self.weight.sync(self.used_weight_1m, now)
+            count_1m = headers.get('X-MBX-ORDER-COUNT-1M')
+            if count_1m is not None:
+                self.order_count_1m = int(count_1m)
+                self.orders_1m.sync(self.order_count_1m, now)
+            count_10s = headers.get('X-MBX-ORDER-COUNT-10S')
+            if count_10s is not None:
+                self.order_count_10s = int(count_10s)
+                self.orders_10s.sync(self.order_count_10s, now)
+
+            if status_code in (418, 429):
+                retry_after = float(headers.get('Retry-After', 60))
+                self._blocked_until = max(self._blocked_until, now + retry_after)
+                self.bans += 1
+                logger.warning(f"⚠️ 요청 한도 초과 ({status_code}) - {retry_after:.0f}초 동안 요청 중단")
+            self._cond.notify_all()
+
+    def get_stats(self) -> Dict:
+        """사용량 통계"""
+        return {
+            'used_weight_1m': self.used_weight_1m,
+            'order_count_1m': self.order_count_1m,
+            'order_count_10s': self.order_count_10s,
+            'weight_tokens': self.weight.tokens,
+            'throttled': self.throttled,
+            'total_wait': self.total_wait,
+            'bans': self.bans,
+        }
@@ -0,0 +1,94 @@
+"""
+REST 호출 복원력 모듈
+지터가 있는 지수 백오프, 일시적 오류 판별, 엔드포인트별 서킷 브레이커
+"""
+
+import logging
+import random
+import threading
+import time
+
+import requests
+from binance.exceptions import BinanceAPIException, BinanceRequestException
+
+logger = logging.getLogger(__name__)
+
+# 서버 측 일시 오류 코드 (-1001: 내부 연결 끊김, -1007: 백엔드 응답 시간 초과)
+TRANSIENT_ERROR_CODES = {-1001, -1007}
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 요청을 보내지 않음"""
+
+    def __init__(self, key: str, retry_in: float):
+        self.key = key
+        self.retry_in = retry_in
+        super().__init__(f"{key} 서킷 열림 ({retry_in:.1f}초 후 재시도 가능)")
+
+
+def is_transient(error: Exception) -> bool:
+    """재시도로 해결될 수 있는 오류인지 (타임아웃/연결 오류/5xx)"""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, BinanceAPIException):
+        return error.status_code >= 500 or error.code in TRANSIENT_ERROR_CODES
+    return isinstance(error, BinanceRequestException)
+
+
+def backoff_delay(attempt: int, base: float = 0.2, cap: float = 5.0) -> float:
+    """full jitter 지수 백오프 (attempt는 0부터)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 쌓이면 일정 시간 요청을 막는 서킷 브레이커
+    CLOSED → (연속 실패) → OPEN → (대기 후) → HALF_OPEN → 성공 시 CLOSED
+    """
+
+    CLOSED = 'CLOSED'
+    OPEN = 'OPEN'
+    HALF_OPEN = 'HALF_OPEN'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        """
+        초기화
+
+        Args:
+            failure_threshold: OPEN으로 전환할 연속 실패 횟수
+            reset_timeout: OPEN 유지 시간 (초), 이후 한 건만 시험 요청 허용
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> bool:
+        """실패 기록. 이번 실패로 서킷이 열렸으면 True"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                opened = self.state != self.OPEN
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+                return opened
+            return False
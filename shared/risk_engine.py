@@ -0,0 +1,138 @@
+"""
+사전 위험 검사 모듈
+주문 직전에 REST 호출 없이 캐시된 상태(자본, 가용 마진, 24시간 거래량, 심볼 노출)만으로
+진입 가능 여부를 판단 (라이브 봇과 백테스터가 같은 규칙 사용)
+"""
+
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RiskEngine:
+    """캐시 기반 사전 위험 검사"""
+
+    def __init__(self, max_drawdown_percent: float = 10, min_volume_usdt: float = 0,
+                 max_leverage: int = 0, max_order_notional: float = 0,
+                 max_symbol_exposure_percent: float = 0, exchange_info=None):
+        """
+        초기화 (한도가 0이면 해당 검사 생략)
+
+        Args:
+            max_drawdown_percent: 자본 최고점 대비 허용 낙폭 (%)
+            min_volume_usdt: 최소 24시간 거래대금 (USDT)
+            max_leverage: 최대 레버리지
+            max_order_notional: 주문 1건 최대 명목가치 (USDT)
+            max_symbol_exposure_percent: 심볼별 노출 한도 (자본 대비 %, 명목가치 기준)
+            exchange_info: ExchangeInfoCache (레버리지 구간별 최대 레버리지 확인)
+        """
+        self.max_drawdown_percent = max_drawdown_percent
+        self.min_volume_usdt = min_volume_usdt
+        self.max_leverage = max_leverage
+        self.max_order_notional = max_order_notional
+        self.max_symbol_exposure_percent = max_symbol_exposure_percent
+        self.exchange_info = exchange_info
+
+        self.equity = 0.0
+        self.peak_equity = 0.0       # 자본 최고점 (high-water mark)
+        self.available_margin = None  # None이면 마진 검사 생략 (백테스트 등)
+        self.volumes: Dict[str, float] = {}
+        self.exposure: Dict[str, float] = {}
+        self.updated_at = 0.0
+
+        # 통계
+        self.checks = 0
+        self.rejects = 0
+
+    def update_equity(self, equity: float, available_margin: Optional[float] = None):
+        """자본(지갑 잔고 + 미실현손익)과 가용 마진 갱신, 최고점 추적"""
+        self.equity = equity
+        self.peak_equity = max(self.peak_equity, equity)
+        if available_margin is not None:
+            self.available_margin = available_margin
+        self.updated_at = time.monotonic()
+
+    def update_volume(self, symbol: str, quote_volume: float):
+        """24시간 거래대금 (USDT)"""
+        self.volumes[symbol] = quote_volume
+
+    def update_exposure(self, symbol: str, notional: float):
+        """심볼 노출 (포지션 + 미체결 진입 주문의 명목가치 절대값)"""
+        self.exposure[symbol] = abs(notional)
+
+    def drawdown_percent(self) -> float:
+        if self.peak_equity <= 0:
+            return 0.0
+        return max(0.0, (self.peak_equity - self.equity) / self.peak_equity * 100)
+
+    def is_stale(self, max_age: float) -> bool:
+        """캐시가 max_age초보다 오래됐는지"""
+        return time.monotonic() - self.updated_at > max_age
+
+    def check(self, symbol: str, notional: float, leverage: float) -> Optional[str]:
+        """
+        진입 전 위험 검사
+
+        Args:
+            symbol: 거래쌍
+            notional: 진입할 명목가치 (USDT)
+            leverage: 레버리지
+
+        Returns:
+            문제가 없으면 None, 있으면 거부 사유 문자열
+        """
+        self.checks += 1
+        reason = self._check(symbol, notional, leverage)
+        if reason:
+            self.rejects += 1
+        return reason
+
+    def _check(self, symbol: str, notional: float, leverage: float) -> Optional[str]:
+        if notional <= 0:
+            return "주문 금액 없음"
+
+        if self.max_drawdown_percent:
+            drawdown = self.drawdown_percent()
+            if drawdown >= self.max_drawdown_percent:
+                return f"최대 낙폭 초과 ({drawdown:.2f}% >= {self.max_drawdown_percent}%)"
+
+        if self.min_volume_usdt:
+            volume = self.volumes.get(symbol)
+            if volume is None:
+                return f"{symbol} 24시간 거래량 정보 없음"
+            if volume < self.min_volume_usdt:
+                return f"24시간 거래대금 부족 ({volume:,.0f} < {self.min_volume_usdt:,.0f} USDT)"
+
+        if self.max_leverage and leverage > self.max_leverage:
+            return f"레버리지 한도 초과 ({leverage}x > {self.max_leverage}x)"
+        if self.exchange_info is not None:
+            filters = self.exchange_info.get(symbol)
+            bracket_max = filters.max_leverage(notional) if filters else 0
+            if bracket_max and leverage > bracket_max:
+                return f"레버리지 구간 한도 초과 ({leverage}x > {bracket_max}x, 명목가치 {notional:,.0f})"
+
+        if self.max_order_notional and notional > self.max_order_notional:
+            return f"주문 명목가치 한도 초과 ({notional:,.2f} > {self.max_order_notional:,.2f})"
+
+        if self.available_margin is not None and notional / leverage > self.available_margin:
+            return f"가용 마진 부족 ({notional / leverage:,.2f} > {self.available_margin:,.2f})"
+
+        if self.max_symbol_exposure_percent and self.equity > 0:
+            exposure = self.exposure.get(symbol, 0.0) + notional
+            limit = self.equity * self.max_symbol_exposure_percent / 100
+            if exposure > limit:
+                return f"{symbol} 노출 한도 초과 ({exposure:,.2f} > {limit:,.2f})"
+
+        return None
+
+    def get_stats(self) -> Dict:
+        return {
+            'equity': self.equity,
+            'peak_equity': self.peak_equity,
+            'drawdown_percent': self.drawdown_percent(),
+            'available_margin': self.available_margin,
+            'checks': self.checks,
+            'rejects': self.rejects,
+        }
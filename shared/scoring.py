@@ -0,0 +1,201 @@
+"""
+신호 점수 커널
+라이브 봇의 8점 점수(_analyze_short_signal/_analyze_long_signal)와 RSI 모드 전환 규칙을
+배열 연산으로 계산 (스칼라 한 봉 또는 전체 이력, 라이브 봇과 백테스터 공용)
+"""
+
+import logging
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_SCORE = 8
+
+# 모드 권고 코드
+MODE_KEEP = 0
+MODE_SHORT = -1
+MODE_LONG = 1
+
+# 봇별 (신호 임계값, 진입 임계값) - BotConfig.SIGNAL_THRESHOLD / ENTRY_THRESHOLD가 이 값을 읽음
+THRESHOLDS = {
+    'BTCUSDT': (0.25, 0.35),
+    'ETHUSDT': (0.50, 0.50),
+}
+
+# 봇별 (레버리지, 포지션 비율) - BotConfig.LEVERAGE / POSITION_SIZE_PERCENT가 이 값을 읽음
+SIZING = {
+    'BTCUSDT': (3, 0.05),
+    'ETHUSDT': (2, 0.15),
+}
+
+# 봇별 사전 위험 검사 한도 (RiskEngine 인자) - BotConfig.MAX_DRAWDOWN_PERCENT 등과 백테스터가 이 값을 읽음
+RISK_LIMITS = {
+    'BTCUSDT': {'max_drawdown_percent': 10, 'min_volume_usdt': 10000, 'max_leverage': 5,
+                'max_order_notional': 0, 'max_symbol_exposure_percent': 100},
+    'ETHUSDT': {'max_drawdown_percent': 10, 'min_volume_usdt': 10000, 'max_leverage': 5,
+                'max_order_notional': 0, 'max_symbol_exposure_percent': 100},
+}
+
+# 라이브 봇 calculate_indicators와 같은 최소 캔들 수 / 다이버전스 구간
+MIN_CANDLES = 50
+DIVERGENCE_LOOKBACK = 50
+PIVOT_ORDER = 5
+
+
+def bot_params(symbol: str) -> Dict:
+    """심볼별 라이브 봇 레버리지/포지션 비율/임계값 (백테스터 기본 파라미터, 없는 심볼은 BTCUSDT 규칙)"""
+    leverage, position_size_pct = SIZING.get(symbol, SIZING['BTCUSDT'])
+    signal_threshold, entry_threshold = THRESHOLDS.get(symbol, THRESHOLDS['BTCUSDT'])
+    return {
+        'leverage': leverage,
+        'position_size_pct': position_size_pct,
+        'signal_threshold': signal_threshold,
+        'entry_threshold': entry_threshold,
+    }
+
+
+def risk_limits(symbol: str) -> Dict:
+    """심볼별 라이브 봇 위험 검사 한도 (RiskEngine(**risk_limits(symbol)), 없는 심볼은 BTCUSDT 규칙)"""
+    return dict(RISK_LIMITS.get(symbol, RISK_LIMITS['BTCUSDT']))
+
+
+def short_score(rsi, macd, macd_signal, macd_hist, price, bb_mid, sma_20, divergence,
+                prev_macd_hist=0.0, overbought: float = 70):
+    """
+    SHORT 점수 (0~8)
+    RSI > overbought +2 (> 65 +1), MACD < Signal +1 (히스토그램 < 0 and < 이전 히스토그램 +1),
+    가격 > 볼린저 중심선 and > SMA20 +1, 베어리쉬 다이버전스 +2
+    """
+    rsi = np.asarray(rsi, dtype=float)
+    macd_below = np.asarray(macd) < np.asarray(macd_signal)
+    macd_hist = np.asarray(macd_hist, dtype=float)
+    price = np.asarray(price, dtype=float)
+    return (np.where(rsi > overbought, 2, np.where(rsi > 65, 1, 0))
+            + macd_below
+            + (macd_below & (macd_hist < 0) & (macd_hist < prev_macd_hist))
+            + ((price > bb_mid) & (price > sma_20))
+            + 2 * np.asarray(divergence, dtype=bool))
+
+
+def long_score(rsi, macd, macd_signal, macd_hist, price, bb_mid, sma_20, divergence,
+               prev_macd_hist=0.0, oversold: float = 30):
+    """
+    LONG 점수 (0~8), SHORT의 반대 조건
+    RSI < oversold +2 (< 35 +1), MACD > Signal +1 (히스토그램 > 0 and > 이전 히스토그램 +1),
+    가격 < 볼린저 중심선 and < SMA20 +1, 불리시 다이버전스 +2
+    """
+    rsi = np.asarray(rsi, dtype=float)
+    macd_above = np.asarray(macd) > np.asarray(macd_signal)
+    macd_hist = np.asarray(macd_hist, dtype=float)
+    price = np.asarray(price, dtype=float)
+    return (np.where(rsi < oversold, 2, np.where(rsi < 35, 1, 0))
+            + macd_above
+            + (macd_above & (macd_hist > 0) & (macd_hist > prev_macd_hist))
+            + ((price < bb_mid) & (price < sma_20))
+            + 2 * np.asarray(divergence, dtype=bool))
+
+
+def mode_recommendation(rsi, long_threshold: float = 60, short_threshold: float = 40) -> np.ndarray:
+    """RSI 기반 모드 권고 (MODE_LONG / MODE_SHORT / MODE_KEEP, 사이 구간은 현재 모드 유지)"""
+    rsi = np.asarray(rsi, dtype=float)
+    return np.where(rsi > long_threshold, MODE_LONG,
+                    np.where(rsi < short_threshold, MODE_SHORT, MODE_KEEP)).astype(np.int8)
+
+
+def _pivot_flags(arr: np.ndarray, order: int) -> Tuple[np.ndarray, np.ndarray]:
+    """좌우 order개를 포함한 창에서 최고/최저인 위치 (find_pivots와 같은 NaN 무시 비교)"""
+    series = pd.Series(arr)
+    window = 2 * order + 1
+    highs = arr == series.rolling(window, center=True, min_periods=1).max().to_numpy()
+    lows = arr == series.rolling(window, center=True, min_periods=1).min().to_numpy()
+    return highs, lows
+
+
+def _last_two(pivots: np.ndarray, lo: np.ndarray, hi: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """봉마다 [lo, hi] 구간 안의 마지막 두 피벗 인덱스 (valid, 직전, 마지막)"""
+    if len(pivots) < 2:
+        zeros = np.zeros(len(hi), dtype=np.intp)
+        return np.zeros(len(hi), dtype=bool), zeros, zeros
+    k = np.searchsorted(pivots, hi, side='right') - 1
+    last = pivots[np.clip(k, 0, None)]
+    prev = pivots[np.clip(k - 1, 0, None)]
+    valid = (k >= 1) & (prev >= lo)
+    return valid, prev, last
+
+
+def divergence_series(close: np.ndarray, rsi: np.ndarray, lookback: int = DIVERGENCE_LOOKBACK,
+                      order: int = PIVOT_ORDER) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    봉마다 최근 lookback개 캔들의 RSI 다이버전스 (find_pivots + detect_*_divergence와 같은 결과)
+
+    창 [s, t] 안의 피벗은 좌우 order개가 모두 창 안에 있는 [s + order, t - order] 구간뿐이고,
+    그 구간에서는 창 기준 피벗과 전체 배열 기준 피벗이 같으므로 전체 피벗을 한 번만 계산
+
+    Returns:
+        (bearish, bullish) bool 배열
+    """
+    close = np.asarray(close, dtype=float)
+    rsi = np.asarray(rsi, dtype=float)
+    n = len(close)
+    t = np.arange(n)
+    lo = np.maximum(0, t - lookback + 1) + order
+    hi = t - order
+
+    with np.errstate(invalid='ignore'):
+        price_highs, price_lows = _pivot_flags(close, order)
+        rsi_highs, rsi_lows = _pivot_flags(rsi, order)
+
+    def compare(price_flags, rsi_flags, bearish):
+        p_ok, p_prev, p_last = _last_two(np.flatnonzero(price_flags), lo, hi)
+        r_ok, r_prev, r_last = _last_two(np.flatnonzero(rsi_flags), lo, hi)
+        with np.errstate(invalid='ignore'):
+            if bearish:
+                # 가격은 올랐지만 RSI는 내려감
+                hit = (close[p_last] > close[p_prev]) & (rsi[r_last] < rsi[r_prev])
+            else:
+                # 가격은 내렸지만 RSI는 올라감
+                hit = (close[p_last] < close[p_prev]) & (rsi[r_last] > rsi[r_prev])
+        return p_ok & r_ok & hit
+
+    return compare(price_highs, rsi_highs, True), compare(price_lows, rsi_lows, False)
+
+
+def confidence_series(close, rsi, macd, macd_signal, macd_hist, sma_20, bb_mid,
+                      overbought: float = 70, oversold: float = 30,
+                      long_threshold: float = 60, short_threshold: float = 40) -> Dict[str, np.ndarray]:
+    """
+    전체 이력의 SHORT/LONG 신뢰도 (라이브 봇이 봉 t에서 계산하는 값과 같은 규칙)
+    NaN 지표는 라이브 봇과 같은 기본값 사용 (RSI 50, MACD 0, SMA/볼린저 중심선은 현재가),
+    MIN_CANDLES개 미만 구간은 0
+
+    Returns:
+        {'short_confidence', 'long_confidence', 'bearish_divergence', 'bullish_divergence', 'mode'}
+    """
+    close = np.asarray(close, dtype=float)
+    raw_rsi = np.asarray(rsi, dtype=float)
+    bearish, bullish = divergence_series(close, raw_rsi)
+
+    rsi = np.where(np.isnan(raw_rsi), 50.0, raw_rsi)
+    macd = np.nan_to_num(np.asarray(macd, dtype=float))
+    macd_signal = np.nan_to_num(np.asarray(macd_signal, dtype=float))
+    macd_hist = np.nan_to_num(np.asarray(macd_hist, dtype=float))
+    sma_20 = np.where(np.isnan(sma_20), close, sma_20)
+    bb_mid = np.where(np.isnan(bb_mid), close, bb_mid)
+
+    short_confidence = short_score(rsi, macd, macd_signal, macd_hist, close, bb_mid, sma_20,
+                                   bearish, overbought=overbought) / MAX_SCORE
+    long_confidence = long_score(rsi, macd, macd_signal, macd_hist, close, bb_mid, sma_20,
+                                 bullish, oversold=oversold) / MAX_SCORE
+    short_confidence[:MIN_CANDLES - 1] = 0.0
+    long_confidence[:MIN_CANDLES - 1] = 0.0
+
+    return {
+        'short_confidence': short_confidence,
+        'long_confidence': long_confidence,
+        'bearish_divergence': bearish,
+        'bullish_divergence': bullish,
+        'mode': mode_recommendation(rsi, long_threshold, short_threshold),
+    }
@@ -0,0 +1,412 @@
+"""
+파라미터 스윕 모듈
+시장 데이터 배열을 공유 메모리에 한 번만 올리고 프로세스 풀에서 파라미터 조합을 병렬 평가
+(워커는 배열을 복사하지 않고 이름으로 연결, 결과는 완료 순서대로 받아 표로 정리)
+"""
+
+import csv
+import itertools
+import logging
+import os
+import random
+from multiprocessing import Pool, shared_memory
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest_core import grid_ladder_trades, simulate_grid, simulate_short, trade_statistics
+from .fills import RangeExtrema
+from .scoring import bot_params
+
+logger = logging.getLogger(__name__)
+
+# 전략별 기본 파라미터 (라이브 봇/run_backtest 기본값, 라이브 레버리지/비율/임계값은 BTCUSDT 봇 값)
+SIMPLE = 'simple'
+LIVE = 'live'
+DEFAULT_PARAMS = {
+    SIMPLE: {'stop_loss_pct': 2.0, 'take_profit_pct': 5.0, 'position_size_pct': 0.15, 'leverage': 2},
+    LIVE: dict({'grid_num': 3, 'grid_spacing': 0.5, 'stop_loss_pct': 2.0, 'trailing_stop_pct': 2.0,
+                'initial_mode': 'SHORT', 'auto_mode_switch': True}, **bot_params('BTCUSDT')),
+}
+# 전략별 필요한 배열
+REQUIRED_ARRAYS = {
+    SIMPLE: ('close', 'signal'),
+    LIVE: ('high', 'low', 'close', 'short_confidence', 'long_confidence', 'mode_hint'),
+}
+
+
+class SharedArrays:
+    """이름 있는 numpy 배열 묶음을 공유 메모리에 복사 (with 블록이 끝나면 해제)"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self._blocks: List[shared_memory.SharedMemory] = []
+        self.spec: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+                self.spec[name] = (block.name, array.shape, array.dtype.str)
+        except Exception:
+            self.close()
+            raise
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks)
+
+    def close(self):
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach(spec: Dict[str, Tuple[str, Tuple[int, ...], str]]) -> Tuple[Dict[str, np.ndarray], List]:
+    """
+    공유 메모리 배열 연결 (복사 없음)
+
+    Returns:
+        (배열 dict, 연결 객체 목록 - 배열을 쓰는 동안 참조 유지)
+    """
+    arrays = {}
+    blocks = []
+    for name, (block_name, shape, dtype) in spec.items():
+        # 풀 워커는 부모의 리소스 추적기를 함께 쓰므로 등록은 중복되지 않고, 해제는 부모가 담당
+        block = shared_memory.SharedMemory(name=block_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+    return arrays, blocks
+
+
+def grid_params(space: Dict[str, Sequence]) -> List[Dict]:
+    """모든 조합 (itertools.product)"""
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+
+def random_params(space: Dict[str, object], samples: int, seed: Optional[int] = None) -> List[Dict]:
+    """
+    무작위 조합
+
+    Args:
+        space: 키별 후보 목록(list, 균등 선택) 또는 (최소, 최대) 튜플(균등 실수)
+        samples: 조합 수
+        seed: 난수 시드
+    """
+    rng = random.Random(seed)
+    params = []
+    for _ in range(samples):
+        row = {}
+        for key, values in space.items():
+            if isinstance(values, tuple):
+                row[key] = rng.uniform(*values)
+            else:
+                row[key] = rng.choice(list(values))
+        params.append(row)
+    return params
+
+
+def simulate(arrays: Dict[str, np.ndarray], params: Dict, strategy: str = SIMPLE,
+             initial_capital: float = 100.0,
+             close_at_end: bool = False) -> Tuple[np.ndarray, np.ndarray, float, Dict]:
+    """
+    파라미터 한 조합 시뮬레이션 (백테스트 코어 사용, 거래 dict 생성 없음)
+
+    Returns:
+        (거래별 손익 배열, 자본 곡선, 최종 잔액, 전략별 추가 통계)
+    """
+    p = dict(DEFAULT_PARAMS[strategy], **params)
+    if strategy == SIMPLE:
+        trades, equity, balance = simulate_short(
+            arrays['close'], arrays['signal'], initial_capital, p['leverage'],
+            p['stop_loss_pct'], p['take_profit_pct'], p['position_size_pct'],
+            close_at_end=close_at_end
+        )
+        pnls = [trade[5] for trade in trades]
+        extra = {}
+    elif strategy == LIVE:
+        trades, equity, balance, switches = simulate_grid(
+            arrays['high'], arrays['low'], arrays['close'],
+            arrays['short_confidence'], arrays['long_confidence'], arrays['mode_hint'],
+            initial_capital, p['leverage'], p['signal_threshold'], p['entry_threshold'],
+            grid_num=int(p['grid_num']), grid_spacing=p['grid_spacing'], stop_loss_pct=p['stop_loss_pct'],
+            trailing_stop_pct=p['trailing_stop_pct'], position_size_pct=p['position_size_pct'],
+            initial_mode=p['initial_mode'], auto_mode_switch=p['auto_mode_switch'],
+            close_at_end=close_at_end
+        )
+        pnls = [trade[6] for trade in trades]
+        extra = {'mode_switches': switches}
+    else:
+        raise ValueError(f"지원하지 않는 전략: {strategy}")
+    return np.array(pnls, dtype=float), equity, balance, extra
+
+
+def evaluate(arrays: Dict[str, np.ndarray], params: Dict, strategy: str = SIMPLE,
+             initial_capital: float = 100.0) -> Dict:
+    """
+    파라미터 한 조합 백테스트
+
+    Returns:
+        trade_statistics 결과 + final_balance
+    """
+    pnls, equity, balance, extra = simulate(arrays, params, strategy, initial_capital)
+    stats = trade_statistics(pnls, equity, initial_capital)
+    stats['final_balance'] = balance
+    stats.update(extra)
+    return stats
+
+
+# ----------------------------------------------------------------------
+# 워커 (프로세스마다 한 번 공유 메모리에 연결)
+# ----------------------------------------------------------------------
+
+_worker_arrays: Dict[str, np.ndarray] = {}
+_worker_blocks: List = []
+_worker_config: Dict = {}
+
+
+def _init_worker(spec: Dict, strategy: str, initial_capital: float):
+    arrays, blocks = attach(spec)
+    _worker_arrays.update(arrays)
+    _worker_blocks.extend(blocks)
+    _worker_config['strategy'] = strategy
+    _worker_config['initial_capital'] = initial_capital
+
+
+class SharedPool:
+    """
+    공유 메모리 배열 + 워커 풀 (여러 번 나눠 실행하는 최적화에서 풀을 한 번만 생성)
+    작업 함수는 모듈 최상위 함수이며 _worker_arrays / _worker_config로 데이터와 설정을 읽음
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], strategy: str = SIMPLE,
+                 initial_capital: float = 100.0, max_workers: Optional[int] = None):
+        """
+        초기화
+
+        Args:
+            arrays: 전략에 필요한 배열 (REQUIRED_ARRAYS)
+            max_workers: 프로세스 수 (기본: CPU 수, 1이면 현재 프로세스에서 실행)
+        """
+        missing = [name for name in REQUIRED_ARRAYS[strategy] if name not in arrays]
+        if missing:
+            raise ValueError(f"{strategy} 전략에 필요한 배열 없음: {missing}")
+        arrays = {name: arrays[name] for name in REQUIRED_ARRAYS[strategy]}
+        self.workers = max_workers or os.cpu_count() or 1
+        self._shared: Optional[SharedArrays] = None
+        self._pool = None
+
+        if self.workers == 1:
+            _worker_arrays.update(arrays)
+            _worker_config.update(strategy=strategy, initial_capital=initial_capital)
+            return
+        self._shared = SharedArrays(arrays)
+        try:
+            self._pool = Pool(self.workers, initializer=_init_worker,
+                              initargs=(self._shared.spec, strategy, initial_capital))
+        except Exception:
+            self._shared.close()
+            raise
+        logger.info(f"워커 {self.workers}개, 공유 메모리 {self._shared.nbytes / 1024 / 1024:.1f}MB")
+
+    def imap(self, func: Callable, tasks: Sequence) -> Iterator:
+        """작업 실행, 끝나는 순서대로 결과를 내보냄"""
+        if self._pool is None:
+            return map(func, tasks)
+        return self._pool.imap_unordered(func, tasks)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+        _worker_arrays.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def map_shared(arrays: Dict[str, np.ndarray], func: Callable, tasks: Sequence, strategy: str = SIMPLE,
+               initial_capital: float = 100.0, max_workers: Optional[int] = None) -> Iterator:
+    """배열을 공유 메모리에 올리고 작업을 프로세스 풀에서 실행, 끝나는 순서대로 결과를 내보냄 (SharedPool 참고)"""
+    with SharedPool(arrays, strategy, initial_capital, max_workers) as pool:
+        logger.info(f"작업 {len(tasks)}개")
+        yield from pool.imap(func, tasks)
+
+
+def _evaluate_chunk(arrays: Dict[str, np.ndarray], chunk: List[Tuple[int, Dict]], **labels) -> List[Dict]:
+    """(param_id, 파라미터) 묶음 평가, 실패한 조합은 error 열로 기록"""
+    rows = []
+    for index, params in chunk:
+        try:
+            stats = evaluate(arrays, params, _worker_config['strategy'], _worker_config['initial_capital'])
+        except Exception as e:
+            stats = {'error': str(e)}
+        rows.append(dict(params, **labels, param_id=index, **stats))
+    return rows
+
+
+def _run_chunk(chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    return _evaluate_chunk(_worker_arrays, chunk)
+
+
+def iter_sweep(arrays: Dict[str, np.ndarray], params: Sequence[Dict], strategy: str = SIMPLE,
+               initial_capital: float = 100.0, max_workers: Optional[int] = None,
+               chunksize: Optional[int] = None) -> Iterator[Dict]:
+    """
+    파라미터 조합을 프로세스 풀에서 평가, 끝나는 순서대로 결과 행을 내보냄
+
+    Args:
+        arrays: 전략에 필요한 배열 (REQUIRED_ARRAYS)
+        params: 파라미터 조합 목록
+        strategy: SIMPLE 또는 LIVE
+        initial_capital: 초기 자본
+        max_workers: 프로세스 수 (기본: CPU 수, 1이면 현재 프로세스에서 실행)
+        chunksize: 작업 하나에 묶을 조합 수 (기본: 워커당 약 8개 작업)
+    """
+    indexed = list(enumerate(params))
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(indexed) // (workers * 8))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+    for rows in map_shared(arrays, _run_chunk, chunks, strategy, initial_capital, workers):
+        yield from rows
+
+
+def run_sweep(arrays: Dict[str, np.ndarray], params: Sequence[Dict], strategy: str = SIMPLE,
+              initial_capital: float = 100.0, max_workers: Optional[int] = None,
+              chunksize: Optional[int] = None, rank_by: str = 'total_pnl',
+              csv_path: Optional[str] = None,
+              on_result: Optional[Callable[[Dict], None]] = None) -> pd.DataFrame:
+    """
+    스윕 실행 후 순위표 반환
+
+    Args:
+        rank_by: 순위 기준 열 (큰 값이 1위)
+        csv_path: 주어지면 결과를 받는 즉시 한 줄씩 기록
+        on_result: 결과 행마다 호출 (진행 상황 표시 등)
+
+    Returns:
+        rank 열이 추가된 결과 DataFrame (rank_by 내림차순)
+    """
+    rows = []
+    writer = None
+    csv_file = open(csv_path, 'w', newline='') if csv_path else None
+    try:
+        for row in iter_sweep(arrays, params, strategy, initial_capital, max_workers, chunksize):
+            rows.append(row)
+            if csv_file:
+                if writer is None:
+                    writer = csv.DictWriter(csv_file, fieldnames=list(row), extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerow(row)
+            if on_result:
+                on_result(row)
+    finally:
+        if csv_file:
+            csv_file.close()
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values([rank_by, 'param_id'], ascending=[False, True]).reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
+
+
+# ----------------------------------------------------------------------
+# 그리드 변형 비교 (사다리별 독립 시뮬레이션)
+# ----------------------------------------------------------------------
+
+def grid_placements(arrays: Dict[str, np.ndarray], side: str, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    신뢰도가 threshold 이상인 봉마다 사다리 배치, 체결 전이면 다음 배치 봉에 교체 (simulate_grid와 같음,
+    이미 체결이 시작된 사다리는 grid_ladder_trades가 교체하지 않음)
+
+    Returns:
+        (배치 봉, 유효 끝 봉 - 다음 배치 봉 + 1)
+    """
+    confidence = arrays['short_confidence'] if side == 'SHORT' else arrays['long_confidence']
+    placed_at = np.flatnonzero(confidence >= threshold)
+    expire = np.append(placed_at[1:] + 1, len(confidence))
+    return placed_at, expire
+
+
+def evaluate_grid(arrays: Dict[str, np.ndarray], params: Dict, initial_capital: float = 100.0,
+                  extrema: Optional[RangeExtrema] = None) -> Dict:
+    """
+    그리드 변형 하나를 모든 배치 봉의 독립 사다리로 평가 (잔액 복리/포지션 겹침 제한 없음)
+
+    params: DEFAULT_PARAMS[LIVE] 키 + side ('SHORT'/'LONG')
+    """
+    p = dict(DEFAULT_PARAMS[LIVE], side='SHORT')
+    p.update(params)
+    placed_at, expire = grid_placements(arrays, p['side'], max(p['signal_threshold'], p['entry_threshold']))
+    result = grid_ladder_trades(
+        arrays['high'], arrays['low'], arrays['close'], placed_at, -1 if p['side'] == 'SHORT' else 1,
+        initial_capital * p['position_size_pct'] / p['leverage'], int(p['grid_num']), p['grid_spacing'],
+        p['stop_loss_pct'], p['trailing_stop_pct'], expire=expire, extrema=extrema
+    )
+    opened = result['first_fill'] >= 0
+    pnls = result['pnl'][opened & (result['exit_index'] >= 0)]
+    return {
+        'ladders': len(placed_at),
+        'filled_ladders': int(opened.sum()),
+        'fill_rate': float(opened.mean() * 100) if len(placed_at) else 0.0,
+        'avg_filled_levels': float(result['filled_levels'][opened].mean()) if opened.any() else 0.0,
+        'closed_trades': len(pnls),
+        'win_rate': float((pnls > 0).mean() * 100) if len(pnls) else 0.0,
+        'avg_pnl_pct': float(result['pnl_pct'][opened].mean()) if opened.any() else 0.0,
+        'total_pnl': float(result['pnl'].sum()),
+    }
+
+
+def _run_grid_chunk(chunk: List[Tuple[int, Dict]]) -> List[Dict]:
+    extrema = RangeExtrema(_worker_arrays['high'], _worker_arrays['low'])
+    rows = []
+    for index, params in chunk:
+        try:
+            stats = evaluate_grid(_worker_arrays, params, _worker_config['initial_capital'], extrema)
+        except Exception as e:
+            stats = {'error': str(e)}
+        rows.append(dict(params, param_id=index, **stats))
+    return rows
+
+
+def run_grid_variants(arrays: Dict[str, np.ndarray], params: Sequence[Dict], initial_capital: float = 100.0,
+                      max_workers: Optional[int] = None, chunksize: Optional[int] = None,
+                      rank_by: str = 'total_pnl') -> pd.DataFrame:
+    """
+    그리드 변형(레벨 수/간격/손절/트레일링/임계값/방향) 비교표
+    변형마다 모든 사다리를 배열 연산으로 한 번에 평가하고 변형 묶음은 프로세스 풀에서 병렬 실행
+
+    Returns:
+        rank 열이 추가된 결과 DataFrame (rank_by 내림차순)
+    """
+    indexed = list(enumerate(params))
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = chunksize or max(1, len(indexed) // (workers * 8))
+    chunks = [indexed[i:i + chunksize] for i in range(0, len(indexed), chunksize)]
+    rows = [row for chunk_rows in map_shared(arrays, _run_grid_chunk, chunks, LIVE, initial_capital, workers)
+            for row in chunk_rows]
+
+    table = pd.DataFrame(rows)
+    if table.empty:
+        return table
+    table = table.sort_values([rank_by, 'param_id'], ascending=[False, True]).reset_index(drop=True)
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
@@ -8,24 +8,31 @@ import logging
 from datetime import datetime
 from typing import Optional
 
+try:
+    from .http_session import get_shared_session
+except ImportError:  # setup_telegram.py / test_telegram.py처럼 shared 폴더에서 스크립트로 실행
+    from http_session import get_shared_session
+
 logger = logging.getLogger(__name__)
 
 
 class TelegramNotifier:
     """Telegram 알림 클래스"""
 
-    def __init__(self, token: str, chat_id: str):
+    def __init__(self, token: str, chat_id: str, session: Optional[requests.Session] = None):
         """
         초기화
 
         Args:
             token: Telegram Bot Token
             chat_id: Telegram Chat ID
+            session: 사용할 requests 세션 (없으면 keep-alive 공유 세션)
         """
         self.token = token
         self.chat_id = chat_id
         self.base_url = f"https://api.telegram.org/bot{token}"
         self.enabled = bool(token and chat_id)
+        self.session = session or get_shared_session()
 
     def send_message(self, message: str) -> bool:
         """메시지 전송"""
@@ -39,7 +46,7 @@ class TelegramNotifier:
                 "text": message,
                 "parse_mode": "Markdown"
             }
-            response = requests.post(url, data=data, timeout=5)
+            response = self.session.post(url, data=data, timeout=5)
             return response.status_code == 200
         except Exception as e:
             logger.error(f"❌ Telegram 메시지 전송 실패: {e}")
@@ -0,0 +1,292 @@
+"""
+백테스트 코어 동등성 테스트 (pytest)
+배열/벡터화 구현이 봉 단위 참조 루프와 같은 거래, 자본 곡선, 위험 검사 결과를 내는지
+무작위 가격 경로로 확인
+"""
+
+from sys import path as sys_path
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys_path.insert(0, str(Path(__file__).parent.parent))
+from shared.backtest_core import (
+    SIGNAL_CLOSE, SIGNAL_SHORT, grid_ladder_trades, simulate_grid, simulate_short,
+    simulate_short_intrabar, trade_statistics
+)
+from shared.fills import first_touch
+from shared.indicators import RSI, detect_bearish_divergence, detect_bullish_divergence, find_pivots
+from shared.risk_engine import RiskEngine
+from shared.scoring import DIVERGENCE_LOOKBACK, PIVOT_ORDER, divergence_series
+
+
+def random_bars(n: int, seed: int, volatility: float = 0.01):
+    """무작위 OHLC (시가 갭 포함)"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, 0.002, n))
+    high = np.maximum(close, open_) * (1 + rng.uniform(0, 0.01, n))
+    low = np.minimum(close, open_) * (1 - rng.uniform(0, 0.01, n))
+    return rng, open_, high, low, close
+
+
+def random_signals(rng, n: int) -> np.ndarray:
+    return rng.choice([0, SIGNAL_SHORT, SIGNAL_CLOSE], n, p=[0.9, 0.05, 0.05]).astype(np.int8)
+
+
+# ----------------------------------------------------------------------
+# 참조 루프 (벡터화 전 BacktestEngine.backtest와 같은 봉 단위 흐름)
+# ----------------------------------------------------------------------
+
+def reference_short(close, codes, capital, leverage, stop_loss_pct, take_profit_pct, size_pct,
+                    risk=None, volume_24h=None):
+    """종가 기준 숏 루프 (거부 시 그 봉 자본으로 위험 엔진 갱신)"""
+    equity = [capital]
+    balance = capital
+    position = None
+    trades = []
+    if risk is not None:
+        risk.update_equity(capital)
+    for i, price in enumerate(close):
+        if position:
+            entry_index, entry_price, quantity = position
+            loss_pct = (price - entry_price) / entry_price * 100
+            reason = None
+            if loss_pct > stop_loss_pct:
+                reason = 'STOP_LOSS'
+            elif loss_pct < -take_profit_pct:
+                reason = 'TAKE_PROFIT'
+            elif codes[i] in (SIGNAL_CLOSE, SIGNAL_SHORT):
+                reason = 'SIGNAL'
+            if reason:
+                pnl = (entry_price - price) * quantity * leverage
+                balance += pnl
+                trades.append((entry_index, i, entry_price, price, quantity, pnl,
+                               (entry_price - price) / entry_price * 100, reason))
+                position = None
+
+        if not position and codes[i] == SIGNAL_SHORT:
+            position_value = balance * size_pct / leverage
+            if risk is not None:
+                risk.update_volume('X', volume_24h[i])
+                if risk.check('X', position_value * leverage, leverage):
+                    equity.append(balance)
+                    risk.update_equity(balance)
+                    continue
+            position = (i, price, position_value / price)
+
+        if position:
+            equity.append(balance + (position[1] - price) * position[2] * leverage)
+        else:
+            equity.append(balance)
+        if risk is not None:
+            risk.update_equity(equity[-1])
+    return trades, np.array(equity), balance
+
+
+def reference_touch(high, low, open_, start, entry, side, stop_loss_pct, take_profit_pct, trailing_pct, end):
+    """첫 터치 봉/가격/사유(0 손절, 1 익절, 2 트레일링) - 봉마다 스탑/익절 가격을 다시 계산"""
+    short = side < 0
+    if stop_loss_pct is None:
+        stop0 = np.inf if short else -np.inf
+    else:
+        stop0 = entry * (1 + stop_loss_pct / 100) if short else entry * (1 - stop_loss_pct / 100)
+    if take_profit_pct is None:
+        target = -np.inf if short else np.inf
+    else:
+        target = entry * (1 - take_profit_pct / 100) if short else entry * (1 + take_profit_pct / 100)
+    extreme = entry
+    for j in range(start, end):
+        stop = stop0
+        if trailing_pct is not None:
+            trail = extreme * (1 + trailing_pct / 100) if short else extreme * (1 - trailing_pct / 100)
+            stop = min(stop, trail) if short else max(stop, trail)
+        stop_hit = high[j] >= stop if short else low[j] <= stop
+        target_hit = low[j] <= target if short else high[j] >= target
+        if stop_hit or target_hit:
+            level = stop if stop_hit else target
+            if open_ is not None:
+                gap = open_[j]
+                # 시가가 이미 레벨을 넘어 있으면 시가에 체결
+                if stop_hit and ((short and gap > level) or (not short and gap < level)):
+                    level = gap
+                if not stop_hit and ((short and gap < level) or (not short and gap > level)):
+                    level = gap
+            reason = (2 if stop != stop0 else 0) if stop_hit else 1
+            return j, level, reason
+        extreme = min(extreme, low[j]) if short else max(extreme, high[j])
+    return -1, np.nan, -1
+
+
+def reference_short_intrabar(open_, high, low, close, codes, capital, leverage, stop_loss_pct,
+                             take_profit_pct, size_pct, trailing_pct, risk=None, volume_24h=None):
+    """봉 내부 터치 숏 루프 (터치가 종료 신호보다 우선)"""
+    equity = [capital]
+    balance = capital
+    in_position = False
+    trades = []
+    last = peak = capital
+    if risk is not None:
+        risk.update_equity(capital)
+    for i, price in enumerate(close):
+        if in_position:
+            stop0 = entry_price * (1 + stop_loss_pct / 100)
+            stop = stop0 if trailing_pct is None else min(stop0, extreme * (1 + trailing_pct / 100))
+            target = entry_price * (1 - take_profit_pct / 100)
+            reason = None
+            if high[i] >= stop:
+                level = max(stop, open_[i])
+                reason = 'TRAILING_STOP' if stop != stop0 else 'STOP_LOSS'
+            elif low[i] <= target:
+                level = min(target, open_[i])
+                reason = 'TAKE_PROFIT'
+            elif codes[i] in (SIGNAL_SHORT, SIGNAL_CLOSE):
+                level = price
+                reason = 'SIGNAL'
+            if reason:
+                pnl = (entry_price - level) * quantity * leverage
+                balance += pnl
+                trades.append((entry_index, i, entry_price, level, quantity, pnl,
+                               (entry_price - level) / entry_price * 100, reason))
+                in_position = False
+            else:
+                extreme = min(extreme, low[i])
+
+        if not in_position and codes[i] == SIGNAL_SHORT:
+            position_value = balance * size_pct / leverage
+            rejected = False
+            if risk is not None:
+                risk.update_equity(peak)
+                risk.update_equity(last)
+                risk.update_volume('X', volume_24h[i])
+                rejected = bool(risk.check('X', position_value * leverage, leverage))
+            if not rejected:
+                in_position = True
+                entry_price = extreme = price
+                entry_index = i
+                quantity = position_value / price
+
+        last = balance + (entry_price - price) * quantity * leverage if in_position else balance
+        equity.append(last)
+        peak = max(peak, last)
+    return trades, np.array(equity), balance
+
+
+def assert_same_trades(expected, actual):
+    assert len(expected) == len(actual)
+    for a, b in zip(expected, actual):
+        assert a[:2] == b[:2] and a[-1] == b[-1]
+        np.testing.assert_allclose(a[2:-1], b[2:-1], rtol=1e-12, atol=1e-12)
+
+
+# ----------------------------------------------------------------------
+# 테스트
+# ----------------------------------------------------------------------
+
+@pytest.mark.parametrize('with_risk', [False, True])
+def test_simulate_short_matches_reference(with_risk):
+    rng, _, _, _, close = random_bars(20000, seed=2)
+    codes = random_signals(rng, len(close))
+    volume = rng.uniform(0, 2e4, len(close))
+    risks = [RiskEngine(max_drawdown_percent=3, min_volume_usdt=10000, max_leverage=5) if with_risk else None
+             for _ in range(2)]
+
+    ref_trades, ref_equity, ref_balance = reference_short(close, codes, 100, 2, 2.0, 5.0, 0.5,
+                                                          risks[0], volume)
+    trades, equity, balance = simulate_short(close, codes, 100, 2, 2.0, 5.0, 0.5,
+                                             risk=risks[1], symbol='X', volume_24h=volume)
+
+    assert_same_trades(ref_trades, trades)
+    np.testing.assert_allclose(ref_equity, equity)
+    assert balance == pytest.approx(ref_balance)
+    stats = trade_statistics(np.array([t[5] for t in trades]), equity, 100)
+    assert stats['total_trades'] == len(ref_trades)
+    if with_risk:
+        assert risks[1].rejects == risks[0].rejects > 0
+        assert risks[1].peak_equity == pytest.approx(risks[0].peak_equity)
+
+
+@pytest.mark.parametrize('trailing_pct', [None, 1.0])
+@pytest.mark.parametrize('with_risk', [False, True])
+def test_simulate_short_intrabar_matches_reference(trailing_pct, with_risk):
+    rng, open_, high, low, close = random_bars(5000, seed=4)
+    codes = random_signals(rng, len(close))
+    volume = rng.uniform(0, 2e4, len(close))
+    risks = [RiskEngine(max_drawdown_percent=3, min_volume_usdt=10000, max_leverage=5) if with_risk else None
+             for _ in range(2)]
+
+    ref_trades, ref_equity, ref_balance = reference_short_intrabar(
+        open_, high, low, close, codes, 100, 2, 2.0, 5.0, 0.5, trailing_pct, risks[0], volume)
+    trades, equity, balance = simulate_short_intrabar(
+        high, low, close, codes, 100, 2, 2.0, 5.0, 0.5, trailing_pct, open_,
+        risk=risks[1], symbol='X', volume_24h=volume)
+
+    assert_same_trades(ref_trades, trades)
+    np.testing.assert_allclose(ref_equity, equity)
+    assert balance == pytest.approx(ref_balance)
+    if trailing_pct is not None:
+        assert any(t[-1] == 'TRAILING_STOP' for t in trades)
+
+
+@pytest.mark.parametrize('stop_loss_pct, take_profit_pct, trailing_pct, gaps', [
+    (2, 5, None, False), (2, 5, 1.5, True), (None, None, 2, True), (3, None, 1, False), (None, 4, None, True),
+])
+def test_first_touch_matches_reference(stop_loss_pct, take_profit_pct, trailing_pct, gaps):
+    rng, open_, high, low, close = random_bars(3000, seed=0)
+    n, m = len(close), 400
+    start = rng.integers(1, n, m)
+    side = rng.choice([-1, 1], m)
+    end = np.minimum(start + rng.integers(1, 2000, m), n)
+    open_ = open_ if gaps else None
+
+    result = first_touch(high, low, start, close[start - 1], side, stop_loss_pct, take_profit_pct,
+                         trailing_pct, open_, end, window=8)
+    for i in range(m):
+        index, price, reason = reference_touch(high, low, open_, start[i], close[start[i] - 1], side[i],
+                                               stop_loss_pct, take_profit_pct, trailing_pct, end[i])
+        assert result['exit_index'][i] == index
+        assert result['reason'][i] == reason
+        if index >= 0:
+            assert result['exit_price'][i] == pytest.approx(price, rel=1e-12)
+
+
+@pytest.mark.parametrize('mode, side', [('SHORT', -1), ('LONG', 1)])
+def test_simulate_grid_matches_isolated_ladders(mode, side):
+    _, _, high, low, close = random_bars(4000, seed=5, volatility=0.006)
+    n = len(close)
+    placed = np.arange(100, n - 300, 300)
+    short_conf, long_conf = np.zeros(n), np.zeros(n)
+    (short_conf if side < 0 else long_conf)[placed] = 1.0
+
+    trades, equity, _, switches = simulate_grid(
+        high, low, close, short_conf, long_conf, np.zeros(n, dtype=np.int8), 100, 2, 0.5, 0.5,
+        grid_num=4, grid_spacing=0.4, stop_loss_pct=2.0, trailing_stop_pct=1.5, position_size_pct=0.5,
+        initial_mode=mode, auto_mode_switch=False)
+    # 체결 전 그리드는 다음 배치 봉 분석에서 교체됨
+    ladders = grid_ladder_trades(high, low, close, placed, side, 100 * 0.5 / 2, 4, 0.4, 2.0, 1.5,
+                                 expire=np.r_[placed[1:] + 1, n])
+    filled = ladders['first_fill'] >= 0
+
+    live = [(t[0], t[1], t[9]) for t in trades]
+    isolated = list(zip(ladders['first_fill'][filled].tolist(), ladders['exit_index'][filled].tolist(),
+                        ladders['filled_levels'][filled].tolist()))
+    assert switches == 0 and len(live) > 0
+    assert live == isolated[:len(live)]
+    np.testing.assert_allclose([t[7] for t in trades], ladders['pnl_pct'][filled][:len(trades)], rtol=1e-9)
+    assert len(equity) == n + 1
+
+
+def test_divergence_series_matches_pivot_detection():
+    _, _, _, _, close = random_bars(3000, seed=5)
+    close[100:110] = close[99]  # 같은 값이 이어지는 구간
+    rsi = RSI(close)
+    bearish, bullish = divergence_series(close, rsi)
+
+    for t in range(len(close)):
+        start = max(0, t - DIVERGENCE_LOOKBACK + 1)
+        price_highs, price_lows = find_pivots(close[start:t + 1], PIVOT_ORDER)
+        rsi_highs, rsi_lows = find_pivots(rsi[start:t + 1], PIVOT_ORDER)
+        assert bearish[t] == detect_bearish_divergence(price_highs, rsi_highs), t
+        assert bullish[t] == detect_bullish_divergence(price_lows, rsi_lows), t
+    assert bearish.any() and bullish.any()
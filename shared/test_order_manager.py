@@ -0,0 +1,164 @@
+"""
+주문 상태 관리 테스트 (pytest)
+OrderManager 상태 전이 표: 역순/중복 이벤트 무시, 등록 전 이벤트(_pending) 재생,
+apply_rest의 누적 평균가 → 새 체결분 가격 환산을 확인
+"""
+
+from sys import path as sys_path
+from pathlib import Path
+
+import pytest
+
+sys_path.insert(0, str(Path(__file__).parent.parent))
+from shared.order_manager import CANCELED, FILLED, NEW, PARTIALLY_FILLED, OrderManager
+
+
+@pytest.fixture
+def updates():
+    return []
+
+
+@pytest.fixture
+def manager(updates):
+    def on_update(record, delta, fill_price):
+        updates.append((record.status, delta, fill_price))
+    return OrderManager(client=None, on_update=on_update)
+
+
+def ack(order_id=1, **fields):
+    """LIMIT 주문 REST 응답"""
+    return dict({'orderId': order_id, 'clientOrderId': f'bot_{order_id}', 'symbol': 'BTCUSDT',
+                 'side': 'SELL', 'type': 'LIMIT', 'price': '100', 'origQty': '1.0'}, **fields)
+
+
+def event(order_id=1, status=NEW, filled=0.0, last_price=0.0, time=0):
+    """ORDER_TRADE_UPDATE 'o' 객체 (X: 상태, z: 누적 체결 수량, L: 마지막 체결가)"""
+    return {'i': order_id, 'X': status, 'z': str(filled), 'L': str(last_price), 'T': time}
+
+
+def test_partial_fills_report_deltas(manager, updates):
+    record = manager.track(ack())
+    manager.apply_update(event(status=PARTIALLY_FILLED, filled=0.4, last_price=100, time=1))
+    manager.apply_update(event(status=FILLED, filled=1.0, last_price=110, time=2))
+
+    assert updates == [(PARTIALLY_FILLED, pytest.approx(0.4), 100.0),
+                       (FILLED, pytest.approx(0.6), 110.0)]
+    assert record.filled_qty == pytest.approx(1.0)
+    assert record.avg_price == pytest.approx(106.0)
+    assert not record.is_open
+
+
+def test_out_of_order_events_are_ignored(manager, updates):
+    record = manager.track(ack())
+    manager.apply_update(event(status=FILLED, filled=1.0, last_price=100, time=2))
+    # 늦게 도착한 부분 체결 / NEW 이벤트는 종료 상태를 되돌리지 않음
+    manager.apply_update(event(status=PARTIALLY_FILLED, filled=0.4, last_price=99, time=1))
+    manager.apply_update(event(status=NEW, time=0))
+
+    assert record.status == FILLED
+    assert record.filled_qty == pytest.approx(1.0) and record.avg_price == pytest.approx(100.0)
+    assert record.update_time == 2
+    assert len(updates) == 1
+
+
+def test_terminal_states_do_not_change(manager, updates):
+    record = manager.track(ack())
+    manager.apply_update(event(status=CANCELED, time=1))
+    manager.apply_update(event(status=FILLED, filled=1.0, last_price=100, time=2))
+
+    assert record.status == CANCELED and record.filled_qty == 0
+    assert updates == [(CANCELED, 0.0, 0.0)]
+
+
+def test_duplicate_event_does_not_call_back_twice(manager, updates):
+    manager.track(ack())
+    fill = event(status=PARTIALLY_FILLED, filled=0.4, last_price=100, time=1)
+    manager.apply_update(fill)
+    manager.apply_update(dict(fill))
+
+    assert len(updates) == 1
+
+
+def test_event_before_ack_is_replayed_on_track(manager, updates):
+    # 스트림 이벤트가 REST 응답보다 먼저 도착
+    assert manager.apply_update(event(status=PARTIALLY_FILLED, filled=0.4, last_price=100, time=1)) is None
+    assert manager.apply_update(event(status=FILLED, filled=1.0, last_price=110, time=2)) is None
+    assert updates == []
+
+    record = manager.track(ack(status=NEW, executedQty='0', avgPrice='0'))
+
+    # 최신 이벤트만 보관되므로 누적 수량 전체가 한 번에 반영
+    assert record.status == FILLED and record.filled_qty == pytest.approx(1.0)
+    assert updates == [(FILLED, pytest.approx(1.0), 110.0)]
+    assert manager._pending == {}
+
+
+def test_pending_events_are_bounded(updates):
+    manager = OrderManager(client=None, max_pending=2)
+    for order_id in (1, 2, 3):
+        manager.apply_update(event(order_id, status=FILLED, filled=1.0, last_price=100))
+
+    assert list(manager._pending) == [2, 3]
+    assert manager.track(ack(1)).status == NEW
+
+
+def test_market_ack_with_fill_is_applied(manager, updates):
+    record = manager.track(ack(type='MARKET', status=FILLED, executedQty='1.0', avgPrice='101.5'))
+
+    assert record.status == FILLED and record.avg_price == pytest.approx(101.5)
+    assert updates == [(FILLED, pytest.approx(1.0), 101.5)]
+
+
+def test_apply_rest_converts_average_price_to_new_fill_price(manager, updates):
+    record = manager.track(ack())
+    manager.apply_rest({'orderId': 1, 'status': PARTIALLY_FILLED, 'executedQty': '0.4',
+                        'avgPrice': '100', 'updateTime': 1})
+    # 누적 평균 106 = (0.4 × 100 + 0.6 × 110) / 1.0 → 새로 체결된 0.6의 가격은 110
+    manager.apply_rest({'orderId': 1, 'status': FILLED, 'executedQty': '1.0',
+                        'avgPrice': '106', 'updateTime': 2})
+
+    assert updates[0] == (PARTIALLY_FILLED, pytest.approx(0.4), pytest.approx(100.0))
+    assert updates[1] == (FILLED, pytest.approx(0.6), pytest.approx(110.0))
+    assert record.avg_price == pytest.approx(106.0)
+
+
+def test_apply_rest_without_avg_price_uses_order_price(manager, updates):
+    manager.track(ack())
+    manager.apply_rest({'orderId': 1, 'status': FILLED, 'executedQty': '1.0', 'avgPrice': '0'})
+
+    assert updates == [(FILLED, pytest.approx(1.0), pytest.approx(100.0))]
+
+
+def test_apply_rest_ignores_unknown_and_stale_orders(manager, updates):
+    assert manager.apply_rest({'orderId': 99, 'status': FILLED, 'executedQty': '1.0'}) is None
+
+    record = manager.track(ack())
+    manager.apply_update(event(status=FILLED, filled=1.0, last_price=100, time=2))
+    # 스트림보다 늦은 폴링 결과 (부분 체결)는 무시
+    manager.apply_rest({'orderId': 1, 'status': PARTIALLY_FILLED, 'executedQty': '0.4',
+                        'avgPrice': '100', 'updateTime': 1})
+
+    assert record.status == FILLED and record.filled_qty == pytest.approx(1.0)
+    assert len(updates) == 1
+
+
+def test_algo_order_status_mapping(manager, updates):
+    record = manager.track({'algoId': 7, 'clientAlgoId': 'bot_stop', 'symbol': 'BTCUSDT',
+                            'side': 'BUY', 'orderType': 'STOP_MARKET', 'triggerPrice': '105',
+                            'quantity': '1.0', 'algoStatus': 'NEW'})
+    assert record.algo and manager.get(7, algo=True) is record and manager.get(7) is None
+
+    manager.apply_algo_update({'aid': 7, 'X': 'TRIGGERED', 'T': 3})
+
+    assert record.status == FILLED
+    assert updates == [(FILLED, 0.0, 0.0)]
+
+
+def test_closed_orders_are_pruned(updates):
+    manager = OrderManager(client=None, max_closed=2)
+    for order_id in (1, 2, 3):
+        manager.track(ack(order_id))
+        manager.apply_update(event(order_id, status=CANCELED))
+
+    assert manager.get(1) is None and manager.get_by_client_id('bot_1') is None
+    assert manager.get(3) is not None
@@ -0,0 +1,233 @@
+"""
+주문 제출기 테스트 (pytest)
+스텁 클라이언트로 OrderSubmitter.create_order의 응답 없음(조회 후 재전송), 같은 clientOrderId 재전송,
+-4116 중복 주문 채택, 조건부(algo) 주문 경로를 확인
+"""
+
+import json
+from sys import path as sys_path
+from pathlib import Path
+
+import pytest
+import requests
+from binance.exceptions import BinanceAPIException
+
+sys_path.insert(0, str(Path(__file__).parent.parent))
+from shared import order_submitter
+from shared.order_submitter import DUPLICATE_CLIENT_ORDER_ID, ORDER_NOT_FOUND, OrderSubmitter
+
+
+def api_error(code: int, status_code: int = 400) -> BinanceAPIException:
+    return BinanceAPIException(None, status_code, json.dumps({'code': code, 'msg': f'error {code}'}))
+
+
+class StubClient:
+    """
+    futures 주문 API 스텁
+    거래소에 접수된 주문은 clientOrderId/clientAlgoId별로 보관하고,
+    send_errors / find_errors에 넣은 예외를 호출 순서대로 던짐
+    (접수 후 응답만 잃어버린 경우는 lost_after_accept로 표시)
+    """
+
+    def __init__(self):
+        self.orders = {}
+        self.algo_orders = {}
+        self.sent = []
+        self.lookups = []
+        self.send_errors = []
+        self.find_errors = []
+        self.lost_after_accept = False
+        self.next_id = 1000
+
+    def _accept(self, book, key, id_field, params):
+        if params.get(key) in book:
+            raise api_error(DUPLICATE_CLIENT_ORDER_ID)
+        self.next_id += 1
+        result = dict(params, **{id_field: self.next_id})
+        if params.get(key):
+            book[params[key]] = result
+        return result
+
+    def _send(self, book, key, id_field, params):
+        self.sent.append(params)
+        if self.send_errors:
+            error = self.send_errors.pop(0)
+            if self.lost_after_accept:
+                self._accept(book, key, id_field, params)
+            raise error
+        return self._accept(book, key, id_field, params)
+
+    def _find(self, book, key, client_id):
+        self.lookups.append(client_id)
+        if self.find_errors:
+            raise self.find_errors.pop(0)
+        if client_id not in book:
+            raise api_error(ORDER_NOT_FOUND)
+        return book[client_id]
+
+    def futures_create_order(self, **params):
+        return self._send(self.orders, 'newClientOrderId', 'orderId', params)
+
+    def futures_get_order(self, symbol, origClientOrderId):
+        return self._find(self.orders, 'newClientOrderId', origClientOrderId)
+
+    def futures_create_algo_order(self, **params):
+        return self._send(self.algo_orders, 'clientAlgoId', 'algoId', params)
+
+    def futures_get_algo_order(self, symbol, clientAlgoId):
+        return self._find(self.algo_orders, 'clientAlgoId', clientAlgoId)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(order_submitter.time, 'sleep', lambda seconds: None)
+
+
+@pytest.fixture
+def client():
+    return StubClient()
+
+
+def market_order(client_id='bot_entry_1'):
+    return {'symbol': 'BTCUSDT', 'side': 'SELL', 'type': 'MARKET', 'quantity': 0.01,
+            'newClientOrderId': client_id}
+
+
+def stop_order(client_id='bot_stop_1'):
+    return {'symbol': 'BTCUSDT', 'side': 'BUY', 'type': 'STOP_MARKET', 'quantity': 0.01,
+            'stopPrice': 101.5, 'reduceOnly': True, 'newClientOrderId': client_id}
+
+
+def test_submits_once_when_answered(client):
+    submitter = OrderSubmitter(client)
+    result = submitter.create_order(market_order())
+    assert result['orderId'] == 1001
+    assert len(client.sent) == 1 and client.lookups == []
+
+
+def test_unknown_result_adopts_order_found_by_lookup(client):
+    # 거래소는 접수했지만 응답이 타임아웃 → 재전송 없이 조회 결과 사용
+    client.send_errors = [requests.exceptions.Timeout('read timeout')]
+    client.lost_after_accept = True
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(market_order())
+
+    assert result['orderId'] == 1001
+    assert len(client.sent) == 1
+    assert client.lookups == ['bot_entry_1']
+    assert submitter.resolved == 1
+
+
+def test_unknown_result_resends_under_same_client_order_id(client):
+    # 접수되지 않은 채 타임아웃 → 조회로 없음을 확인한 뒤 같은 ID로 재전송
+    client.send_errors = [requests.exceptions.ConnectionError('reset')]
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(market_order())
+
+    assert result['orderId'] == 1001
+    assert [order['newClientOrderId'] for order in client.sent] == ['bot_entry_1', 'bot_entry_1']
+    assert client.lookups == ['bot_entry_1']
+    assert submitter.resolved == 0
+    assert list(client.orders) == ['bot_entry_1']
+
+
+def test_failed_lookup_is_retried_before_resending(client):
+    client.send_errors = [requests.exceptions.Timeout('read timeout')]
+    client.lost_after_accept = True
+    client.find_errors = [requests.exceptions.Timeout('lookup timeout')]
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(market_order())
+
+    # 조회가 실패한 동안은 재전송하지 않음 (중복 진입 방지)
+    assert result['orderId'] == 1001
+    assert len(client.sent) == 1
+    assert client.lookups == ['bot_entry_1', 'bot_entry_1']
+
+
+def test_gives_up_after_max_retries(client):
+    client.send_errors = [requests.exceptions.Timeout('t')] * 3
+    submitter = OrderSubmitter(client, max_retries=2)
+
+    result = submitter.create_order(market_order())
+
+    assert result['clientOrderId'] == 'bot_entry_1' and 'orderId' not in result
+    assert len(client.sent) == 3
+    assert {order['newClientOrderId'] for order in client.sent} == {'bot_entry_1'}
+
+
+def test_duplicate_client_order_id_adopts_existing_order(client):
+    # 이전 주기에 접수된 주문이 남아 있음 → -4116 → 조회로 기존 주문 채택
+    client.orders['bot_entry_1'] = dict(market_order(), orderId=42)
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(market_order())
+
+    assert result['orderId'] == 42
+    assert len(client.sent) == 1
+    assert client.lookups == ['bot_entry_1']
+    assert submitter.resolved == 1
+
+
+def test_duplicate_in_batch_adopts_existing_order(client):
+    client.orders['bot_entry_2'] = dict(market_order('bot_entry_2'), orderId=42)
+
+    def place_batch(batchOrders):
+        return [{'orderId': 7}, {'code': DUPLICATE_CLIENT_ORDER_ID, 'msg': 'duplicate'}]
+
+    client.futures_place_batch_order = place_batch
+    submitter = OrderSubmitter(client)
+
+    results = submitter.submit_batch([market_order('bot_entry_1'), market_order('bot_entry_2')])
+
+    assert [result['orderId'] for result in results] == [7, 42]
+    assert client.sent == [] and client.lookups == ['bot_entry_2']
+
+
+def test_non_transient_error_is_not_retried(client):
+    client.send_errors = [api_error(-2019)]  # 마진 부족
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(market_order())
+
+    assert result['code'] == -2019
+    assert len(client.sent) == 1 and client.lookups == []
+
+
+def test_order_without_client_id_is_not_retried(client):
+    client.send_errors = [requests.exceptions.Timeout('t')]
+    order = market_order()
+    del order['newClientOrderId']
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(order)
+
+    # ID가 없으면 접수 여부를 확인할 수 없으므로 재전송하지 않음
+    assert 'orderId' not in result
+    assert len(client.sent) == 1 and client.lookups == []
+
+
+def test_conditional_order_uses_algo_endpoint_and_lookup(client):
+    client.send_errors = [requests.exceptions.Timeout('t')]
+    client.lost_after_accept = True
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(stop_order())
+
+    sent = client.sent[0]
+    assert sent['algoType'] == 'CONDITIONAL' and sent['clientAlgoId'] == 'bot_stop_1'
+    assert sent['triggerPrice'] == 101.5 and 'stopPrice' not in sent and 'newClientOrderId' not in sent
+    assert result['algoId'] == 1001 and client.orders == {}
+    assert client.lookups == ['bot_stop_1'] and submitter.resolved == 1
+
+
+def test_conditional_duplicate_adopts_existing_algo_order(client):
+    client.algo_orders['bot_stop_1'] = {'symbol': 'BTCUSDT', 'algoId': 9, 'clientAlgoId': 'bot_stop_1'}
+    submitter = OrderSubmitter(client)
+
+    result = submitter.create_order(stop_order())
+
+    assert result['algoId'] == 9
+    assert submitter.resolved == 1
@@ -0,0 +1,86 @@
+"""
+사전 위험 검사 테스트 (pytest)
+RiskEngine.check가 낙폭, 거래량, 레버리지, 주문 명목가치, 심볼 노출 한도에서 진입을 거부하는지 확인
+"""
+
+from sys import path as sys_path
+from pathlib import Path
+
+sys_path.insert(0, str(Path(__file__).parent.parent))
+from shared.risk_engine import RiskEngine
+from shared.scoring import RISK_LIMITS, risk_limits
+
+
+def make_risk(**overrides) -> RiskEngine:
+    """BTCUSDT 라이브 한도 + 건전한 캐시 상태 (자본 1000, 거래대금 충분)"""
+    limits = risk_limits('BTCUSDT')
+    limits.update(overrides)
+    risk = RiskEngine(**limits)
+    risk.update_equity(1000.0)
+    risk.update_volume('BTCUSDT', 1_000_000.0)
+    return risk
+
+
+def test_accepts_entry_within_limits():
+    risk = make_risk()
+    assert risk.check('BTCUSDT', 500.0, 5) is None
+    assert (risk.checks, risk.rejects) == (1, 0)
+
+
+def test_rejects_on_drawdown():
+    risk = make_risk()
+    risk.update_equity(905.0)  # 최고점 1000 대비 9.5%
+    assert risk.check('BTCUSDT', 100.0, 5) is None
+    risk.update_equity(900.0)  # 10%
+    assert '낙폭' in risk.check('BTCUSDT', 100.0, 5)
+    assert risk.rejects == 1
+
+
+def test_rejects_on_volume():
+    risk = make_risk()
+    assert '거래량 정보 없음' in risk.check('ETHUSDT', 100.0, 5)
+    risk.update_volume('BTCUSDT', risk.min_volume_usdt - 1)
+    assert '거래대금 부족' in risk.check('BTCUSDT', 100.0, 5)
+
+
+def test_rejects_on_leverage():
+    risk = make_risk()
+    assert risk.check('BTCUSDT', 100.0, risk.max_leverage) is None
+    assert '레버리지' in risk.check('BTCUSDT', 100.0, risk.max_leverage + 1)
+
+
+def test_rejects_on_order_notional():
+    risk = make_risk(max_order_notional=200)
+    assert risk.check('BTCUSDT', 200.0, 5) is None
+    assert '명목가치 한도' in risk.check('BTCUSDT', 201.0, 5)
+
+
+def test_rejects_on_available_margin():
+    risk = make_risk()
+    risk.update_equity(1000.0, available_margin=50.0)
+    assert risk.check('BTCUSDT', 250.0, 5) is None
+    assert '가용 마진' in risk.check('BTCUSDT', 300.0, 5)
+
+
+def test_rejects_on_symbol_exposure():
+    risk = make_risk(max_symbol_exposure_percent=50)
+    risk.update_exposure('BTCUSDT', -400.0)  # 숏 포지션도 절대값
+    assert risk.check('BTCUSDT', 100.0, 5) is None
+    assert '노출 한도' in risk.check('BTCUSDT', 101.0, 5)
+
+
+def test_zero_limit_skips_check():
+    risk = make_risk(max_drawdown_percent=0, min_volume_usdt=0, max_leverage=0,
+                     max_order_notional=0, max_symbol_exposure_percent=0)
+    risk.update_equity(100.0)  # 90% 낙폭
+    risk.update_exposure('BTCUSDT', 1e9)
+    assert risk.check('SOLUSDT', 1e6, 125) is None
+    assert risk.check('BTCUSDT', 1e6, 125) is None
+
+
+def test_risk_limits_table():
+    assert set(RISK_LIMITS) >= {'BTCUSDT', 'ETHUSDT'}
+    assert risk_limits('SOLUSDT') == RISK_LIMITS['BTCUSDT']
+    limits = risk_limits('BTCUSDT')
+    limits['max_leverage'] = 99  # 복사본이라 표는 그대로
+    assert RISK_LIMITS['BTCUSDT']['max_leverage'] != 99
@@ -0,0 +1,113 @@
+"""
+서버 시간 동기화 모듈
+선물 서버 시간과의 오프셋을 백그라운드에서 주기적으로 측정/평활화하고
+서명 요청의 timestamp에 반영 (-1021 타임스탬프 오류 방지)
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TimeSync:
+    """서버 시간 오프셋 추적기"""
+
+    def __init__(self, client, interval: float = 60, alpha: float = 0.2,
+                 time_source: Optional[Callable[[], int]] = None,
+                 max_rtt_ms: float = 1000, drift_warn_ms: float = 1000):
+        """
+        초기화
+
+        Args:
+            client: binance Client (timestamp_offset을 갱신)
+            interval: 동기화 주기 (초)
+            alpha: 오프셋 지수평활 계수 (0~1, 클수록 최근 샘플 비중 큼)
+            time_source: 서버 시간(ms)을 돌려주는 함수 (기본: futures_time,
+                         테스트넷/오프라인에서는 로컬 대체 함수 지정 가능)
+            max_rtt_ms: 이보다 왕복 시간이 긴 샘플은 버림
+            drift_warn_ms: 오프셋이 이 값을 넘으면 경고
+        """
+        self.client = client
+        self.interval = interval
+        self.alpha = alpha
+        self.time_source = time_source or (lambda: int(client.futures_time()['serverTime']))
+        self.max_rtt_ms = max_rtt_ms
+        self.drift_warn_ms = drift_warn_ms
+
+        self.offset_ms = 0.0   # 평활화된 오프셋 (서버 - 로컬)
+        self.jitter_ms = 0.0   # 샘플과 평활 오프셋 차이의 평활값
+        self.rtt_ms = 0.0      # 마지막 샘플 왕복 시간
+        self.samples = 0
+        self.failures = 0
+        self.last_sync = 0.0   # 마지막 성공 시각 (time.monotonic)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def sync_once(self) -> bool:
+        """서버 시간을 한 번 측정해 오프셋 갱신"""
+        try:
+            t0 = time.time() * 1000
+            server_ms = self.time_source()
+            t1 = time.time() * 1000
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"서버 시간 조회 실패: {e}")
+            return False
+
+        rtt = t1 - t0
+        if rtt > self.max_rtt_ms and self.samples > 0:
+            logger.debug(f"서버 시간 샘플 버림 (RTT {rtt:.0f}ms)")
+            return False
+
+        # 요청 중간 시점 기준 오프셋
+        sample = server_ms - (t0 + t1) / 2
+
+        with self._lock:
+            if self.samples == 0:
+                self.offset_ms = sample
+            else:
+                deviation = abs(sample - self.offset_ms)
+                self.jitter_ms += self.alpha * (deviation - self.jitter_ms)
+                self.offset_ms += self.alpha * (sample - self.offset_ms)
+            self.rtt_ms = rtt
+            self.samples += 1
+            self.last_sync = time.monotonic()
+            self.client.timestamp_offset = int(round(self.offset_ms))
+
+        if abs(self.offset_ms) > self.drift_warn_ms:
+            logger.warning(f"⚠️ 로컬 시계 오차 큼: {self.offset_ms:+.0f}ms (지터 {self.jitter_ms:.0f}ms)")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sync_once()
+
+    def start(self):
+        """백그라운드 동기화 시작"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='TimeSync', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval)
+
+    def get_metrics(self) -> Dict:
+        """오프셋/지터 지표 (알림용)"""
+        with self._lock:
+            return {
+                'offset_ms': self.offset_ms,
+                'jitter_ms': self.jitter_ms,
+                'rtt_ms': self.rtt_ms,
+                'samples': self.samples,
+                'failures': self.failures,
+                'last_sync_age': time.monotonic() - self.last_sync if self.samples else None,
+            }
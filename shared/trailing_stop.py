@@ -0,0 +1,192 @@
+"""
+트레일링 스탑 관리 모듈
+- NATIVE: 거래소 TRAILING_STOP_MARKET(callbackRate) 주문 한 번으로 추적 (갱신 트래픽 없음)
+- AMEND: STOP_MARKET을 직접 옮기되 N틱 이상 움직일 때만 교체, 새 주문 생성 후 기존 주문 취소
+(두 주문 모두 조건부 주문이라 algoOrder로 접수되고 algoId로 추적/취소)
+새 스탑 계산은 상태 잠금 안에서, 주문 생성/취소는 잠금 밖에서 수행 (스트림 콜백을 막지 않음)
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from .order_submitter import is_order_ok, order_id, to_algo_order
+
+logger = logging.getLogger(__name__)
+
+NATIVE = 'NATIVE'
+AMEND = 'AMEND'
+
+# TRAILING_STOP_MARKET callbackRate 허용 범위 (%)
+MIN_CALLBACK_RATE = 0.1
+MAX_CALLBACK_RATE = 10.0
+
+
+class TrailingStopManager:
+    """포지션별 트레일링 스탑 유지 (포지션 dict의 필드를 직접 갱신)"""
+
+    def __init__(self, submitter, orders, exchange_info, mode: str = AMEND,
+                 trail_percent: float = 2.0, min_ticks: int = 10,
+                 client_id: Optional[Callable[..., str]] = None, lock=None):
+        """
+        초기화
+
+        Args:
+            submitter: OrderSubmitter (주문 생성)
+            orders: OrderManager (주문 등록/지정 취소)
+            exchange_info: ExchangeInfoCache (틱 단위 보정)
+            mode: NATIVE 또는 AMEND
+            trail_percent: 최고/최저가 대비 스탑 거리 (%)
+            min_ticks: AMEND 모드에서 스탑을 옮길 최소 틱 수
+            client_id: (symbol, purpose, *parts) -> clientAlgoId
+            lock: 포지션 dict를 보호하는 잠금 (봇 상태 잠금, 기본: 자체 RLock)
+        """
+        mode = mode.upper()
+        if mode not in (NATIVE, AMEND):
+            raise ValueError(f"지원하지 않는 트레일링 스탑 모드: {mode}")
+        self.submitter = submitter
+        self.orders = orders
+        self.exchange_info = exchange_info
+        self.mode = mode
+        self.trail_percent = trail_percent
+        self.min_ticks = min_ticks
+        self.client_id = client_id
+        self.lock = lock or threading.RLock()
+
+        # 통계
+        self.replaced = 0
+        self.skipped = 0
+
+    def _order(self, symbol: str, side: str, quantity: float, order: Dict, purpose: str, *parts) -> Dict:
+        order = to_algo_order(dict(order, symbol=symbol, positionSide=side,
+                                   side='SELL' if side == 'LONG' else 'BUY',
+                                   quantity=self.exchange_info.quantize_qty(symbol, quantity)))
+        if self.client_id:
+            order['clientAlgoId'] = self.client_id(symbol, purpose, side, *parts)
+        return self.submitter.create_order(order)
+
+    def update(self, symbol: str, pos: Dict, price: float) -> bool:
+        """
+        현재가로 최고/최저가와 스탑 레벨 갱신 (상태 잠금을 잡지 않은 상태로 호출)
+
+        Args:
+            symbol: 거래쌍
+            pos: 봇 포지션 dict (side, quantity, trailing_stop, stop_order_id 등)
+            price: 현재가 (마크 가격)
+
+        Returns:
+            거래소 주문을 새로 냈으면 True
+        """
+        with self.lock:
+            plan = self.plan(symbol, pos, price)
+        return self.apply(symbol, pos, plan) if plan else False
+
+    def plan(self, symbol: str, pos: Dict, price: float) -> Optional[Dict]:
+        """
+        최고/최저가를 갱신하고 필요한 주문 교체를 계산 (잠금 안에서 호출, REST 요청 없음)
+
+        Returns:
+            apply에 넘길 교체 계획, 교체가 필요 없으면 None
+        """
+        if pos.get('quantity', 0) <= 0:
+            return None
+
+        side = pos.get('side', 'SHORT')
+        if side == 'LONG':
+            improved = price > pos.get('highest_price_seen', float('-inf'))
+            if improved:
+                pos['highest_price_seen'] = price
+            new_stop = self.exchange_info.quantize_price(
+                symbol, pos['highest_price_seen'] * (1 - self.trail_percent / 100), mode='down')
+        else:
+            improved = price < pos.get('lowest_price_seen', float('inf'))
+            if improved:
+                pos['lowest_price_seen'] = price
+            new_stop = self.exchange_info.quantize_price(
+                symbol, pos['lowest_price_seen'] * (1 + self.trail_percent / 100), mode='up')
+
+        if self.mode == NATIVE:
+            if improved:
+                pos['trailing_stop'] = new_stop  # 로컬 돌파 감지용 (거래소가 자체 추적)
+            return self._plan_native(pos)
+        if not improved:
+            return None
+        return self._plan_amend(symbol, pos, new_stop)
+
+    def _plan_amend(self, symbol: str, pos: Dict, new_stop: float) -> Optional[Dict]:
+        """스탑이 유리한 방향으로 min_ticks 이상 움직였을 때만 교체"""
+        side = pos.get('side', 'SHORT')
+        current = pos.get('trailing_stop')
+        if current:
+            moved = new_stop - current if side == 'LONG' else current - new_stop
+            filters = self.exchange_info.get(symbol)
+            tick = filters.tick_size if filters else 0.0
+            if moved <= 0 or (tick and moved < self.min_ticks * tick):
+                self.skipped += 1
+                return None
+        return {'mode': AMEND, 'side': side, 'quantity': pos['quantity'], 'stop': new_stop,
+                'replace': pos.get('stop_order_id')}
+
+    def _plan_native(self, pos: Dict) -> Optional[Dict]:
+        """TRAILING_STOP_MARKET이 없거나 수량이 바뀌었으면 (그리드 추가 체결) 다시 배치"""
+        algo_id = pos.get('native_trailing_id')
+        record = self.orders.get(algo_id, algo=True) if algo_id else None
+        if record and record.is_open and pos.get('native_trailing_qty') == pos['quantity']:
+            return None
+        return {'mode': NATIVE, 'side': pos.get('side', 'SHORT'), 'quantity': pos['quantity'],
+                'replace': record.order_id if record and record.is_open else None}
+
+    def apply(self, symbol: str, pos: Dict, plan: Dict) -> bool:
+        """
+        계획한 주문을 잠금 밖에서 생성하고, 잠금 안에서 포지션에 반영한 뒤 기존 주문 취소
+        (새 주문 생성 후 취소하므로 교체 중에도 보호가 끊기지 않음)
+
+        Returns:
+            새 주문이 접수되어 포지션에 반영됐으면 True
+        """
+        side = plan['side']
+        if plan['mode'] == NATIVE:
+            callback_rate = round(min(max(self.trail_percent, MIN_CALLBACK_RATE), MAX_CALLBACK_RATE), 1)
+            new_order = self._order(symbol, side, plan['quantity'],
+                                    {'type': 'TRAILING_STOP_MARKET', 'callbackRate': callback_rate},
+                                    'native_trailing', plan['quantity'])
+            tag = 'trailing_stop'
+        else:
+            new_order = self._order(symbol, side, plan['quantity'],
+                                    {'type': 'STOP_MARKET', 'stopPrice': plan['stop']},
+                                    'trailing_stop', plan['stop'])
+            tag = 'stop_loss'
+        if not is_order_ok(new_order):
+            # 기존 스탑은 그대로 남아 있으므로 보호는 유지됨
+            logger.warning(f"  {'TRAILING_STOP_MARKET' if plan['mode'] == NATIVE else '새로운 STOP'} 주문 생성 실패 "
+                           f"(기존 스탑 유지): {new_order.get('msg')}")
+            return False
+
+        new_id = order_id(new_order)
+        with self.lock:
+            self.orders.track(new_order, tag=tag)
+            # 주문을 내는 사이 포지션이 종료됐으면 새 주문만 취소
+            stale = pos.get('quantity', 0) <= 0 or pos.get('status') == 'CLOSED'
+            if not stale:
+                if plan['mode'] == NATIVE:
+                    pos['native_trailing_id'] = new_id
+                    pos['native_trailing_qty'] = plan['quantity']
+                else:
+                    pos['stop_order_id'] = new_id
+                    pos['trailing_stop'] = plan['stop']
+                self.replaced += 1
+
+        if stale:
+            logger.warning(f"  {symbol} 스탑 교체 중 포지션 종료 - 새 주문 취소")
+            self.orders.cancel(symbol, [new_id], algo=True)
+            return False
+        old_id = plan['replace']
+        if old_id and not self.orders.cancel(symbol, [old_id], algo=True):
+            logger.debug(f"  기존 스탑 주문 취소 안 됨 (이미 체결/취소됐을 수도): {old_id}")
+
+        if plan['mode'] == NATIVE:
+            logger.info(f"  🔄 거래소 트레일링 스탑 배치: {plan['quantity']} (callbackRate {callback_rate}%)")
+        else:
+            mode_str = "롱" if side == 'LONG' else "숏"
+            logger.info(f"  🔄 {mode_str} 트레일링 스탑 업데이트: {plan['stop']:.2f} USDT")
+        return True
@@ -0,0 +1,142 @@
+"""
+사용자 데이터 스트림 모듈
+listenKey 기반 선물 사용자 스트림에서 ORDER_TRADE_UPDATE / ALGO_UPDATE / ACCOUNT_UPDATE 이벤트를 받아
+콜백으로 전달 (주문 체결을 REST 폴링 없이 즉시 감지)
+"""
+
+import json
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+FUTURES_WS_URL = 'wss://fstream.binance.com/ws/'
+FUTURES_TESTNET_WS_URL = 'wss://stream.binancefuture.com/ws/'
+
+
+class UserDataStream:
+    """선물 사용자 데이터 스트림 소비자"""
+
+    def __init__(self, client,
+                 on_order_update: Optional[Callable[[Dict], None]] = None,
+                 on_account_update: Optional[Callable[[Dict], None]] = None,
+                 on_algo_update: Optional[Callable[[Dict], None]] = None,
+                 keepalive_interval: float = 1800,
+                 ws_url: Optional[str] = None,
+                 use_websocket: bool = True):
+        """
+        초기화
+
+        Args:
+            client: binance Client (listenKey 발급/연장)
+            on_order_update: ORDER_TRADE_UPDATE의 'o' 객체를 받는 콜백
+            on_account_update: ACCOUNT_UPDATE의 'a' 객체를 받는 콜백
+            on_algo_update: ALGO_UPDATE(조건부 주문)의 'o' 객체를 받는 콜백
+            keepalive_interval: listenKey 연장 주기 (초, 만료는 60분)
+            ws_url: 웹소켓 주소 (기본: 실서버, 테스트넷 클라이언트면 테스트넷)
+            use_websocket: False면 소켓 없이 dispatch()로 넣은 이벤트만 처리 (로컬 대체/재생용)
+        """
+        self.client = client
+        self.on_order_update = on_order_update
+        self.on_account_update = on_account_update
+        self.on_algo_update = on_algo_update
+        self.keepalive_interval = keepalive_interval
+        if ws_url is None:
+            ws_url = FUTURES_TESTNET_WS_URL if getattr(client, 'testnet', False) else FUTURES_WS_URL
+        self.ws_url = ws_url
+        self.use_websocket = use_websocket
+
+        self.listen_key: Optional[str] = None
+        self.events = 0
+        self.last_event_time = 0  # 마지막 이벤트의 거래소 시각 (ms)
+        self._connected = False
+        self._stop = threading.Event()
+        self._threads = []
+
+    def dispatch(self, event: Dict):
+        """이벤트 하나를 처리 (웹소켓 수신 또는 로컬 대체 소스에서 호출)"""
+        event_type = event.get('e')
+        self.events += 1
+        self.last_event_time = event.get('E', self.last_event_time)
+        try:
+            if event_type == 'ORDER_TRADE_UPDATE' and self.on_order_update:
+                self.on_order_update(event['o'])
+            elif event_type == 'ALGO_UPDATE' and self.on_algo_update:
+                self.on_algo_update(event['o'])
+            elif event_type == 'ACCOUNT_UPDATE' and self.on_account_update:
+                self.on_account_update(event['a'])
+            elif event_type == 'listenKeyExpired':
+                logger.warning("listenKey 만료 - 재발급")
+                self._renew_listen_key()
+        except Exception as e:
+            logger.error(f"사용자 스트림 이벤트 처리 실패 ({event_type}): {e}")
+
+    def is_alive(self) -> bool:
+        """이벤트를 실시간으로 받고 있는지 (False면 호출 측에서 REST 폴링으로 대체)"""
+        if not self.use_websocket:
+            return not self._stop.is_set() and self.listen_key is not None
+        return self._connected
+
+    def _renew_listen_key(self):
+        self.listen_key = self.client.futures_stream_get_listen_key()
+
+    def _keepalive_loop(self):
+        while not self._stop.wait(self.keepalive_interval):
+            try:
+                self.client.futures_stream_keepalive(listenKey=self.listen_key)
+                logger.debug("listenKey 연장")
+            except Exception as e:
+                logger.warning(f"listenKey 연장 실패, 재발급: {e}")
+                try:
+                    self._renew_listen_key()
+                except Exception as e2:
+                    logger.error(f"listenKey 재발급 실패: {e2}")
+
+    def _socket_loop(self):
+        from websockets.sync.client import connect
+
+        retry_delay = 1
+        while not self._stop.is_set():
+            try:
+                with connect(self.ws_url + self.listen_key, open_timeout=10) as ws:
+                    self._connected = True
+                    retry_delay = 1
+                    logger.info("✅ 사용자 데이터 스트림 연결")
+                    while not self._stop.is_set():
+                        try:
+                            message = ws.recv(timeout=1)
+                        except TimeoutError:
+                            continue
+                        self.dispatch(json.loads(message))
+            except Exception as e:
+                if not self._stop.is_set():
+                    logger.warning(f"사용자 데이터 스트림 끊김: {e}")
+            self._connected = False
+            if self._stop.wait(retry_delay):
+                break
+            retry_delay = min(retry_delay * 2, 60)
+            try:
+                self._renew_listen_key()
+            except Exception as e:
+                logger.error(f"listenKey 재발급 실패: {e}")
+
+    def start(self):
+        """listenKey 발급 후 수신/연장 스레드 시작"""
+        self._stop.clear()
+        self._renew_listen_key()
+        targets = [self._keepalive_loop]
+        if self.use_websocket:
+            targets.append(self._socket_loop)
+        self._threads = [
+            threading.Thread(target=target, name=f'UserStream-{i}', daemon=True)
+            for i, target in enumerate(targets)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._connected = False
+        for thread in self._threads:
+            thread.join(timeout=2)
@@ -0,0 +1,120 @@
+"""
+워크 포워드 분석 모듈
+전체 이력에서 한 번 계산한 지표/신호 배열을 구간별로 잘라 쓰며,
+in-sample 구간마다 파라미터를 최적화하고 바로 뒤 out-of-sample 구간에서 검증해 자본 곡선을 이어 붙임
+(모든 구간의 in-sample 평가는 하나의 프로세스 풀에서 병렬 실행)
+"""
+
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtest_core import trade_statistics
+from .sweep import SIMPLE, _evaluate_chunk, _worker_arrays, map_shared, simulate
+
+logger = logging.getLogger(__name__)
+
+
+def walk_forward_windows(n: int, in_sample: int, out_sample: int, step: Optional[int] = None,
+                         anchored: bool = False) -> List[Tuple[int, int, int]]:
+    """
+    구간 나누기
+
+    Args:
+        n: 전체 봉 수
+        in_sample: 최적화 구간 봉 수
+        out_sample: 검증 구간 봉 수 (마지막 구간은 남은 봉만큼 짧을 수 있음)
+        step: 구간 이동 봉 수 (기본: out_sample, 검증 구간이 겹치지 않음)
+        anchored: True면 최적화 구간 시작을 0에 고정 (확장 창)
+
+    Returns:
+        [(in_sample 시작, out_of_sample 시작, out_of_sample 끝), ...]
+    """
+    if in_sample <= 0 or out_sample <= 0:
+        raise ValueError("in_sample/out_sample은 1 이상이어야 함")
+    step = step or out_sample
+    windows = []
+    start = 0
+    while start + in_sample < n:
+        split = start + in_sample
+        windows.append((0 if anchored else start, split, min(split + out_sample, n)))
+        start += step
+    return windows
+
+
+def _run_fold_chunk(task: Tuple[int, int, int, List[Tuple[int, Dict]]]) -> List[Dict]:
+    fold, start, end, chunk = task
+    window = {name: array[start:end] for name, array in _worker_arrays.items()}
+    return _evaluate_chunk(window, chunk, fold=fold)
+
+
+def walk_forward(arrays: Dict[str, np.ndarray], params: Sequence[Dict], in_sample: int, out_sample: int,
+                 strategy: str = SIMPLE, initial_capital: float = 100.0, step: Optional[int] = None,
+                 anchored: bool = False, rank_by: str = 'total_pnl',
+                 max_workers: Optional[int] = None) -> Dict:
+    """
+    워크 포워드 실행
+
+    Args:
+        arrays: 전체 이력 배열 (sweep.REQUIRED_ARRAYS, 지표/신호는 미리 계산)
+        params: 구간마다 평가할 파라미터 조합
+        in_sample / out_sample / step / anchored: walk_forward_windows 참고
+        rank_by: in-sample 최적 조합 기준 열 (큰 값이 최적)
+        max_workers: 프로세스 수 (1이면 현재 프로세스에서 실행)
+
+    Returns:
+        {'folds': 구간별 최적 파라미터와 성과 DataFrame, 'in_sample': 전체 in-sample 결과 DataFrame,
+         'equity': 이어 붙인 out-of-sample 자본 곡선, 'statistics': out-of-sample 거래 통계}
+    """
+    n = len(arrays['close'])
+    windows = walk_forward_windows(n, in_sample, out_sample, step, anchored)
+    if not windows:
+        raise ValueError(f"데이터 부족: {n}개 봉 < in_sample {in_sample} + 1")
+
+    indexed = list(enumerate(params))
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(indexed) * len(windows) // (workers * 8))
+    tasks = [(fold, start, split, indexed[i:i + chunksize])
+             for fold, (start, split, _) in enumerate(windows)
+             for i in range(0, len(indexed), chunksize)]
+
+    rows = []
+    for chunk_rows in map_shared(arrays, _run_fold_chunk, tasks, strategy, initial_capital, workers):
+        rows.extend(chunk_rows)
+    in_sample_table = pd.DataFrame(rows).sort_values(
+        ['fold', rank_by, 'param_id'], ascending=[True, False, True]).reset_index(drop=True)
+    best = in_sample_table.groupby('fold', sort=True).head(1).set_index('fold')
+
+    # out-of-sample은 자본을 이어받아야 하므로 순서대로 (구간마다 조합 하나라 가벼움)
+    capital = initial_capital
+    equity_parts = [np.array([initial_capital], dtype=float)]
+    pnls: List[np.ndarray] = []
+    folds = []
+    for fold, (start, split, end) in enumerate(windows):
+        chosen = params[int(best.at[fold, 'param_id'])]
+        window = {name: array[split:end] for name, array in arrays.items()}
+        fold_pnls, equity, balance, _ = simulate(window, chosen, strategy, capital, close_at_end=True)
+        equity_parts.append(equity[1:])
+        pnls.append(fold_pnls)
+        folds.append(dict(
+            fold=fold, is_start=start, oos_start=split, oos_end=end, **chosen,
+            **{f'is_{rank_by}': best.at[fold, rank_by]},
+            oos_trades=len(fold_pnls), oos_pnl=balance - capital,
+            oos_return_pct=(balance - capital) / capital * 100 if capital else 0.0,
+        ))
+        logger.info(f"[구간 {fold}] {start}-{split} 최적 {chosen} → 검증 {split}-{end} "
+                    f"손익 {balance - capital:+.2f}")
+        capital = balance
+
+    equity = np.concatenate(equity_parts)
+    statistics = trade_statistics(np.concatenate(pnls), equity, initial_capital)
+    statistics['final_balance'] = capital
+    return {
+        'folds': pd.DataFrame(folds),
+        'in_sample': in_sample_table,
+        'equity': equity,
+        'statistics': statistics,
+    }